@@ -0,0 +1,16 @@
+# backend/apps/accounts/apps.py
+from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+
+class AccountsConfig(AppConfig):
+    name = 'apps.accounts'
+
+    def ready(self):
+        from .authentication import invalidate_cached_user
+        from .models import User
+
+        post_save.connect(invalidate_cached_user, sender=User)
+        post_delete.connect(invalidate_cached_user, sender=User)
+        for through in (User.groups.through, User.user_permissions.through):
+            m2m_changed.connect(invalidate_cached_user, sender=through)
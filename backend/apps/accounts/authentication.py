@@ -0,0 +1,83 @@
+# backend/apps/accounts/authentication.py
+import copy
+from datetime import timedelta
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from apps.utils.lru import TTLCache
+
+user_cache = TTLCache(
+    max_size=getattr(settings, 'JWT_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'JWT_USER_CACHE_TTL', 60),
+)
+
+
+def invalidate_cached_user(sender, instance, reverse=False, pk_set=None, **kwargs):
+    if not reverse:
+        user_cache.delete(str(instance.pk))
+    elif pk_set is None:
+        # group.user_set.clear() does not say which users were affected
+        user_cache.clear()
+    else:
+        for pk in pk_set:
+            user_cache.delete(str(pk))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving ``request.user`` from an in-process user cache
+
+    The first request of a user loads the row as usual; later requests within
+    ``JWT_USER_CACHE_TTL`` seconds get a copy of the cached instance without
+    a query. Entries are dropped when the user is saved, deleted or has its
+    groups or permissions changed. ``JWT_USER_CACHE = False`` restores the
+    lookup on every request.
+    """
+
+    def get_user(self, validated_token):
+        if not getattr(settings, 'JWT_USER_CACHE', True):
+            return super().get_user(validated_token)
+
+        key = str(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, copy.copy(user))
+            return user
+
+        # Same checks as a fresh lookup, the cached row may predate the token
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        # Each request gets its own instance, so per-request caches stay local
+        return copy.copy(user)
+
+
+class StreamTicket(Token):
+    """
+    Short-lived JWT that only opens the notification stream (apps.reports.events)
+
+    EventSource cannot send headers, so the stream credential travels in the
+    query string, where access logs and browser history keep it. A ticket
+    is useless anywhere else, its own token type being rejected as an
+    access token, and expires after ``NOTIFICATION_STREAM_TICKET_SECONDS``.
+    ``session_exp`` carries the expiry of the access token it was issued
+    for: the stream ends then.
+    """
+    token_type = 'stream'
+    lifetime = timedelta(seconds=getattr(settings, 'NOTIFICATION_STREAM_TICKET_SECONDS', 60))
+
+    @classmethod
+    def for_request(cls, request):
+        ticket = cls.for_user(request.user)
+        # Without an access token, as with session login, the stream lasts as long as the ticket
+        access_token = request.auth
+        ticket['session_exp'] = access_token.get('exp', ticket['exp']) if access_token is not None else ticket['exp']
+        return ticket
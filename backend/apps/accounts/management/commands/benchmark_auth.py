@@ -0,0 +1,52 @@
+# backend/apps/accounts/management/commands/benchmark_auth.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.accounts.authentication import user_cache
+from apps.accounts.models import User
+
+
+class Command(BaseCommand):
+    help = ('Measure the authentication overhead per request with and without '
+            'the JWT user cache, and fail when cached requests still query the user')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per mode')
+
+    def handle(self, *args, **options):
+        # The test client's host, which ALLOWED_HOSTS need not list outside tests
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+            user = User.objects.create_user(username='benchmark-auth', password='benchmark-auth')
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+            results = {}
+            for mode, enabled in (('uncached', False), ('cached', True)):
+                with override_settings(JWT_USER_CACHE=enabled):
+                    user_cache.clear()
+                    results[mode] = self.measure(client, options['requests'])
+            user_cache.clear()
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'mode':<10} {'ms/request':>11} {'queries/request':>16}")
+        for mode, (ms, queries) in results.items():
+            self.stdout.write(f"{mode:<10} {ms:>11.3f} {queries:>16.2f}")
+        saved = results['uncached'][0] - results['cached'][0]
+        self.stdout.write(f"Cache saves {saved:.3f}ms per request on /api/users/me/")
+
+        if results['cached'][1] > 0:
+            raise CommandError('Cached requests still query the database')
+
+    def measure(self, client, requests):
+        # The first request fills the cache, it is not part of the measure
+        if client.get('/api/users/me/').status_code != 200:
+            raise CommandError('Authentication failed')
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(max(requests, 1)):
+                client.get('/api/users/me/')
+            elapsed = time.perf_counter() - started
+        return elapsed * 1000 / max(requests, 1), len(queries) / max(requests, 1)
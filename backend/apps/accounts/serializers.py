@@ -1,8 +1,9 @@
 # backend/apps/accounts/serializers.py
 from rest_framework import serializers
+from apps.utils.sparse_fields import SparseFieldsMixin
 from .models import User
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'profile_image')
@@ -5,12 +5,13 @@ from rest_framework.response import Response
 from .models import User
 from .serializers import UserSerializer, UserRegistrationSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
+from apps.utils.sparse_fields import SparseFieldsViewMixin
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for user management
     """
-    queryset = User.objects.all()
+    queryset = User.objects.order_by('id')
     serializer_class = UserSerializer
     
     def get_permissions(self):
@@ -0,0 +1,16 @@
+# backend/apps/invoices/apps.py
+from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def repair_search_indexes(sender, using, **kwargs):
+    from apps.utils.search import ensure_indexes
+    ensure_indexes(['invoice', 'invoice_item'], connections[using], repair_only=True)
+
+
+class InvoicesConfig(AppConfig):
+    name = 'apps.invoices'
+
+    def ready(self):
+        post_migrate.connect(repair_search_indexes, sender=self)
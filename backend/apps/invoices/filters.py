@@ -0,0 +1,27 @@
+# backend/apps/invoices/filters.py
+from django_filters import rest_framework as filters
+from apps.utils.filters import PrefixFilter
+from .models import Invoice
+
+
+class InvoiceFilter(filters.FilterSet):
+    """
+    Invoice filters, each backed by an index:
+    supplier / supplier prefix + amount -> invoice_supplier_amount_idx,
+    supplier key (normalized_supplier) + amount -> invoice_supplier_id_amount_idx,
+    status + invoice date range -> invoice_status_date_idx,
+    due date window -> invoice_due_date_idx,
+    invoice date range alone -> invoice_date_id_idx
+    """
+    status = filters.MultipleChoiceFilter(choices=Invoice.STATUS_CHOICES)
+    supplier_prefix = PrefixFilter(field_name='supplier')
+    date_from = filters.DateFilter(field_name='invoice_date', lookup_expr='gte')
+    date_to = filters.DateFilter(field_name='invoice_date', lookup_expr='lte')
+    due_from = filters.DateFilter(field_name='due_date', lookup_expr='gte')
+    due_to = filters.DateFilter(field_name='due_date', lookup_expr='lte')
+    amount_min = filters.NumberFilter(field_name='total_amount', lookup_expr='gte')
+    amount_max = filters.NumberFilter(field_name='total_amount', lookup_expr='lte')
+
+    class Meta:
+        model = Invoice
+        fields = ['status', 'supplier', 'normalized_supplier', 'uploaded_by', 'invoice_date', 'due_date']
@@ -0,0 +1,49 @@
+# backend/apps/invoices/management/commands/import_invoices.py
+import json
+from django.core.management.base import BaseCommand, CommandError
+from apps.accounts.models import User
+from apps.utils.invoice_import import FORMATS, detect_format, import_invoices, read_csv, read_jsonl
+
+
+class Command(BaseCommand):
+    help = 'Import invoices with their line items from a JSON lines or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--user', required=True, help='Username recorded as the uploader')
+        parser.add_argument('--format', dest='input_format', choices=FORMATS,
+                            help='Input format, from the file extension by default')
+        parser.add_argument('--upsert', action='store_true',
+                            help='Update invoices whose number exists and replace their items')
+        parser.add_argument('--chunk-size', type=int, help='Invoices per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without importing it')
+
+    def handle(self, *args, **options):
+        input_format = options['input_format'] or detect_format(options['path'])
+        if input_format is None:
+            raise CommandError('Cannot tell the format from the file name, pass --format')
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user {options['user']}")
+
+        reader = read_csv if input_format == 'csv' else read_jsonl
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                report = import_invoices(reader(lines), user, upsert=options['upsert'],
+                                         chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stdout.write(f"line {error['line']} ({error['invoice_number']}): {json.dumps(error['errors'])}")
+        if report['failed'] > len(report['errors']):
+            self.stdout.write(f"... {report['failed'] - len(report['errors'])} more errors")
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        style = self.style.SUCCESS if not report['failed'] else self.style.WARNING
+        self.stdout.write(style(
+            f"{prefix}{report['created']} invoices created, {report['updated']} updated, "
+            f"{report['failed']} failed, {report['items']} items in {report['elapsed_seconds']:.2f}s "
+            f"({report['invoices_per_second']} invoices/s)"
+        ))
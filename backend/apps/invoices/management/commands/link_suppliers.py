@@ -0,0 +1,24 @@
+# backend/apps/invoices/management/commands/link_suppliers.py
+import time
+from django.core.management.base import BaseCommand
+from apps.invoices.models import ArchivedInvoice, Invoice, Supplier, SupplierAlias
+from apps.utils.suppliers import link_invoices, supplier_index
+
+
+class Command(BaseCommand):
+    help = ('Resolve the supplier names of hot and archived invoices to suppliers, '
+            'creating the suppliers and aliases missing')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Relink every invoice, not only those without a supplier key')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = link_invoices(Invoice, Supplier, SupplierAlias, ArchivedInvoice, only_missing=not options['all'])
+        # Aliases were added behind the back of this process' index
+        supplier_index.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f"Linked {result['invoices']} invoices, {result['suppliers']} suppliers known "
+            f"({time.perf_counter() - started:.2f}s)"
+        ))
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from apps.utils.suppliers import link_invoices
+
+
+def backfill_suppliers(apps, schema_editor):
+    # Names are normalized and fuzzy-matched into suppliers, then every invoice is linked
+    link_invoices(apps.get_model('invoices', 'Invoice'), apps.get_model('invoices', 'Supplier'),
+                  apps.get_model('invoices', 'SupplierAlias'), apps.get_model('invoices', 'ArchivedInvoice'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0006_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Supplier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('normalized_name', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SupplierAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Supplier aliases',
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedinvoice',
+            name='normalized_supplier',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_invoices', to='invoices.supplier'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='normalized_supplier',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='invoices.supplier'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['normalized_supplier', 'total_amount'], name='invoice_supplier_id_amount_idx'),
+        ),
+        migrations.AddField(
+            model_name='supplieralias',
+            name='supplier',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='invoices.supplier'),
+        ),
+        migrations.RunPython(backfill_suppliers, migrations.RunPython.noop),
+    ]
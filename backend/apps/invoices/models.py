@@ -2,6 +2,31 @@ from django.db import models
 from apps.accounts.models import User
 import uuid
 
+class Supplier(models.Model):
+    """Supplier that invoice supplier names resolve to (apps.utils.suppliers)"""
+    name = models.CharField(max_length=100)
+    normalized_name = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class SupplierAlias(models.Model):
+    """Normalized spelling of a supplier name, the supplier's own included"""
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='aliases')
+    alias = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        verbose_name_plural = 'Supplier aliases'
+
+    def __str__(self):
+        return f"{self.alias} -> {self.supplier_id}"
+
+
 class Invoice(models.Model):
     """Model to store invoice data extracted via OCR"""
     STATUS_CHOICES = (
@@ -14,6 +39,9 @@ class Invoice(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     invoice_number = models.CharField(max_length=50, unique=True)
     supplier = models.CharField(max_length=100)
+    # Resolved from supplier on save; indexed through invoice_supplier_id_amount_idx
+    normalized_supplier = models.ForeignKey(Supplier, on_delete=models.SET_NULL, null=True, blank=True,
+                                            related_name='invoices', db_index=False)
     invoice_date = models.DateField()
     due_date = models.DateField()
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -26,10 +54,30 @@ class Invoice(models.Model):
     
     class Meta:
         ordering = ['-invoice_date']
+        indexes = [
+            # Keyset pagination on (invoice_date, id)
+            models.Index(fields=['invoice_date', 'id'], name='invoice_date_id_idx'),
+            # Supplier lookups with amount ranges (duplicate detection)
+            models.Index(fields=['supplier', 'total_amount'], name='invoice_supplier_amount_idx'),
+            # Supplier aggregates and duplicate detection on the supplier key
+            models.Index(fields=['normalized_supplier', 'total_amount'], name='invoice_supplier_id_amount_idx'),
+            # Status filters over a date range, due-date windows
+            models.Index(fields=['status', 'invoice_date'], name='invoice_status_date_idx'),
+            models.Index(fields=['due_date'], name='invoice_due_date_idx'),
+        ]
         
     def __str__(self):
         return f"Invoice {self.invoice_number} - {self.supplier}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'supplier' in update_fields:
+            from apps.utils.suppliers import supplier_index
+            self.normalized_supplier_id = supplier_index.resolve(self.supplier)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'normalized_supplier'}
+        return super().save(*args, **kwargs)
+
 
 class InvoiceItem(models.Model):
     """Model to store individual line items from invoices"""
@@ -40,4 +88,45 @@ class InvoiceItem(models.Model):
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     
     def __str__(self):
-        return f"{self.description} - {self.invoice.invoice_number}"
\ No newline at end of file
+        return f"{self.description} - {self.invoice.invoice_number}"
+
+class ArchivedInvoice(models.Model):
+    """Invoice of a closed period moved out of the hot table (apps.utils.archive)"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    # Not unique: a number can be reused in the hot table once archived
+    invoice_number = models.CharField(max_length=50, db_index=True)
+    supplier = models.CharField(max_length=100)
+    normalized_supplier = models.ForeignKey(Supplier, on_delete=models.SET_NULL, null=True, blank=True,
+                                            related_name='archived_invoices')
+    invoice_date = models.DateField()
+    due_date = models.DateField()
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    tax_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=Invoice.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_invoices')
+    original_file = models.FileField(upload_to='invoices/')
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-invoice_date']
+        indexes = [
+            models.Index(fields=['invoice_date', 'id'], name='archived_invoice_date_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"Invoice {self.invoice_number} - {self.supplier} (archived)"
+
+
+class ArchivedInvoiceItem(models.Model):
+    """Line item of an archived invoice, keeping its original id"""
+    id = models.BigIntegerField(primary_key=True)
+    invoice = models.ForeignKey(ArchivedInvoice, on_delete=models.CASCADE, related_name='items')
+    description = models.CharField(max_length=255)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.description} (archived)"
@@ -1,22 +1,58 @@
 # backend/apps/invoices/serializers.py
+from decimal import Decimal
 from rest_framework import serializers
-from .models import Invoice, InvoiceItem
+from apps.utils.sparse_fields import SparseFieldsMixin
+from .models import Invoice, InvoiceItem, Supplier
 
-class InvoiceItemSerializer(serializers.ModelSerializer):
+class InvoiceItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = InvoiceItem
         fields = ('id', 'description', 'quantity', 'unit_price', 'total_price')
 
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = InvoiceItemSerializer(many=True, read_only=True)
     uploaded_by_username = serializers.ReadOnlyField(source='uploaded_by.username')
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     
     class Meta:
         model = Invoice
-        fields = ('id', 'invoice_number', 'supplier', 'invoice_date', 'due_date', 
+        fields = ('id', 'invoice_number', 'supplier', 'normalized_supplier', 'invoice_date', 'due_date', 
                   'total_amount', 'tax_amount', 'status', 'status_display', 
                   'created_at', 'updated_at', 'uploaded_by', 'uploaded_by_username', 
                   'original_file', 'items')
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        # normalized_supplier is resolved from supplier on save
+        read_only_fields = ('id', 'normalized_supplier', 'created_at', 'updated_at')
+
+
+class InvoiceItemImportSerializer(serializers.ModelSerializer):
+    total_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+    class Meta:
+        model = InvoiceItem
+        fields = ('description', 'quantity', 'unit_price', 'total_price')
+
+    def validate(self, attrs):
+        if 'total_price' not in attrs:
+            attrs['total_price'] = (attrs['quantity'] * attrs['unit_price']).quantize(Decimal('0.01'))
+        return attrs
+
+
+class InvoiceImportSerializer(serializers.ModelSerializer):
+    """Invoice row of a bulk import (apps.utils.invoice_import), items nested"""
+    # Plain field: uniqueness is checked once per chunk, not with a query per row
+    invoice_number = serializers.CharField(max_length=50)
+    items = InvoiceItemImportSerializer(many=True, required=False)
+
+    class Meta:
+        model = Invoice
+        fields = ('invoice_number', 'supplier', 'invoice_date', 'due_date',
+                  'total_amount', 'tax_amount', 'status', 'items')
+
+
+class SupplierSerializer(serializers.ModelSerializer):
+    aliases = serializers.SlugRelatedField(many=True, read_only=True, slug_field='alias')
+
+    class Meta:
+        model = Supplier
+        fields = ('id', 'name', 'normalized_name', 'aliases', 'created_at')
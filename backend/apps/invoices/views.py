@@ -1,27 +1,66 @@
-from rest_framework import viewsets, parsers, status
+from rest_framework import viewsets, parsers, status, filters
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Invoice, InvoiceItem
-from .serializers import InvoiceSerializer, InvoiceItemSerializer
+from .models import Invoice, InvoiceItem, Supplier
+from apps.accounts.models import User
+from .serializers import InvoiceSerializer, InvoiceItemSerializer, SupplierSerializer
+from .filters import InvoiceFilter
 from django.db import transaction
 from rest_framework.exceptions import UnsupportedMediaType
 from apps.utils.ocr import process_invoice_ocr
+from apps.utils.notifications import notify_attention
+from apps.utils.pagination import KeysetPagination
+from apps.utils.fast_serialization import FastListMixin
+from apps.utils.conditional import ConditionalGetMixin
+from apps.utils.replica import use_replica
+from apps.utils.archive import archived_queryset
+from apps.utils.balances import quantize_cents
+from apps.utils.search import FullTextSearchFilter, fetch_ranked, get_limit
+from apps.utils.bulk import BulkTransitionMixin
+from apps.utils.invoice_import import FORMATS, detect_format, import_invoices, read_csv, read_jsonl
+from django.utils import timezone
 from django.conf import settings
 import os
+import io
 import csv
+from itertools import chain
 from django.http import HttpResponse
+from django.db.models import Count, Sum
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+# Invoices not yet validated or rejected, the only ones bulk actions decide on
+OPEN_INVOICE_STATUSES = ('pending', 'processing')
+
+
+class InvoiceViewSet(ConditionalGetMixin, FastListMixin, BulkTransitionMixin, viewsets.ModelViewSet):
     """
     ViewSet for invoice management with OCR capabilities
     """
-    queryset = Invoice.objects.all()
+    queryset = Invoice.objects.select_related('uploaded_by').prefetch_related('items')
     serializer_class = InvoiceSerializer
     parser_classes = [parsers.MultiPartParser, parsers.FormParser, parsers.JSONParser]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
+    filterset_class = InvoiceFilter
+    search_fields = ['invoice_number', 'supplier', 'items__description']
+    fulltext_indexes = ['invoice', 'invoice_item']
+    # Lists stay compact, items are sent with ?fields=...,items or on the detail view
+    list_omit_fields = ('items',)
+    conditional_models = [Invoice, InvoiceItem, User]
+    ordering = ['-invoice_date', '-id']
+    pagination_class = KeysetPagination
     
     def perform_create(self, serializer):
         serializer.save(uploaded_by=self.request.user)
     
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search on invoice numbers, suppliers and item descriptions
+        """
+        invoices = fetch_ranked(self.get_queryset(), self.fulltext_indexes,
+                                request.query_params.get('q', ''), limit=get_limit(request))
+        return Response(self.get_serializer(invoices, many=True).data)
+    
     @action(detail=False, methods=['post'], parser_classes=[parsers.MultiPartParser])
     def upload_with_ocr(self, request):
         """
@@ -59,14 +98,16 @@ class InvoiceViewSet(viewsets.ModelViewSet):
                 )
                 
                 # Create invoice items
-                for item in ocr_data.get('items', []):
-                    InvoiceItem.objects.create(
+                InvoiceItem.objects.bulk_create([
+                    InvoiceItem(
                         invoice=invoice,
                         description=item.get('description', ''),
                         quantity=item.get('quantity', 0),
                         unit_price=item.get('unit_price', 0),
                         total_price=item.get('total_price', 0)
                     )
+                    for item in ocr_data.get('items', [])
+                ])
             
             # Remove temp file
             os.remove(file_path)
@@ -78,14 +119,82 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             if os.path.exists(file_path):
                 os.remove(file_path)
             
+            notify_attention(
+                "Échec du traitement OCR",
+                f"{file.name} uploaded by {request.user.username} could not be processed: {e}",
+            )
             return Response({
                 'error': 'Failed to process invoice with OCR',
                 'details': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+    @action(detail=False, methods=['post'], parser_classes=[parsers.MultiPartParser])
+    def bulk_import(self, request):
+        """
+        Import invoices with their items from an uploaded JSON lines or CSV file
+
+        Form fields: ``file``, ``input_format`` (``jsonl`` or ``csv``, from the
+        file extension by default), ``upsert`` and ``dry_run`` (``true``/``false``)
+        """
+        if 'file' not in request.FILES:
+            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+        file = request.FILES['file']
+        input_format = request.data.get('input_format') or detect_format(file.name)
+        if input_format not in FORMATS:
+            return Response({'error': f"input_format must be one of {', '.join(FORMATS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        def flag(name):
+            return str(request.data.get(name, '')).lower() in ('1', 'true', 'yes', 'on')
+
+        lines = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        records = read_csv(lines) if input_format == 'csv' else read_jsonl(lines)
+        try:
+            report = import_invoices(records, request.user, upsert=flag('upsert'), dry_run=flag('dry_run'))
+        except UnicodeDecodeError:
+            return Response({'error': 'The file must be UTF-8 encoded'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+
+    @action(detail=False, methods=['post'])
+    def bulk_validate(self, request):
+        """
+        Validate the open invoices selected by ``ids`` or ``filter``
+        """
+        return self.bulk_transition(request, OPEN_INVOICE_STATUSES, status='validated', updated_at=timezone.now())
+
+    @action(detail=False, methods=['post'])
+    def bulk_reject(self, request):
+        """
+        Reject the open invoices selected by ``ids`` or ``filter``, they end in the error status
+        """
+        return self.bulk_transition(request, OPEN_INVOICE_STATUSES, status='error', updated_at=timezone.now())
         
+    def get_archived_queryset(self, request):
+        """
+        Archived invoices matching the request filters, or None when there are none
+
+        Only the invoice date range is checked for before filtering, through
+        the archive's date index: an export after the archive cutoff never
+        scans it.
+        """
+        filterset = self.filterset_class(request.query_params, queryset=Invoice.objects.none(), request=request)
+        dates = {
+            f"{filterset.filters[name].field_name}__{filterset.filters[name].lookup_expr}": value
+            for name in ('date_from', 'date_to')
+            if filterset.is_valid() and (value := filterset.form.cleaned_data.get(name))
+        }
+        archived = archived_queryset(Invoice, **dates)
+        if archived is None:
+            return None
+        archived = self.filterset_class(request.query_params, queryset=archived, request=request).qs
+        # The archive has no full-text index, ?search= uses LIKE there
+        archived = filters.SearchFilter().filter_queryset(request, archived, self)
+        return archived.order_by(*self.ordering)
+    
     # Ajoutez cette action à InvoiceViewSet
     @action(detail=False, methods=['get'])
+    @use_replica()
     def export(self, request):
         """
         Export invoices as CSV
@@ -101,8 +210,13 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         writer.writerow(['Numéro de facture', 'Fournisseur', 'Date de facture', 
                         'Date d\'échéance', 'Montant total', 'Montant TVA', 'Statut'])
         
-        # Write data rows
-        for invoice in queryset:
+        # Write data rows, streamed in chunks from the filtered index scan;
+        # archived invoices matching the same filters follow the hot ones
+        rows = queryset.iterator(chunk_size=2000)
+        archived = self.get_archived_queryset(request)
+        if archived is not None:
+            rows = chain(rows, archived.iterator(chunk_size=2000))
+        for invoice in rows:
             writer.writerow([
                 invoice.invoice_number,
                 invoice.supplier,
@@ -114,3 +228,38 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             ])
         
         return response
+
+
+class SupplierViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Suppliers that invoice supplier names resolve to, with their aliases
+    """
+    queryset = Supplier.objects.prefetch_related('aliases').order_by('name', 'id')
+    serializer_class = SupplierSerializer
+    filter_backends = [filters.SearchFilter]
+    search_fields = ['name', 'aliases__alias']
+
+    @action(detail=False, methods=['get'])
+    @use_replica()
+    def summary(self, request):
+        """
+        Invoice count and amounts per supplier, largest total first, over
+        invoices dated between ?date_from= and ?date_to= (both optional)
+        """
+        invoices = InvoiceFilter(request.query_params, queryset=Invoice.objects.all(), request=request)
+        if not invoices.is_valid():
+            errors = {name: [str(message) for message in messages] for name, messages in invoices.errors.items()}
+            return Response({'error': errors}, status=status.HTTP_400_BAD_REQUEST)
+        # Grouped on the integer key through invoice_supplier_id_amount_idx
+        rows = list(invoices.qs.filter(normalized_supplier__isnull=False).values('normalized_supplier').annotate(
+            invoice_count=Count('id'), total_amount=Sum('total_amount'), tax_amount=Sum('tax_amount'),
+        ).order_by('-total_amount')[:get_limit(request)])
+        names = dict(Supplier.objects.filter(pk__in=[row['normalized_supplier'] for row in rows]).values_list('pk', 'name'))
+        # Amounts as the invoice serializer renders them: strings, to the cent
+        return Response([{
+            'supplier': row['normalized_supplier'],
+            'name': names.get(row['normalized_supplier']),
+            'invoice_count': row['invoice_count'],
+            'total_amount': str(quantize_cents(row['total_amount'])),
+            'tax_amount': str(quantize_cents(row['tax_amount'])),
+        } for row in rows])
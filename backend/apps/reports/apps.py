@@ -0,0 +1,16 @@
+# backend/apps/reports/apps.py
+from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def repair_version_tracking(sender, using, **kwargs):
+    from apps.utils.conditional import ensure_version_tracking
+    ensure_version_tracking(connections[using], repair_only=True)
+
+
+class ReportsConfig(AppConfig):
+    name = 'apps.reports'
+
+    def ready(self):
+        post_migrate.connect(repair_version_tracking, sender=self)
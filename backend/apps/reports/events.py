@@ -0,0 +1,148 @@
+# backend/apps/reports/events.py
+import asyncio
+import io
+import time
+from asgiref.sync import sync_to_async
+from corsheaders.middleware import CorsMiddleware
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from apps.accounts.authentication import CachedJWTAuthentication, StreamTicket
+from apps.utils.notifications import stream_message, unread_count, user_channel
+from apps.utils.pubsub import OVERFLOW, get_broker
+
+# Served by notification_stream through config.asgi
+STREAM_PATH = '/api/notifications/stream/'
+
+
+def _format(message):
+    return f"event: {message['event']}\ndata: {message['data']}\n\n".encode()
+
+
+def _authenticate(request):
+    """
+    Resolve the user of an access token given in the Authorization header
+    or, since EventSource cannot set headers, of a ``StreamTicket`` in the
+    ``ticket`` query parameter; access tokens are never accepted there
+
+    Returns:
+        tuple: (user, timestamp at which the stream ends)
+    """
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is not None:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token), validated_token.get('exp', time.time() + 3600)
+    raw_ticket = request.GET.get('ticket')
+    if not raw_ticket:
+        raise AuthenticationFailed('Authentication credentials were not provided.')
+    ticket = StreamTicket(raw_ticket)
+    return authentication.get_user(ticket), ticket.get('session_exp', ticket['exp'])
+
+
+def _detached(func):
+    """
+    Run ``func`` in a worker thread, then close the database connections it opened
+
+    Streams stay open for as long as their token lives; each would otherwise
+    hold its own database connection all that time.
+    """
+    @sync_to_async
+    def wrapper(*args):
+        try:
+            return func(*args)
+        finally:
+            connections.close_all()
+    return wrapper
+
+
+async def _start(send, request, response):
+    # Same CORS headers as the rest of the API
+    CorsMiddleware(lambda request: response).add_response_headers(request, response)
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in response.items()],
+    })
+
+
+async def notification_stream(scope, receive, send):
+    """
+    ASGI application serving the Server-Sent Events stream of a user's notifications
+
+    Sends ``unread_count`` on connect and after every change, ``notification``
+    for each new notification and ``resync`` when the client fell behind and
+    should refetch the list. A comment line every
+    ``NOTIFICATION_STREAM_HEARTBEAT`` seconds keeps proxies from closing idle
+    connections. The stream ends when the access token it was opened with
+    expires; the client then reconnects with a new ticket.
+
+    ``config.asgi`` routes ``STREAM_PATH`` here ahead of Django: past the
+    handshake, an idle stream is one coroutine waiting on its queue and on
+    the client, with no request object, middleware, thread or database
+    connection held.
+    """
+    message = await receive()
+    while message['type'] == 'http.request' and message.get('more_body'):
+        message = await receive()
+    if message['type'] == 'http.disconnect':
+        return
+
+    request = ASGIRequest(scope, io.BytesIO())
+    try:
+        user, expires_at = await _detached(_authenticate)(request)
+    except (AuthenticationFailed, InvalidToken, TokenError) as e:
+        detail = getattr(e, 'detail', str(e))
+        if isinstance(detail, dict):
+            detail = detail.get('detail', detail)
+        response = JsonResponse({'error': str(detail)}, status=401)
+        await _start(send, request, response)
+        await send({'type': 'http.response.body', 'body': response.content})
+        return
+
+    response = HttpResponse(content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stops nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    await _start(send, request, response)
+    # The coroutine frame lives as long as the stream, keep nothing of the handshake
+    del request, response
+
+    heartbeat = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 25)
+    retry_ms = getattr(settings, 'NOTIFICATION_STREAM_RETRY_MS', 5000)
+
+    async def push(body):
+        await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+    # Subscribed before counting, so no change can fall in between
+    subscription = get_broker().subscribe(user_channel(user.pk))
+    disconnect = asyncio.ensure_future(receive())
+    pending = None
+    try:
+        await push(f"retry: {retry_ms}\n\n".encode())
+        count = await _detached(unread_count)(user.pk)
+        await push(_format(stream_message('unread_count', {'unread_count': count})))
+        while (remaining := expires_at - time.time()) > 0:
+            pending = pending or asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                {pending, disconnect}, timeout=min(heartbeat, remaining), return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnect in done:
+                return
+            if pending not in done:
+                await push(b': ping\n\n')
+                continue
+            message, pending = pending.result(), None
+            await push(_format(message))
+            if message is OVERFLOW:
+                count = await _detached(unread_count)(user.pk)
+                await push(_format(stream_message('unread_count', {'unread_count': count})))
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        subscription.close()
+        for task in (pending, disconnect):
+            if task is not None:
+                task.cancel()
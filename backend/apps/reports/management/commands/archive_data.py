@@ -0,0 +1,30 @@
+# backend/apps/reports/management/commands/archive_data.py
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.utils.archive import archive, default_cutoff
+
+
+class Command(BaseCommand):
+    help = ('Move closed transactions and invoices dated before the cutoff from the hot '
+            'tables to the archive tables')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', type=date.fromisoformat,
+                            help='Cutoff date (YYYY-MM-DD), defaults to the start of the retention window')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Count the rows without moving them')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            result = archive(options['before'], batch_size=options['batch_size'], dry_run=options['dry_run'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Archived {result['transactions']} transactions and {result['invoices']} invoices "
+            f"dated before {result['cutoff']} in {time.perf_counter() - started:.2f}s "
+            f"(retention starts {default_cutoff()})"
+        ))
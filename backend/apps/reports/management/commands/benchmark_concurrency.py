@@ -0,0 +1,109 @@
+# backend/apps/reports/management/commands/benchmark_concurrency.py
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.db.models import Sum
+from apps.transactions.models import BankAccount, Transaction
+from config.databases import PROFILES, database_config
+
+
+class Command(BaseCommand):
+    help = ('Run threads of mixed writes and reads against a fresh database for each '
+            'profile and compare throughput, latency and lock errors')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=['sqlite-default', 'sqlite'], choices=PROFILES)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--operations', type=int, default=200, help='Operations per thread')
+        parser.add_argument('--write-ratio', type=float, default=0.3, help='Share of operations that write')
+        parser.add_argument('--postgres-name', help='Scratch PostgreSQL database, migrated by the benchmark')
+
+    def handle(self, *args, **options):
+        if 'postgres' in options['profiles'] and not options['postgres_name']:
+            raise CommandError('--postgres-name is required for the postgres profile')
+
+        directory = tempfile.mkdtemp(prefix='benchmark-concurrency-')
+        self.stdout.write(f"{'profile':<16} {'ops/s':>8} {'p50':>9} {'p95':>9} {'lock errors':>12}")
+        try:
+            for profile in options['profiles']:
+                name = options['postgres_name'] if profile == 'postgres' else os.path.join(directory, f"{profile}.sqlite3")
+                alias = self.add_database(profile, name)
+                try:
+                    self.run_profile(profile, alias, options)
+                finally:
+                    connections[alias].close()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def add_database(self, profile, name):
+        alias = f"benchmark_{profile.replace('-', '_')}"
+        databases = dict(connections.settings, **{alias: database_config(profile, name=name)})
+        connections.settings[alias] = connections.configure_settings(databases)[alias]
+        return alias
+
+    def run_profile(self, profile, alias, options):
+        call_command('migrate', database=alias, verbosity=0)
+        account = BankAccount.objects.using(alias).create(
+            account_name=f"Benchmark {profile}", account_number='000', bank_name='Benchmark', current_balance=0
+        )
+        results = []
+        threads = [
+            threading.Thread(target=self.worker, args=(alias, account.pk, options, seed, results))
+            for seed in range(options['threads'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(timing for thread_timings, _ in results for timing in thread_timings)
+        errors = sum(thread_errors for _, thread_errors in results)
+        p50 = statistics.median(timings) if timings else 0
+        p95 = timings[int(len(timings) * 0.95) - 1] if timings else 0
+        self.stdout.write(f"{profile:<16} {len(timings) / elapsed:>8.0f} {p50:>7.2f}ms {p95:>7.2f}ms {errors:>12}")
+        BankAccount.objects.using(alias).filter(pk=account.pk).delete()
+
+    def worker(self, alias, account_id, options, seed, results):
+        rng = random.Random(seed)
+        timings, errors = [], 0
+        today = date.today()
+        try:
+            for _ in range(options['operations']):
+                started = time.perf_counter()
+                try:
+                    if rng.random() < options['write_ratio']:
+                        amount = Decimal(rng.randrange(100, 100000)) / 100
+                        # Inserts the row and updates the account balance in one transaction
+                        Transaction.objects.using(alias).create(
+                            transaction_date=today - timedelta(days=rng.randrange(365)),
+                            amount=amount,
+                            description=f"Benchmark {rng.randrange(10 ** 6)}",
+                            transaction_type='income',
+                            status='completed',
+                            bank_account_id=account_id,
+                        )
+                    else:
+                        transactions = Transaction.objects.using(alias).filter(bank_account_id=account_id)
+                        list(transactions.order_by('-transaction_date', '-id')[:20])
+                        transactions.aggregate(total=Sum('amount'))
+                except OperationalError:
+                    errors += 1
+                    continue
+                finally:
+                    # What Django does at the end of every request
+                    connections[alias].close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connections[alias].close()
+        results.append((timings, errors))
@@ -0,0 +1,86 @@
+# backend/apps/reports/management/commands/benchmark_forecast.py
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.transactions.models import BankAccount, Transaction
+from apps.utils.forecast import forecast, forecast_cache, project
+
+
+def seed_accounts(accounts, transactions, history_days, seed=0):
+    # Accounts with settled flows spread over the history the forecast reads;
+    # callers run inside transaction.atomic() and roll back
+    rng = random.Random(seed)
+    today = date.today()
+    created = BankAccount.objects.bulk_create([
+        BankAccount(account_name=f"Benchmark {i}", account_number=f"BENCH-{i}", bank_name='Benchmark',
+                    current_balance=Decimal(rng.randrange(0, 10000000)) / 100)
+        for i in range(accounts)
+    ], batch_size=1000)
+    Transaction.objects.bulk_create([
+        Transaction(
+            transaction_date=today - timedelta(days=rng.randrange(1, history_days + 1)),
+            amount=Decimal(rng.randrange(1000, 500000)) / 100,
+            description=f"Benchmark forecast {i}",
+            transaction_type=rng.choice(('income', 'expense', 'expense')),
+            status=rng.choice(('completed', 'reconciled')),
+            bank_account=rng.choice(created),
+        )
+        for i in range(transactions)
+    ], batch_size=1000)
+
+
+class Command(BaseCommand):
+    help = ('Time the cash-flow forecast of all bank accounts, queries included, on seeded accounts '
+            'and transactions, and check that a noiseless weekly pattern is projected exactly')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=1000, help='Bank accounts seeded')
+        parser.add_argument('--transactions', type=int, default=100000, help='Settled transactions seeded')
+        parser.add_argument('--days', type=int, default=365, help='Days forecast')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs timed, the median is reported')
+        parser.add_argument('--max-ms', type=float, default=3000, help='Budget of one forecast in milliseconds')
+
+    def handle(self, *args, **options):
+        import numpy as np
+
+        accounts, horizon = options['accounts'], options['days']
+        days = getattr(settings, 'FORECAST_HISTORY_DAYS', 365)
+        rng = np.random.default_rng(0)
+        first_day = date.today() - timedelta(days=days)
+
+        # Every account repeats its own weekly pattern around its own level
+        weekly = rng.normal(0, 500, (accounts, 7))
+        level = rng.normal(50, 100, (accounts, 1))
+        weekday = (np.datetime64(first_day, 'D') + np.arange(days + horizon)).astype('int64') + 3
+        pattern = level + weekly[:, weekday % 7]
+        balances = rng.uniform(0, 100000, accounts)
+
+        result = project(pattern[:, :days], balances, first_day, horizon, trend_days=91)
+        expected = balances[:, None] + np.cumsum(pattern[:, days:], axis=1)
+        if not np.allclose(result, expected):
+            raise CommandError('A noiseless weekly pattern is not projected exactly')
+
+        runs = []
+        with transaction.atomic():
+            seed_accounts(accounts, options['transactions'], days)
+            for _ in range(max(options['repeat'], 1)):
+                # Each run reads the tables, not the previous run's result
+                forecast_cache.clear()
+                started = time.perf_counter()
+                result = forecast(horizon)
+                runs.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+        forecast_cache.clear()
+
+        elapsed_ms = statistics.median(runs)
+        self.stdout.write(f"{len(result['accounts'])} accounts x {horizon} days from {days} days of history "
+                          f"and {options['transactions']} seeded transactions: "
+                          f"{elapsed_ms:.1f}ms (budget {options['max_ms']:.0f}ms)")
+        if elapsed_ms > options['max_ms']:
+            raise CommandError(f"The forecast takes {elapsed_ms:.1f}ms, budget is {options['max_ms']:.0f}ms")
+        self.stdout.write(self.style.SUCCESS('Forecast within budget'))
@@ -0,0 +1,117 @@
+# backend/apps/reports/management/commands/benchmark_queries.py
+import json
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from apps.invoices.filters import InvoiceFilter
+from apps.invoices.models import Invoice
+from apps.transactions.models import Transaction
+from apps.reports.models import Anomaly, Notification
+from apps.utils.synthetic import seed_synthetic_data
+
+
+class Command(BaseCommand):
+    help = ('Seed synthetic data, run the hot production queries, check with EXPLAIN '
+            'that each one uses its index and record timings')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Number of synthetic transactions to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query, the median is reported')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='JSON results of a previous run to compare against')
+        parser.add_argument('--max-regression', type=float, default=1.5,
+                            help='Fail when a query is this many times slower than the baseline')
+        parser.add_argument('--min-regression-ms', type=float, default=1.0,
+                            help='Ignore slowdowns smaller than this many milliseconds (timer noise)')
+        parser.add_argument('--keep-data', action='store_true',
+                            help='Keep the synthetic rows instead of rolling them back')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            context = seed_synthetic_data(options['rows'])
+            results = self.run_queries(context, options['repeat'])
+            if not options['keep_data']:
+                transaction.set_rollback(True)
+
+        failures = []
+        baseline = {}
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        for name, result in results.items():
+            status = 'OK'
+            if not result['index_used']:
+                status = 'NO INDEX'
+                failures.append(f"{name}: expected one of {', '.join(result['expected_indexes'])}")
+            previous = baseline.get(name)
+            if (previous
+                    and result['median_ms'] > previous['median_ms'] * options['max_regression']
+                    and result['median_ms'] - previous['median_ms'] > options['min_regression_ms']):
+                status = 'REGRESSION'
+                failures.append(f"{name}: {result['median_ms']:.2f}ms vs {previous['median_ms']:.2f}ms baseline")
+            self.stdout.write(f"{name:<32} {result['median_ms']:>9.2f}ms  {status}")
+            if status == 'NO INDEX':
+                self.stdout.write(f"    {result['plan']}")
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+
+        if failures:
+            raise CommandError('Query benchmark failed:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} queries use their indexes"))
+
+    def get_queries(self, context):
+        """
+        Return (name, expected index names, queryset) for each hot query
+        """
+        return [
+            ('income_statement_sum', ('transaction_type_date_idx',),
+             Transaction.objects.filter(
+                 transaction_type='income', transaction_date__range=[context['start'], context['end']]
+             ).values('transaction_type').annotate(total=Sum('amount')).order_by()),
+            ('transactions_by_type_and_date', ('transaction_type_date_idx',),
+             Transaction.objects.filter(
+                 transaction_type='expense', transaction_date__range=[context['start'], context['end']]
+             ).order_by('-transaction_date')[:10]),
+            ('transactions_by_status_and_date', ('transaction_status_date_idx',),
+             Transaction.objects.filter(
+                 status='pending', transaction_date__range=[context['start'], context['end']]
+             ).order_by('-transaction_date')[:10]),
+            ('transactions_keyset_page', ('transaction_date_id_idx',),
+             Transaction.objects.order_by('-transaction_date', '-id')[:11]),
+            ('invoices_supplier_amount', ('invoice_supplier_amount_idx',),
+             Invoice.objects.filter(
+                 supplier=context['supplier'], total_amount__gte=100, total_amount__lte=5000
+             ).values('id')[:1]),
+            ('invoices_supplier_prefix', ('invoice_supplier_amount_idx',),
+             InvoiceFilter({'supplier_prefix': 'Fournisseur 1'}, queryset=Invoice.objects.all()).qs[:10]),
+            ('invoices_due_window', ('invoice_due_date_idx',),
+             Invoice.objects.filter(due_date__range=[context['start'], context['end']]).values('id')),
+            ('anomalies_by_status', ('anomaly_status_detected_idx',),
+             Anomaly.objects.filter(status='new').order_by('-detected_at')[:10]),
+            ('anomalies_by_type', ('anomaly_type_detected_idx',),
+             Anomaly.objects.filter(anomaly_type='duplicate_invoice').order_by('-detected_at')[:10]),
+            ('notifications_unread', ('notification_user_read_idx',),
+             Notification.objects.filter(user=context['user'], read=False).order_by('-created_at')[:10]),
+        ]
+
+    def run_queries(self, context, repeat):
+        results = {}
+        for name, expected_indexes, queryset in self.get_queries(context):
+            plan = queryset.explain()
+            timings = []
+            for _ in range(max(repeat, 1)):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {
+                'median_ms': statistics.median(timings),
+                'expected_indexes': list(expected_indexes),
+                'index_used': any(index in plan for index in expected_indexes),
+                'plan': plan,
+            }
+        return results
@@ -0,0 +1,69 @@
+# backend/apps/reports/management/commands/benchmark_serialization.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.invoices.views import InvoiceViewSet
+from apps.transactions.views import TransactionViewSet
+from apps.reports.views import AnomalyViewSet
+from apps.utils.fast_serialization import get_values_plan
+from apps.utils.renderers import FastJSONRenderer
+from apps.utils.synthetic import seed_synthetic_data
+
+VIEWSETS = (
+    ('transactions', TransactionViewSet),
+    ('invoices', InvoiceViewSet),
+    ('anomalies', AnomalyViewSet),
+)
+
+
+class Command(BaseCommand):
+    help = ('Compare rows per second of the serializer list path and the .values() '
+            'fast path, and check that both render the same bytes')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Number of synthetic transactions to seed')
+        parser.add_argument('--limit', type=int, default=5000, help='Rows serialized per run')
+
+    def handle(self, *args, **options):
+        failures = []
+
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+            request = Request(APIRequestFactory().get('/'))
+            seed_synthetic_data(options['rows'])
+            self.stdout.write(f"{'endpoint':<14} {'rows':>6} {'serializer':>14} {'fast path':>14} {'speedup':>8}")
+
+            for name, viewset in VIEWSETS:
+                queryset = viewset.queryset.order_by(*viewset.ordering)[:options['limit']]
+                serializer_class = viewset.serializer_class
+                plan = get_values_plan(serializer_class)
+                if plan is None:
+                    failures.append(f"{name}: serializer has fields the fast path cannot express")
+                    continue
+
+                started = time.perf_counter()
+                rows = list(queryset.all())
+                expected = JSONRenderer().render(
+                    serializer_class(rows, many=True, context={'request': request}).data
+                )
+                slow = time.perf_counter() - started
+
+                started = time.perf_counter()
+                actual = FastJSONRenderer().render(plan.serialize(plan.values(queryset.all()), request))
+                fast = time.perf_counter() - started
+
+                if actual != expected:
+                    failures.append(f"{name}: fast path output differs from the serializer output")
+                count = len(rows)
+                self.stdout.write(
+                    f"{name:<14} {count:>6} {count / slow:>10.0f} r/s {count / fast:>10.0f} r/s {slow / fast:>7.1f}x"
+                )
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError('\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('Fast path output is byte-identical'))
@@ -0,0 +1,71 @@
+# backend/apps/reports/management/commands/benchmark_startup.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Libraries only some code paths need; none of them may be loaded at startup
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib', 'cv2', 'pytesseract')
+
+# Run in a fresh interpreter: this process has already paid for its imports
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.conf import settings
+from django.urls import get_resolver
+get_resolver(settings.ROOT_URLCONF).url_patterns
+elapsed_ms = (time.perf_counter() - started) * 1000
+peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+rss_mb = peak_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+print(json.dumps({
+    'elapsed_ms': elapsed_ms,
+    'rss_mb': rss_mb,
+    'modules': [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = ('Measure the import time and peak RSS of a worker after django.setup() and '
+            'URL loading, and fail above the configured budget')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters started, the median is reported')
+        parser.add_argument('--max-ms', type=float, default=getattr(settings, 'STARTUP_TIME_BUDGET_MS', 1000),
+                            help='Startup time budget in milliseconds')
+        parser.add_argument('--max-rss', type=float, default=getattr(settings, 'STARTUP_RSS_BUDGET_MB', 100),
+                            help='Peak RSS budget in megabytes')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'))
+        runs = []
+        for _ in range(max(options['repeat'], 1)):
+            result = subprocess.run([sys.executable, '-c', PROBE % (HEAVY_MODULES,)], env=env,
+                                    cwd=settings.BASE_DIR, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise CommandError(f"Startup probe failed:\n{result.stderr}")
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        elapsed_ms = statistics.median(run['elapsed_ms'] for run in runs)
+        rss_mb = statistics.median(run['rss_mb'] for run in runs)
+        modules = sorted({name for run in runs for name in run['modules']})
+        self.stdout.write(f"startup   {elapsed_ms:>8.1f}ms  (budget {options['max_ms']:.0f}ms)")
+        self.stdout.write(f"peak RSS  {rss_mb:>8.1f}MB  (budget {options['max_rss']:.0f}MB)")
+        self.stdout.write(f"heavy modules loaded: {', '.join(modules) or 'none'}")
+
+        failures = []
+        if elapsed_ms > options['max_ms']:
+            failures.append(f"startup takes {elapsed_ms:.1f}ms, budget is {options['max_ms']:.0f}ms")
+        if rss_mb > options['max_rss']:
+            failures.append(f"peak RSS is {rss_mb:.1f}MB, budget is {options['max_rss']:.0f}MB")
+        if modules:
+            failures.append(f"loaded at startup: {', '.join(modules)}")
+        if failures:
+            raise CommandError('Startup budget exceeded:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('Startup within budget'))
@@ -0,0 +1,30 @@
+# backend/apps/reports/management/commands/check_query_budgets.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from apps.utils.query_budget import ENDPOINT_BUDGETS, check_endpoint_budgets
+from apps.utils.synthetic import seed_synthetic_data
+
+
+class Command(BaseCommand):
+    help = ('Request every list endpoint at several page sizes and fail when one '
+            'exceeds its query budget or its query count grows with the page size')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Number of synthetic transactions to seed')
+
+    def handle(self, *args, **options):
+        # The test client's host, which ALLOWED_HOSTS need not list outside tests
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+            context = seed_synthetic_data(options['rows'])
+            client = APIClient()
+            client.force_authenticate(context['user'])
+            counts, failures = check_endpoint_budgets(client)
+            transaction.set_rollback(True)
+
+        for endpoint, budget in ENDPOINT_BUDGETS.items():
+            self.stdout.write(f"{endpoint:<32} budget {budget}  queries {counts[endpoint]}")
+        if failures:
+            raise CommandError('Query budget check failed:\n' + '\n\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS(f"{len(ENDPOINT_BUDGETS)} endpoints within budget"))
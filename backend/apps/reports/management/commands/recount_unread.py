@@ -0,0 +1,19 @@
+# backend/apps/reports/management/commands/recount_unread.py
+import time
+from django.core.management.base import BaseCommand
+from apps.utils.notifications import recount_unread
+
+
+class Command(BaseCommand):
+    help = 'Reset the per-user unread notification counters from the notification table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='User id, repeat for several (default: all users)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = recount_unread(options['users'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Recounted unread notifications of {written} users in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,26 @@
+# backend/apps/reports/management/commands/refresh_tax_periods.py
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+from apps.utils.vat import refresh_tax_periods
+
+
+class Command(BaseCommand):
+    help = ('Recompute the stored VAT figures of the closed periods not filed yet, after '
+            'invoices or transactions were written with dates in them')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', type=date.fromisoformat,
+                            help='First day (YYYY-MM-DD) of the periods refreshed, default all')
+        parser.add_argument('--end-date', type=date.fromisoformat,
+                            help='Last day (YYYY-MM-DD) of the periods refreshed, default all')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        changes = refresh_tax_periods(options['start_date'], options['end_date'])
+        for period, old, new in changes:
+            self.stdout.write(f"{period.start_date} to {period.end_date}: "
+                              f"{len(old)} lines -> {len(new) if new else 'removed, no rows'}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {len(changes)} periods in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,33 @@
+# backend/apps/reports/management/commands/sync_replica.py
+import sqlite3
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from apps.utils.replica import REPLICA_ALIAS, replica_configured
+
+
+class Command(BaseCommand):
+    help = ('Copy the primary SQLite database into the local replica file, '
+            'for running the read replica setup without a replicated server')
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('No replica database configured, set DB_REPLICA_NAME')
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[REPLICA_ALIAS]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('sync_replica only copies SQLite files; use the server replication otherwise')
+
+        started = time.perf_counter()
+        replica.close()
+        # The backup API copies a consistent snapshot, even while the primary is written to
+        source = sqlite3.connect(primary.settings_dict['NAME'])
+        target = sqlite3.connect(replica.settings_dict['NAME'])
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Copied {primary.settings_dict['NAME']} to {replica.settings_dict['NAME']} "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,30 @@
+# backend/apps/reports/management/commands/unarchive_data.py
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.utils.archive import unarchive
+
+
+class Command(BaseCommand):
+    help = 'Move archived transactions and invoices of a date range back to the hot tables, for audits'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', type=date.fromisoformat, help='First date restored (YYYY-MM-DD)')
+        parser.add_argument('--end-date', type=date.fromisoformat, help='Last date restored (YYYY-MM-DD)')
+        parser.add_argument('--all', action='store_true', help='Restore the whole archive')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows moved per transaction')
+
+    def handle(self, *args, **options):
+        if not (options['start_date'] or options['end_date'] or options['all']):
+            raise CommandError('Give --start-date and/or --end-date, or --all')
+
+        started = time.perf_counter()
+        result = unarchive(options['start_date'], options['end_date'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Restored {result['transactions']} transactions and {result['invoices']} invoices "
+            f"in {time.perf_counter() - started:.2f}s"
+        ))
+        if result['skipped_invoices']:
+            self.stdout.write(self.style.WARNING(
+                f"{result['skipped_invoices']} invoices kept in the archive: their number is used by a hot invoice"
+            ))
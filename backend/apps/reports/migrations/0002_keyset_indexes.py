@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='anomaly',
+            index=models.Index(fields=['detected_at', 'id'], name='anomaly_detected_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:57
+
+from django.db import migrations, models
+
+
+def create_version_triggers(apps, schema_editor):
+    from apps.utils.conditional import ensure_version_tracking
+    ensure_version_tracking(schema_editor.connection)
+
+
+def drop_version_triggers(apps, schema_editor):
+    from apps.utils.conditional import drop_version_tracking
+    drop_version_tracking(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_composite_indexes'),
+        ('accounts', '0001_initial'),
+        ('invoices', '0005_fulltext_search'),
+        ('transactions', '0005_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('table_name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(create_version_triggers, drop_version_triggers),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_unread(apps, schema_editor):
+    Notification = apps.get_model('reports', 'Notification')
+    NotificationCounter = apps.get_model('reports', 'NotificationCounter')
+    NotificationCounter.objects.bulk_create([
+        NotificationCounter(user_id=user_id, unread=unread)
+        for user_id, unread in Notification.objects.filter(read=False).values('user_id').annotate(
+            unread=Count('pk')
+        ).values_list('user_id', 'unread').order_by()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('reports', '0004_table_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0005_notification_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAnomaly',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('anomaly_type', models.CharField(choices=[('duplicate_invoice', 'Facture en double'), ('amount_mismatch', 'Montant incohérent'), ('missing_data', 'Données manquantes'), ('unusual_transaction', 'Transaction inhabituelle')], max_length=30)),
+                ('description', models.TextField()),
+                ('status', models.CharField(choices=[('new', 'Nouveau'), ('investigating', "En cours d'investigation"), ('resolved', 'Résolu'), ('false_positive', 'Faux positif')], max_length=20)),
+                ('related_invoice_id', models.UUIDField(blank=True, null=True)),
+                ('related_transaction_id', models.UUIDField(blank=True, null=True)),
+                ('detected_at', models.DateTimeField()),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Archived anomalies',
+                'ordering': ['-detected_at'],
+                'indexes': [models.Index(fields=['detected_at', 'id'], name='archived_anomaly_detected_idx')],
+            },
+        ),
+    ]
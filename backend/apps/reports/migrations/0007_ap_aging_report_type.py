@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_archived_anomaly'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='report',
+            name='report_type',
+            field=models.CharField(choices=[('income_statement', 'Compte de résultat'), ('balance_sheet', 'Bilan comptable'), ('cash_flow', 'Flux de trésorerie'), ('tax_report', 'Rapport fiscal'), ('ap_aging', 'Balance âgée fournisseurs'), ('custom', 'Rapport personnalisé')], max_length=30),
+        ),
+    ]
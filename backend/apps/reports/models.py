@@ -12,6 +12,7 @@ class Report(models.Model):
         ('balance_sheet', 'Bilan comptable'),
         ('cash_flow', 'Flux de trésorerie'),
         ('tax_report', 'Rapport fiscal'),
+        ('ap_aging', 'Balance âgée fournisseurs'),
         ('custom', 'Rapport personnalisé'),
     )
     
@@ -40,7 +41,8 @@ class Notification(models.Model):
     )
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    # Indexed through notification_user_read_idx, whose leading column is user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications', db_index=False)
     title = models.CharField(max_length=100)
     message = models.TextField()
     read = models.BooleanField(default=False)
@@ -49,10 +51,34 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Per-user inbox, optionally unread only, newest first
+            models.Index(fields=['user', 'read', 'created_at'], name='notification_user_read_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        from apps.utils.notifications import track_unread
+        with track_unread(self, kwargs.get('using')):
+            return super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        from apps.utils.notifications import track_unread
+        with track_unread(self, kwargs.get('using'), deleting=True):
+            return super().delete(*args, **kwargs)
+
+
+class NotificationCounter(models.Model):
+    """Unread notifications of a user, kept by apps.utils.notifications"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                related_name='notification_counter')
+    unread = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
 
 class Anomaly(models.Model):
     """Model to store detected financial anomalies"""
@@ -79,7 +105,66 @@ class Anomaly(models.Model):
     
     class Meta:
         ordering = ['-detected_at']
+        indexes = [
+            # Keyset pagination on (detected_at, id)
+            models.Index(fields=['detected_at', 'id'], name='anomaly_detected_at_id_idx'),
+            # Status / type filters ordered by detection date
+            models.Index(fields=['status', 'detected_at'], name='anomaly_status_detected_idx'),
+            models.Index(fields=['anomaly_type', 'detected_at'], name='anomaly_type_detected_idx'),
+        ]
         verbose_name_plural = 'Anomalies'
     
     def __str__(self):
-        return f"{self.anomaly_type} - {self.detected_at}"
\ No newline at end of file
+        return f"{self.anomaly_type} - {self.detected_at}"
+
+class ArchivedAnomaly(models.Model):
+    """Closed anomaly moved out of the hot table by the retention purge (apps.utils.retention)"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    anomaly_type = models.CharField(max_length=30, choices=Anomaly.ANOMALY_TYPES)
+    description = models.TextField()
+    status = models.CharField(max_length=20, choices=Anomaly._meta.get_field('status').choices)
+    # Plain keys: the invoice and transaction may be hot, archived or gone
+    related_invoice_id = models.UUIDField(null=True, blank=True)
+    related_transaction_id = models.UUIDField(null=True, blank=True)
+    detected_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-detected_at']
+        indexes = [
+            models.Index(fields=['detected_at', 'id'], name='archived_anomaly_detected_idx'),
+        ]
+        verbose_name_plural = 'Archived anomalies'
+
+    def __str__(self):
+        return f"{self.anomaly_type} - {self.detected_at} (archived)"
+
+class TaxPeriod(models.Model):
+    """VAT totals of a closed or filed period, reused until refreshed or for good once filed (apps.utils.vat)"""
+    start_date = models.DateField()
+    end_date = models.DateField()
+    # [{"direction", "rate", "base", "vat", "count"}], amounts as strings
+    lines = models.JSONField()
+    computed_at = models.DateTimeField(auto_now_add=True)
+    filed_at = models.DateTimeField(null=True, blank=True)
+    filed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='filed_tax_periods')
+
+    class Meta:
+        ordering = ['start_date']
+        constraints = [
+            models.UniqueConstraint(fields=['start_date', 'end_date'], name='tax_period_range_uniq'),
+        ]
+
+    def __str__(self):
+        return f"VAT {self.start_date} to {self.end_date}{' (filed)' if self.filed_at else ''}"
+
+class TableVersion(models.Model):
+    """Write counter of a table, bumped by database triggers, used as HTTP validator"""
+    table_name = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.table_name} v{self.version}"
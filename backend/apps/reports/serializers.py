@@ -1,8 +1,9 @@
 # backend/apps/reports/serializers.py
 from rest_framework import serializers
+from apps.utils.sparse_fields import SparseFieldsMixin
 from .models import Report, Notification, Anomaly
 
-class ReportSerializer(serializers.ModelSerializer):
+class ReportSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     generated_by_name = serializers.ReadOnlyField(source='generated_by.get_full_name')
     report_type_display = serializers.CharField(source='get_report_type_display', read_only=True)
     
@@ -13,7 +14,7 @@ class ReportSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at')
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     priority_display = serializers.CharField(source='get_priority_display', read_only=True)
     
     class Meta:
@@ -23,7 +24,7 @@ class NotificationSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at')
 
 
-class AnomalySerializer(serializers.ModelSerializer):
+class AnomalySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     anomaly_type_display = serializers.CharField(source='get_anomaly_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     invoice_number = serializers.ReadOnlyField(source='related_invoice.invoice_number')
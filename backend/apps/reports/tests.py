@@ -0,0 +1,19 @@
+# backend/apps/reports/tests.py
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.utils.query_budget import check_endpoint_budgets
+from apps.utils.synthetic import seed_synthetic_data
+
+
+class QueryBudgetTests(TestCase):
+    """List endpoints stay within ENDPOINT_BUDGETS queries, whatever the page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.context = seed_synthetic_data(200)
+
+    def test_list_endpoints_within_budget(self):
+        client = APIClient()
+        client.force_authenticate(self.context['user'])
+        _, failures = check_endpoint_budgets(client)
+        self.assertEqual(failures, [], '\n\n'.join(failures))
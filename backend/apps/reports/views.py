@@ -1,33 +1,58 @@
 # backend/apps/reports/views.py
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Report, Notification, Anomaly
 from .serializers import ReportSerializer, NotificationSerializer, AnomalySerializer
-import pandas as pd
-import matplotlib.pyplot as plt
+import csv
 import io
-from django.http import FileResponse
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from apps.transactions.models import Transaction
 from apps.invoices.models import Invoice
-from django.db.models import Sum, Count
+from apps.accounts.models import User
+from apps.accounts.authentication import StreamTicket
+from django.db.models import Count
 from django.db.models.functions import TruncMonth
+from apps.utils.pagination import KeysetPagination
+from apps.utils.fast_serialization import FastListMixin
+from apps.utils.conditional import ConditionalGetMixin
+from apps.utils.sparse_fields import SparseFieldsViewMixin
+from apps.utils.replica import use_replica
+from apps.utils.archive import sum_with_archive
+from apps.utils.notifications import mark_all_read, notify, unread_count
+from apps.utils.bulk import BulkTransitionMixin
+from apps.utils.aging import stream_aging
+from apps.utils.charts import CHART_MODELS, BrokenProcessPool, chart_version, render_chart
+from apps.utils.forecast import FORECAST_MODELS, forecast
+from apps.utils.vat import FILING_ROLES, GRANULARITIES, declaration_rows, file_period, tax_report
+from django.conf import settings
+from django.db import router
+from django.utils.dateparse import parse_date
+from datetime import date
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from concurrent.futures import TimeoutError as RenderTimeout
 
+# Anomalies still waiting for a decision, the only ones bulk actions close
+OPEN_ANOMALY_STATUSES = ('new', 'investigating')
 
-class ReportViewSet(viewsets.ModelViewSet):
+
+class ReportViewSet(ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for report generation and management
     """
-    queryset = Report.objects.all()
+    queryset = Report.objects.select_related('generated_by')
     serializer_class = ReportSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['report_type', 'start_date', 'end_date', 'generated_by']
+    conditional_models = [Report, User]
     
     def perform_create(self, serializer):
         serializer.save(generated_by=self.request.user)
     
     @action(detail=False, methods=['post'])
+    @use_replica()
     def generate_income_statement(self, request):
         """
         Generate an income statement report
@@ -39,20 +64,13 @@ class ReportViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Start date and end date are required'}, status=400)
         
         try:
-            # Get all transactions within date range
-            income = Transaction.objects.filter(
-                transaction_date__range=[start_date, end_date],
-                transaction_type='income'
-            ).aggregate(total=Sum('amount'))
-            
-            expenses = Transaction.objects.filter(
-                transaction_date__range=[start_date, end_date],
-                transaction_type='expense'
-            ).aggregate(total=Sum('amount'))
+            # Sum the transactions within date range, archived periods included
+            total_income = sum_with_archive(Transaction, 'amount', transaction_type='income',
+                                            transaction_date__range=[start_date, end_date])
+            total_expenses = sum_with_archive(Transaction, 'amount', transaction_type='expense',
+                                              transaction_date__range=[start_date, end_date])
             
             # Calculate profit/loss
-            total_income = income['total'] or 0
-            total_expenses = expenses['total'] or 0
             net_profit = total_income - total_expenses
             
             # Create a report entry
@@ -71,6 +89,7 @@ class ReportViewSet(viewsets.ModelViewSet):
                 'Expenses': [total_expenses],
                 'Net Profit/Loss': [net_profit]
             }
+            import pandas as pd
             df = pd.DataFrame(data)
             
             # Save as CSV file
@@ -92,29 +111,262 @@ class ReportViewSet(viewsets.ModelViewSet):
             return Response({'error': str(e)}, status=400)
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get', 'post'])
+    @use_replica()
+    def ap_aging(self, request):
+        """
+        Accounts-payable aging per supplier at ?as_of= (today by default),
+        streamed as JSON; a POST also records the report
+        """
+        value = request.query_params.get('as_of') or request.data.get('as_of')
+        try:
+            as_of = parse_date(value) if value else date.today()
+        except ValueError:
+            as_of = None
+        if as_of is None:
+            return Response({'error': 'as_of must be a date (YYYY-MM-DD)'}, status=400)
+
+        def stream(request):
+            # Rows are read after the view returns: pin the database chosen now
+            using = router.db_for_read(Invoice)
+            return StreamingHttpResponse(stream_aging(as_of, using=using), content_type='application/json')
+
+        if request.method == 'POST':
+            Report.objects.create(
+                title=f"AP aging as of {as_of}",
+                report_type='ap_aging',
+                start_date=as_of,
+                end_date=as_of,
+                generated_by=request.user,
+            )
+            return stream(request)
+        return self.conditional_response(stream, request, models=[Invoice, Transaction], variant=as_of.isoformat())
+
+
+    @action(detail=False, methods=['get', 'post'])
+    @use_replica()
+    def cash_flow_forecast(self, request):
+        """
+        Daily balances of every bank account over the next ?days= days,
+        projected from past flows and unpaid invoices; a POST also records
+        the report
+        """
+        max_days = getattr(settings, 'FORECAST_MAX_DAYS', 730)
+        value = request.query_params.get('days') or request.data.get('days')
+        try:
+            days = int(value) if value else getattr(settings, 'FORECAST_DEFAULT_DAYS', 90)
+        except (TypeError, ValueError):
+            days = 0
+        if not 1 <= days <= max_days:
+            return Response({'error': f'days must be a number from 1 to {max_days}'}, status=400)
+
+        def handler(request):
+            return Response(forecast(days))
+
+        if request.method == 'POST':
+            result = forecast(days)
+            Report.objects.create(
+                title=f"Cash-flow forecast: {result['start_date']} to {result['end_date']}",
+                report_type='cash_flow',
+                start_date=result['start_date'],
+                end_date=result['end_date'],
+                generated_by=request.user,
+            )
+            return Response(result)
+        return self.conditional_response(handler, request, models=FORECAST_MODELS,
+                                         variant=date.today().isoformat())
+
+    @action(detail=True, methods=['get'], url_path=r'chart/(?P<kind>[a-z_]+)')
+    @use_replica()
+    def chart(self, request, pk=None, kind=None):
+        """
+        PNG chart of the report period: income_expenses, invoice_status or aging
+
+        The URL without ?v= redirects to the one of the current data version,
+        which never changes content and is cached for CHART_CACHE_MAX_AGE.
+        """
+        if kind not in CHART_MODELS:
+            return Response({'error': f"Unknown chart, use one of {', '.join(CHART_MODELS)}"}, status=404)
+        report = self.get_object()
+        version = chart_version(kind, report)
+        if request.query_params.get('v') != version:
+            return HttpResponseRedirect(f"{request.path}?v={version}")
+
+        etag = f'"{version}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            try:
+                path = render_chart(kind, report, version)
+            except (RenderTimeout, BrokenProcessPool):
+                return Response({'error': 'The chart could not be drawn, try again later'}, status=503)
+            response = FileResponse(open(path, 'rb'), content_type='image/png')
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, immutable=True,
+                            max_age=getattr(settings, 'CHART_CACHE_MAX_AGE', 365 * 24 * 3600))
+        return response
+
+    def _tax_range(self, params):
+        # (start, end, granularity) of a tax request, or an error message
+        try:
+            start, end = parse_date(params.get('start_date') or ''), parse_date(params.get('end_date') or '')
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            return None, 'start_date and end_date must be dates (YYYY-MM-DD)'
+        if start > end:
+            return None, 'start_date must not be after end_date'
+        max_days = getattr(settings, 'TAX_REPORT_MAX_DAYS', 3660)
+        if (end - start).days >= max_days:
+            return None, f"The VAT report is limited to {max_days} days"
+        granularity = params.get('period') or 'quarter'
+        if granularity not in GRANULARITIES:
+            return None, f"period must be one of {', '.join(GRANULARITIES)}"
+        return (start, end, granularity), None
+
+    @action(detail=False, methods=['post'])
+    @use_replica()
+    def generate_tax_report(self, request):
+        """
+        VAT collected and deductible per month or quarter (period=) from
+        start_date to end_date; closed periods come from their stored figures
+        """
+        tax_range, error = self._tax_range(request.data)
+        if error:
+            return Response({'error': error}, status=400)
+        start, end, granularity = tax_range
+        periods = tax_report(start, end, granularity)
+
+        report = Report.objects.create(
+            title=f"VAT report: {start} to {end}",
+            report_type='tax_report',
+            start_date=start,
+            end_date=end,
+            generated_by=request.user,
+        )
+        return Response({'report': ReportSerializer(report).data, 'periods': periods})
+
+    @action(detail=False, methods=['get'])
+    @use_replica()
+    def tax_declaration(self, request):
+        """
+        VAT declaration lines (CA3) of every period from ?start_date= to
+        ?end_date=, as CSV
+        """
+        tax_range, error = self._tax_range(request.query_params)
+        if error:
+            return Response({'error': error}, status=400)
+        start, end, granularity = tax_range
+
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="tva_{start}_{end}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['period_start', 'period_end', 'status', 'line', 'label', 'base', 'vat'])
+        for period in tax_report(start, end, granularity):
+            for line, label, base, vat in declaration_rows(period):
+                writer.writerow([period['start_date'], period['end_date'], period['status'],
+                                 line, label, '' if base is None else base, vat])
+        return response
+
+    @action(detail=False, methods=['post'])
+    def file_tax_period(self, request):
+        """
+        Record the month or quarter (period=) starting at start_date as filed:
+        its figures are computed one last time and never again
+        """
+        if request.user.role not in FILING_ROLES:
+            return Response({'error': 'Only administrators and financial directors can file VAT periods'},
+                            status=status.HTTP_403_FORBIDDEN)
+        try:
+            start = parse_date(request.data.get('start_date') or '')
+        except ValueError:
+            start = None
+        granularity = request.data.get('period') or 'quarter'
+        if start is None or granularity not in GRANULARITIES:
+            return Response({'error': f"start_date (YYYY-MM-DD) and period ({', '.join(GRANULARITIES)}) are required"},
+                            status=400)
+        try:
+            period = file_period(start, granularity, request.user)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response({
+            'start_date': period.start_date,
+            'end_date': period.end_date,
+            'filed_at': period.filed_at,
+            'lines': period.lines,
+        }, status=status.HTTP_201_CREATED)
+
+
+class NotificationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for notification management
     """
     serializer_class = NotificationSerializer
+    conditional_models = [Notification]
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
     
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
-        self.get_queryset().update(read=True)
+        mark_all_read(request.user.pk)
         return Response({'status': 'All notifications marked as read'})
+    
+    @action(detail=False, methods=['post'])
+    def stream_ticket(self, request):
+        """
+        Ticket opening /notifications/stream/?ticket= for a short while,
+        so the access token never goes in a URL
+        """
+        ticket = StreamTicket.for_request(request)
+        return Response({'ticket': str(ticket), 'expires_in': int(StreamTicket.lifetime.total_seconds())})
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """
+        Unread notifications of the current user, from the per-user counter
+        """
+        return Response({'unread_count': unread_count(request.user.pk)})
+    
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def broadcast(self, request):
+        """
+        Send a notification to every user of the given roles and/or user ids
+        """
+        title = request.data.get('title')
+        message = request.data.get('message')
+        roles = request.data.get('roles') or []
+        users = request.data.get('users') or []
+        priority = request.data.get('priority', 'medium')
+        
+        if not title or not message:
+            return Response({'error': 'title and message are required'}, status=400)
+        if not roles and not users:
+            return Response({'error': 'Give at least one of roles or users'}, status=400)
+        if priority not in dict(Notification.PRIORITY_CHOICES):
+            return Response({'error': f"Unknown priority {priority}"}, status=400)
+        try:
+            users = [int(user) for user in users]
+        except (TypeError, ValueError):
+            return Response({'error': 'users must be a list of user ids'}, status=400)
+        unknown_roles = set(roles) - set(dict(User.ROLES))
+        if unknown_roles:
+            return Response({'error': f"Unknown roles: {', '.join(sorted(unknown_roles))}"}, status=400)
+        
+        notifications = notify(title, message, priority=priority, users=users, roles=roles)
+        return Response({'created': len(notifications)}, status=status.HTTP_201_CREATED)
 
 
-class AnomalyViewSet(viewsets.ModelViewSet):
+class AnomalyViewSet(ConditionalGetMixin, FastListMixin, BulkTransitionMixin, viewsets.ModelViewSet):
     """
     ViewSet for anomaly detection and management
     """
-    queryset = Anomaly.objects.all()
+    queryset = Anomaly.objects.select_related('related_invoice', 'related_transaction')
     serializer_class = AnomalySerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['anomaly_type', 'status', 'related_invoice', 'related_transaction']
+    ordering = ['-detected_at', '-id']
+    pagination_class = KeysetPagination
+    conditional_models = [Anomaly, Invoice, Transaction]
     
     @action(detail=True, methods=['post'])
     def resolve(self, request, pk=None):
@@ -124,6 +376,7 @@ class AnomalyViewSet(viewsets.ModelViewSet):
         try:
             anomaly = self.get_object()
             anomaly.status = 'resolved'
+            anomaly.resolved_at = timezone.now()
             anomaly.save()
             return Response({
                 'status': 'Anomaly resolved',
@@ -140,10 +393,26 @@ class AnomalyViewSet(viewsets.ModelViewSet):
         try:
             anomaly = self.get_object()
             anomaly.status = 'false_positive'
+            anomaly.resolved_at = timezone.now()
             anomaly.save()
             return Response({
                 'status': 'Anomaly marked as false positive',
                 'anomaly': AnomalySerializer(anomaly).data
             })
         except Exception as e:
-            return Response({'error': str(e)}, status=400)
\ No newline at end of file
+            return Response({'error': str(e)}, status=400)
+
+    @action(detail=False, methods=['post'])
+    def bulk_resolve(self, request):
+        """
+        Mark the open anomalies selected by ``ids`` or ``filter`` as resolved
+        """
+        return self.bulk_transition(request, OPEN_ANOMALY_STATUSES, status='resolved', resolved_at=timezone.now())
+
+    @action(detail=False, methods=['post'])
+    def bulk_mark_false_positive(self, request):
+        """
+        Mark the open anomalies selected by ``ids`` or ``filter`` as false positives
+        """
+        return self.bulk_transition(request, OPEN_ANOMALY_STATUSES, status='false_positive',
+                                    resolved_at=timezone.now())
\ No newline at end of file
@@ -0,0 +1,16 @@
+# backend/apps/transactions/apps.py
+from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def repair_search_indexes(sender, using, **kwargs):
+    from apps.utils.search import ensure_indexes
+    ensure_indexes(['transaction'], connections[using], repair_only=True)
+
+
+class TransactionsConfig(AppConfig):
+    name = 'apps.transactions'
+
+    def ready(self):
+        post_migrate.connect(repair_search_indexes, sender=self)
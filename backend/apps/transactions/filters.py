@@ -0,0 +1,22 @@
+# backend/apps/transactions/filters.py
+from django_filters import rest_framework as filters
+from .models import Transaction
+
+
+class TransactionFilter(filters.FilterSet):
+    """
+    Transaction filters, each backed by an index:
+    type + date range -> transaction_type_date_idx,
+    status + date range -> transaction_status_date_idx,
+    date range alone -> transaction_date_id_idx
+    """
+    transaction_type = filters.MultipleChoiceFilter(choices=Transaction.TRANSACTION_TYPES)
+    status = filters.MultipleChoiceFilter(choices=Transaction.STATUS_CHOICES)
+    date_from = filters.DateFilter(field_name='transaction_date', lookup_expr='gte')
+    date_to = filters.DateFilter(field_name='transaction_date', lookup_expr='lte')
+    amount_min = filters.NumberFilter(field_name='amount', lookup_expr='gte')
+    amount_max = filters.NumberFilter(field_name='amount', lookup_expr='lte')
+
+    class Meta:
+        model = Transaction
+        fields = ['transaction_type', 'status', 'bank_account', 'transaction_date', 'related_invoice']
@@ -0,0 +1,43 @@
+# backend/apps/transactions/management/commands/auto_reconcile.py
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from apps.utils.reconciliation import auto_reconcile
+
+
+class Command(BaseCommand):
+    help = 'Reconcile pending transactions with unpaid invoices in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--amount-tolerance', type=Decimal, default=Decimal('0'),
+                            help='Accepted absolute difference between transaction and invoice amounts')
+        parser.add_argument('--date-window-days', type=int, default=30,
+                            help='Days accepted before the invoice date and after the due date')
+        parser.add_argument('--start-date', help='Only consider transactions on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Only consider transactions on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--dry-run', action='store_true', help='Compute matches without saving them')
+        parser.add_argument('--show-ambiguous', action='store_true', help='List ambiguous transactions')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = auto_reconcile(
+            amount_tolerance=options['amount_tolerance'],
+            date_window_days=options['date_window_days'],
+            start_date=options['start_date'],
+            end_date=options['end_date'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = time.perf_counter() - started
+
+        if options['show_ambiguous']:
+            for entry in result['ambiguous']:
+                candidates = ', '.join(str(invoice_id) for invoice_id in entry['candidate_invoice_ids'])
+                self.stdout.write(f"{entry['transaction_id']}: {entry['reason']} ({candidates})")
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Scanned {result['scanned']} transactions: "
+            f"{result['matched']} reconciled, {result['skipped']} changed meanwhile, "
+            f"{result['ambiguous_count']} ambiguous "
+            f"in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,77 @@
+# backend/apps/transactions/management/commands/benchmark_search.py
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.transactions.models import BankAccount, Transaction
+from apps.utils.search import is_supported, match_filter, ranked_search
+
+WORDS = (
+    'paiement', 'facture', 'loyer', 'salaire', 'fournisseur', 'virement', 'remboursement',
+    'electricite', 'telephone', 'assurance', 'maintenance', 'transport', 'carburant',
+    'consultation', 'formation', 'materiel', 'logiciel', 'abonnement', 'commission', 'frais',
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare the full-text search index with the LIKE search on transaction descriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Number of synthetic transactions to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query, the median is reported')
+        parser.add_argument('--terms', nargs='+', default=['loyer', 'factu', 'paiement fournisseur', 'REF-12345'],
+                            help='Search terms to benchmark')
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError('Full-text search is only available on SQLite and PostgreSQL')
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.seed(options['rows'])
+            self.stdout.write(f"Seeded {options['rows']} transactions in {time.perf_counter() - started:.1f}s")
+
+            self.stdout.write(f"{'term':<24} {'LIKE':>10} {'FTS':>10} {'ranked':>10} {'rows':>8}")
+            for term in options['terms']:
+                # Same shape as the first page of /api/transactions/?search=
+                like_queryset = Transaction.objects.filter(description__icontains=term)
+                fts_queryset = Transaction.objects.filter(match_filter(['transaction'], term))
+                like_ms = self.measure(lambda: self.first_page(like_queryset), options['repeat'])
+                fts_ms = self.measure(lambda: self.first_page(fts_queryset), options['repeat'])
+                ranked_ms = self.measure(lambda: ranked_search(['transaction'], term, 10), options['repeat'])
+                matches = fts_queryset.count()
+                self.stdout.write(f"{term:<24} {like_ms:>8.2f}ms {fts_ms:>8.2f}ms {ranked_ms:>8.2f}ms {matches:>8}")
+
+            transaction.set_rollback(True)
+
+    def seed(self, rows, batch_size=5000):
+        rng = random.Random(42)
+        account = BankAccount.objects.create(
+            account_name='Benchmark', account_number='000', bank_name='Benchmark', current_balance=0
+        )
+        start = date.today() - timedelta(days=3 * 365)
+        for offset in range(0, rows, batch_size):
+            Transaction.objects.bulk_create([
+                Transaction(
+                    transaction_date=start + timedelta(days=rng.randrange(3 * 365)),
+                    amount=Decimal(rng.randrange(1000, 1000000)) / 100,
+                    description=f"{' '.join(rng.sample(WORDS, 3))} REF-{offset + i}",
+                    transaction_type=rng.choice(('income', 'expense', 'transfer')),
+                    bank_account=account,
+                )
+                for i in range(min(batch_size, rows - offset))
+            ])
+
+    def first_page(self, queryset):
+        return list(queryset.order_by('-transaction_date', '-id').values_list('id')[:10])
+
+    def measure(self, query, repeat):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
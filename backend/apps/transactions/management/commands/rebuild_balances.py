@@ -0,0 +1,48 @@
+# backend/apps/transactions/management/commands/rebuild_balances.py
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.utils.balances import default_horizon, rebuild_balances, verify_balances
+
+
+class Command(BaseCommand):
+    help = ('Recompute bank account balances and daily balance snapshots from the hot and '
+            'archived transactions, or only check them with --verify')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', action='append', dest='accounts',
+                            help='Bank account id, repeat for several (default: all accounts)')
+        parser.add_argument('--through', type=date.fromisoformat,
+                            help='Last snapshot day (YYYY-MM-DD), defaults to yesterday')
+        parser.add_argument('--verify', action='store_true',
+                            help='Compare the stored values with a recomputation without writing')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        through = options['through'] or default_horizon()
+
+        if options['verify']:
+            mismatches = verify_balances(options['accounts'], through=through)
+            for mismatch in mismatches:
+                self.stdout.write(
+                    f"{mismatch['bank_account']}: stored {mismatch['stored_balance']}, "
+                    f"expected {mismatch['balance']}, {mismatch['wrong_snapshots']} wrong snapshots "
+                    f"(first {mismatch['first_wrong_snapshot']})"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} accounts out of sync, run rebuild_balances")
+            self.stdout.write(self.style.SUCCESS(
+                f"Balances and snapshots through {through} are in sync ({time.perf_counter() - started:.2f}s)"
+            ))
+            return
+
+        results = rebuild_balances(options['accounts'], through=through)
+        for result in results:
+            if result['stored_balance'] != result['balance']:
+                self.stdout.write(
+                    f"{result['bank_account']}: {result['stored_balance']} -> {result['balance']}"
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(results)} accounts and {sum(result['snapshots'] for result in results)} "
+            f"snapshots through {through} in {time.perf_counter() - started:.2f}s"
+        ))
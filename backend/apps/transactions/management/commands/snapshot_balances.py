@@ -0,0 +1,21 @@
+# backend/apps/transactions/management/commands/snapshot_balances.py
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+from apps.utils.balances import default_horizon, extend_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Add the daily balance snapshots missing up to yesterday; run it once a day'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--through', type=date.fromisoformat,
+                            help='Last snapshot day (YYYY-MM-DD), defaults to yesterday')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        through = options['through'] or default_horizon()
+        written = extend_snapshots(through=through)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} snapshots through {through} in {time.perf_counter() - started:.2f}s"
+        ))
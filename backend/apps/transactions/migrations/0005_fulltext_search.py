@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from apps.utils.search import ensure_indexes
+    ensure_indexes(['transaction'], schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from apps.utils.search import drop_indexes
+    drop_indexes(['transaction'], schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('transaction_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('description', models.CharField(max_length=255)),
+                ('transaction_type', models.CharField(choices=[('income', 'Recette'), ('expense', 'Dépense'), ('transfer', 'Virement')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('completed', 'Complété'), ('failed', 'Échoué'), ('reconciled', 'Rapproché')], max_length=20)),
+                ('related_invoice_id', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('bank_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_transactions', to='transactions.bankaccount')),
+            ],
+            options={
+                'ordering': ['-transaction_date'],
+                'indexes': [models.Index(fields=['transaction_date', 'id'], name='archived_tx_date_id_idx'), models.Index(fields=['transaction_type', 'transaction_date', 'amount'], name='archived_tx_type_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:10
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Case, DecimalField, F, Sum, When
+
+
+def derive_balances(apps, schema_editor):
+    # The stored balance was entered when the account was created and never
+    # updated: it becomes the opening balance the transactions build on
+    BankAccount = apps.get_model('transactions', 'BankAccount')
+    signed_amount = Case(
+        When(transaction_type='expense', then=-F('amount')),
+        default=F('amount'),
+        output_field=DecimalField(max_digits=15, decimal_places=2),
+    )
+    for account in BankAccount.objects.all():
+        total = Decimal(0)
+        for model_name in ('Transaction', 'ArchivedTransaction'):
+            model = apps.get_model('transactions', model_name)
+            value = model.objects.filter(
+                bank_account_id=account.pk, status__in=('completed', 'reconciled')
+            ).aggregate(total=Sum(signed_amount))['total']
+            total += Decimal(value or 0).quantize(Decimal('0.01'))
+        BankAccount.objects.filter(pk=account.pk).update(
+            opening_balance=account.current_balance, current_balance=account.current_balance + total
+        )
+
+
+def restore_balances(apps, schema_editor):
+    BankAccount = apps.get_model('transactions', 'BankAccount')
+    BankAccount.objects.update(current_balance=F('opening_balance'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankaccount',
+            name='opening_balance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='bankaccount',
+            name='current_balance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15),
+        ),
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('bank_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='transactions.bankaccount')),
+            ],
+            options={
+                'ordering': ['bank_account', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('bank_account', 'date'), name='balance_snapshot_account_date_uniq')],
+            },
+        ),
+        migrations.RunPython(derive_balances, restore_balances),
+    ]
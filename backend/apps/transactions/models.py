@@ -9,11 +9,31 @@ class BankAccount(models.Model):
     account_name = models.CharField(max_length=100)
     account_number = models.CharField(max_length=50)
     bank_name = models.CharField(max_length=100)
-    current_balance = models.DecimalField(max_digits=15, decimal_places=2)
+    # Balance before the first recorded transaction
+    opening_balance = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    # Opening balance plus the settled transactions, kept by apps.utils.balances
+    current_balance = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     
     def __str__(self):
         return f"{self.account_name} - {self.bank_name}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            # No transaction yet
+            self.current_balance = self.opening_balance
+            return super().save(*args, **kwargs)
+
+        from apps.utils.balances import track_opening_balance
+        # current_balance only changes through F() updates, a stale copy
+        # held by this instance must not overwrite them
+        if kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'current_balance'
+            ]
+        with track_opening_balance(self, kwargs.get('using')):
+            return super().save(*args, **kwargs)
+
 
 class Transaction(models.Model):
     """Model to store financial transactions"""
@@ -43,6 +63,68 @@ class Transaction(models.Model):
     
     class Meta:
         ordering = ['-transaction_date']
+        indexes = [
+            # Keyset pagination on (transaction_date, id)
+            models.Index(fields=['transaction_date', 'id'], name='transaction_date_id_idx'),
+            # Type + date range filters; amount makes SUM(amount) reports index-only
+            models.Index(fields=['transaction_type', 'transaction_date', 'amount'],
+                         name='transaction_type_date_idx'),
+            # Status filters over a date range
+            models.Index(fields=['status', 'transaction_date'], name='transaction_status_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.transaction_type} - {self.amount} - {self.transaction_date}"
+
+    def save(self, *args, **kwargs):
+        from apps.utils.balances import track_transaction
+        with track_transaction(self, kwargs.get('using')):
+            return super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        from apps.utils.balances import track_transaction
+        with track_transaction(self, kwargs.get('using'), deleting=True):
+            return super().delete(*args, **kwargs)
+
+
+class ArchivedTransaction(models.Model):
+    """Transaction of a closed period moved out of the hot table (apps.utils.archive)"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    transaction_date = models.DateField()
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    description = models.CharField(max_length=255)
+    transaction_type = models.CharField(max_length=20, choices=Transaction.TRANSACTION_TYPES)
+    status = models.CharField(max_length=20, choices=Transaction.STATUS_CHOICES)
+    bank_account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='archived_transactions')
+    # Plain key: the invoice may be hot or archived itself
+    related_invoice_id = models.UUIDField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-transaction_date']
+        indexes = [
+            models.Index(fields=['transaction_date', 'id'], name='archived_tx_date_id_idx'),
+            models.Index(fields=['transaction_type', 'transaction_date', 'amount'],
+                         name='archived_tx_type_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_type} - {self.amount} - {self.transaction_date} (archived)"
+
+
+class BalanceSnapshot(models.Model):
+    """Closing balance of a bank account at the end of a day (apps.utils.balances)"""
+    bank_account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='balance_snapshots')
+    date = models.DateField()
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+
+    class Meta:
+        ordering = ['bank_account', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['bank_account', 'date'], name='balance_snapshot_account_date_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.bank_account_id} - {self.date} - {self.balance}"
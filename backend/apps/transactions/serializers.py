@@ -1,15 +1,23 @@
 # backend/apps/transactions/serializers.py
 from rest_framework import serializers
+from apps.utils.sparse_fields import SparseFieldsMixin
 from .models import BankAccount, Transaction
 
-class BankAccountSerializer(serializers.ModelSerializer):
+class BankAccountSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = BankAccount
-        fields = ('id', 'account_name', 'account_number', 'bank_name', 'current_balance')
-        read_only_fields = ('id',)
+        fields = ('id', 'account_name', 'account_number', 'bank_name', 'opening_balance', 'current_balance')
+        read_only_fields = ('id', 'current_balance')
 
+    def to_internal_value(self, data):
+        # Clients creating an account with its balance start it from there
+        if self.instance is None and 'opening_balance' not in data and 'current_balance' in data:
+            data = data.copy()
+            data['opening_balance'] = data['current_balance']
+        return super().to_internal_value(data)
 
-class TransactionSerializer(serializers.ModelSerializer):
+
+class TransactionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     bank_account_name = serializers.ReadOnlyField(source='bank_account.account_name')
     transaction_type_display = serializers.CharField(source='get_transaction_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -5,26 +5,102 @@ from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import BankAccount, Transaction
 from .serializers import BankAccountSerializer, TransactionSerializer
+from .filters import TransactionFilter
 from apps.invoices.models import Invoice
+from apps.utils.pagination import KeysetPagination
+from apps.utils.fast_serialization import FastListMixin
+from apps.utils.conditional import ConditionalGetMixin
+from apps.utils.sparse_fields import SparseFieldsViewMixin
+from apps.utils.search import FullTextSearchFilter, fetch_ranked, get_limit
+from apps.utils.reconciliation import auto_reconcile
+from apps.utils.balances import balance_as_of, balance_history
+from django.conf import settings
+from django.utils.dateparse import parse_date
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
 
-class BankAccountViewSet(viewsets.ModelViewSet):
+
+def _date_param(request, name, default):
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+    return parsed
+
+
+class BankAccountViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for bank account management
     """
-    queryset = BankAccount.objects.all()
+    queryset = BankAccount.objects.order_by('account_name', 'id')
     serializer_class = BankAccountSerializer
 
+    @action(detail=True, methods=['get'])
+    def balance(self, request, pk=None):
+        """
+        Closing balance of the account at the end of ?date= (today by default)
+        """
+        account = self.get_object()
+        try:
+            day = _date_param(request, 'date', date.today())
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response({'bank_account': account.pk, 'date': day, 'balance': balance_as_of(account, day)})
 
-class TransactionViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def balance_history(self, request, pk=None):
+        """
+        Daily closing balances between ?start_date= and ?end_date=, the last 90 days by default
+        """
+        account = self.get_object()
+        try:
+            end_date = _date_param(request, 'end_date', date.today())
+            start_date = _date_param(request, 'start_date', end_date - timedelta(days=89))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        max_days = getattr(settings, 'BALANCE_HISTORY_MAX_DAYS', 1830)
+        if start_date > end_date:
+            return Response({'error': 'start_date must be before end_date'}, status=400)
+        if (end_date - start_date).days >= max_days:
+            return Response({'error': f"The history is limited to {max_days} days"}, status=400)
+
+        return Response({
+            'bank_account': account.pk,
+            'start_date': start_date,
+            'end_date': end_date,
+            'history': [{'date': day, 'balance': balance}
+                        for day, balance in balance_history(account, start_date, end_date)],
+        })
+
+
+class TransactionViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for transaction management
     """
-    queryset = Transaction.objects.all()
+    queryset = Transaction.objects.select_related('bank_account', 'related_invoice')
     serializer_class = TransactionSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['transaction_type', 'status', 'bank_account', 'transaction_date']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
+    filterset_class = TransactionFilter
     search_fields = ['description']
+    fulltext_indexes = ['transaction']
     ordering_fields = ['transaction_date', 'amount']
+    ordering = ['-transaction_date', '-id']
+    pagination_class = KeysetPagination
+    conditional_models = [Transaction, BankAccount, Invoice]
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search on transaction descriptions, with prefix matching
+        """
+        transactions = fetch_ranked(self.get_queryset(), self.fulltext_indexes,
+                                    request.query_params.get('q', ''), limit=get_limit(request))
+        return Response(self.get_serializer(transactions, many=True).data)
     
     @action(detail=False, methods=['post'])
     def reconcile_with_invoice(self, request):
@@ -39,7 +115,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
                            status=400)
         
         try:
-            transaction = Transaction.objects.get(id=transaction_id)
+            transaction = self.get_queryset().get(id=transaction_id)
             invoice = Invoice.objects.get(id=invoice_id)
             
             # Check if amounts match
@@ -64,4 +140,36 @@ class TransactionViewSet(viewsets.ModelViewSet):
         except Invoice.DoesNotExist:
             return Response({'error': 'Invoice not found'}, status=404)
         except Exception as e:
-            return Response({'error': str(e)}, status=400)
\ No newline at end of file
+            return Response({'error': str(e)}, status=400)
+    
+    @action(detail=False, methods=['post'])
+    def auto_reconcile(self, request):
+        """
+        Reconcile all pending expenses with unpaid invoices in one pass;
+        details=true also lists the pairs and ambiguous transactions
+        """
+        try:
+            amount_tolerance = Decimal(str(request.data.get('amount_tolerance', '0')))
+            date_window_days = int(request.data.get('date_window_days', 30))
+        except (InvalidOperation, TypeError, ValueError):
+            return Response({'error': 'amount_tolerance and date_window_days must be numbers'},
+                           status=400)
+        
+        dry_run = str(request.data.get('dry_run', 'false')).lower() in ('1', 'true', 'yes')
+        # Only the counts unless the pairs are asked for, and then a bounded list
+        details = str(request.data.get('details', 'false')).lower() in ('1', 'true', 'yes')
+        max_details = getattr(settings, 'AUTO_RECONCILE_MAX_DETAILS', 1000) if details else 0
+        
+        try:
+            result = auto_reconcile(
+                amount_tolerance=amount_tolerance,
+                date_window_days=date_window_days,
+                start_date=request.data.get('start_date'),
+                end_date=request.data.get('end_date'),
+                dry_run=dry_run,
+                max_details=max_details,
+            )
+        except Exception as e:
+            return Response({'error': str(e)}, status=400)
+        
+        return Response(result)
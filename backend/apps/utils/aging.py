@@ -0,0 +1,94 @@
+# backend/apps/utils/aging.py
+import json
+from datetime import timedelta
+from decimal import Decimal
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, CharField, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from apps.invoices.models import Invoice
+from apps.transactions.models import ArchivedTransaction, Transaction
+from apps.utils.balances import quantize_cents
+
+# Invoices still owed; rejected (error) invoices are not
+PAYABLE_STATUSES = ('pending', 'processing', 'validated')
+
+# (name, first day past due, last day past due); None is open-ended
+AGING_BUCKETS = (
+    ('current', None, 0),
+    ('days_1_30', 1, 30),
+    ('days_31_60', 31, 60),
+    ('days_61_90', 61, 90),
+    ('over_90', 91, None),
+)
+
+
+def unpaid_invoices(as_of, using=None):
+    """
+    Payable invoices dated on or before ``as_of`` without a reconciled payment by then
+
+    Payments are looked up in the hot and archived transactions with
+    uncorrelated ``NOT IN`` subqueries: each is read once, not per invoice.
+    """
+    def paid(model, field):
+        return model.objects.using(using).filter(
+            status='reconciled', transaction_date__lte=as_of, **{f"{field}__isnull": False}
+        ).values(field)
+
+    return Invoice.objects.using(using).filter(
+        status__in=PAYABLE_STATUSES, invoice_date__lte=as_of
+    ).exclude(pk__in=paid(Transaction, 'related_invoice')).exclude(
+        pk__in=paid(ArchivedTransaction, 'related_invoice_id')
+    )
+
+
+def bucket_condition(as_of, first, last):
+    # Days past due d = as_of - due_date, so first <= d <= last on due_date
+    condition = Q()
+    if first is not None:
+        condition &= Q(due_date__lte=as_of - timedelta(days=first))
+    if last is not None:
+        condition &= Q(due_date__gte=as_of - timedelta(days=last))
+    return condition
+
+
+def aging_by_supplier(as_of, using=None):
+    """
+    Unpaid amounts per supplier and aging bucket at ``as_of``, largest total first
+
+    One grouped query: every bucket is a ``SUM(CASE ...)`` over the unpaid
+    invoices. Invoices without a supplier key are grouped by their name.
+
+    Returns:
+        QuerySet: Rows with supplier_id, supplier_name, invoice_count, total and one key per bucket
+    """
+    amount = DecimalField(max_digits=15, decimal_places=2)
+    buckets = {
+        name: Sum(Case(When(bucket_condition(as_of, first, last), then='total_amount'),
+                       default=Value(Decimal(0)), output_field=amount))
+        for name, first, last in AGING_BUCKETS
+    }
+    return unpaid_invoices(as_of, using).values(
+        supplier_id=F('normalized_supplier'),
+        supplier_name=Coalesce('normalized_supplier__name', 'supplier', output_field=CharField()),
+    ).annotate(
+        invoice_count=Count('id'), total=Sum('total_amount', output_field=amount), **buckets
+    ).order_by('-total', 'supplier_name')
+
+
+def stream_aging(as_of, using=None, chunk_size=2000):
+    """
+    Yield the aging report as JSON text, one supplier row at a time
+
+    The totals over all suppliers come last, accumulated while streaming.
+    """
+    names = [name for name, _, _ in AGING_BUCKETS]
+    totals = dict.fromkeys(['invoice_count', 'total', *names], 0)
+    yield f'{{"as_of": "{as_of.isoformat()}", "buckets": {json.dumps(names)}, "suppliers": ['
+    separator = ''
+    for row in aging_by_supplier(as_of, using).iterator(chunk_size=chunk_size):
+        row = {key: quantize_cents(value) if isinstance(value, Decimal) else value for key, value in row.items()}
+        for key in totals:
+            totals[key] += row[key] or 0
+        yield separator + json.dumps(row, cls=DjangoJSONEncoder)
+        separator = ', '
+    yield f'], "totals": {json.dumps(totals, cls=DjangoJSONEncoder)}}}'
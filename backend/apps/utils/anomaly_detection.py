@@ -1,9 +1,18 @@
 # backend/apps/utils/anomaly_detection.py
-import numpy as np
 from django.db.models import Avg, StdDev
 from apps.transactions.models import Transaction
 from apps.invoices.models import Invoice
 from apps.reports.models import Anomaly
+from apps.utils.notifications import notify_attention
+
+
+def flag_anomaly(**fields):
+    """
+    Record an anomaly and notify the financial directors and administrators
+    """
+    anomaly = Anomaly.objects.create(status='new', **fields)
+    notify_attention(f"Anomalie : {anomaly.get_anomaly_type_display()}", anomaly.description)
+    return anomaly
 
 def detect_duplicate_invoices(invoice):
     """
@@ -15,18 +24,23 @@ def detect_duplicate_invoices(invoice):
     Returns:
         bool: True if a duplicate is detected, False otherwise
     """
+    # Spellings of the same supplier share its key; unresolved names compare as text
+    if invoice.normalized_supplier_id is not None:
+        same_supplier = {'normalized_supplier_id': invoice.normalized_supplier_id}
+    else:
+        same_supplier = {'supplier': invoice.supplier}
+
     potential_duplicates = Invoice.objects.filter(
         invoice_number=invoice.invoice_number,
-        supplier=invoice.supplier
+        **same_supplier
     ).exclude(id=invoice.id)
     
     if potential_duplicates.exists():
         # Create an anomaly record
-        Anomaly.objects.create(
+        flag_anomaly(
             anomaly_type='duplicate_invoice',
             description=f"Potential duplicate invoice: {invoice.invoice_number} from {invoice.supplier}",
             related_invoice=invoice,
-            status='new'
         )
         return True
     
@@ -35,18 +49,17 @@ def detect_duplicate_invoices(invoice):
     similar_amount_max = invoice.total_amount * 1.05
     
     similar_invoices = Invoice.objects.filter(
-        supplier=invoice.supplier,
+        **same_supplier,
         total_amount__gte=similar_amount_min,
         total_amount__lte=similar_amount_max
     ).exclude(id=invoice.id)
     
     if similar_invoices.exists():
         # Create an anomaly record
-        Anomaly.objects.create(
+        flag_anomaly(
             anomaly_type='duplicate_invoice',
             description=f"Invoice with similar amount ({invoice.total_amount}) from {invoice.supplier}",
             related_invoice=invoice,
-            status='new'
         )
         return True
     
@@ -79,12 +92,11 @@ def detect_unusual_transactions(transaction):
     
     # If z-score is greater than 3, it's considered unusual (99.7% of normal distribution)
     if z_score > 3:
-        Anomaly.objects.create(
+        flag_anomaly(
             anomaly_type='unusual_transaction',
             description=f"Unusual {transaction.transaction_type} amount of {transaction.amount}. " +
                        f"Z-score: {z_score:.2f}",
             related_transaction=transaction,
-            status='new'
         )
         return True
     
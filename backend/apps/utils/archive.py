@@ -0,0 +1,189 @@
+# backend/apps/utils/archive.py
+from datetime import date
+from decimal import Decimal
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from apps.invoices.models import ArchivedInvoice, ArchivedInvoiceItem, Invoice, InvoiceItem
+from apps.transactions.models import ArchivedTransaction, Transaction
+
+# Rows in a final state; anything still pending stays in the hot tables
+CLOSED_TRANSACTION_STATUSES = ('completed', 'reconciled', 'failed')
+CLOSED_INVOICE_STATUSES = ('validated', 'error')
+
+ARCHIVE_MODELS = {
+    Transaction: ArchivedTransaction,
+    Invoice: ArchivedInvoice,
+    InvoiceItem: ArchivedInvoiceItem,
+}
+
+
+def default_cutoff(today=None):
+    """
+    First day of the month ``ARCHIVE_RETENTION_MONTHS`` months ago
+
+    Periods before it are closed; rows on or after it are never archived.
+    """
+    today = today or date.today()
+    months = today.year * 12 + today.month - 1 - getattr(settings, 'ARCHIVE_RETENTION_MONTHS', 18)
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _move(queryset, target_model, stamp=None):
+    """
+    Copy the rows of ``queryset`` into ``target_model`` with one INSERT ... SELECT
+
+    Columns are matched by name, so every value, timestamps included, is
+    kept as is; ``stamp`` fills the target's ``archived_at`` column.
+    """
+    source_columns = {field.column for field in queryset.model._meta.concrete_fields}
+    columns = [field.column for field in target_model._meta.concrete_fields if field.column in source_columns]
+    select_sql, params = queryset.values('pk').query.sql_with_params()
+    target_columns, values = list(columns), list(columns)
+    if stamp is not None:
+        target_columns.append('archived_at')
+        values.append('%s')
+        params = (stamp, *params)
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(target_model._meta.db_table)} ({', '.join(map(quote, target_columns))}) "
+            f"SELECT {', '.join(value if value == '%s' else quote(value) for value in values)} "
+            f"FROM {quote(queryset.model._meta.db_table)} "
+            f"WHERE {quote(queryset.model._meta.pk.column)} IN ({select_sql})",
+            params
+        )
+        return cursor.rowcount
+
+
+def _batches(queryset, batch_size):
+    """
+    Yield querysets of at most ``batch_size`` rows of ``queryset`` until it is empty
+
+    Every batch is moved out of ``queryset`` before the next one is read.
+    """
+    model = queryset.model
+    while True:
+        keys = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not keys:
+            return
+        yield model._default_manager.filter(pk__in=keys)
+
+
+def archivable_transactions(cutoff):
+    # Anomalies keep a foreign key to their transaction, those rows stay hot
+    return Transaction.objects.filter(
+        transaction_date__lt=cutoff, status__in=CLOSED_TRANSACTION_STATUSES, anomalies__isnull=True
+    )
+
+
+def archivable_invoices(cutoff):
+    # Hot transactions and anomalies keep a foreign key to their invoice
+    return Invoice.objects.filter(
+        invoice_date__lt=cutoff, status__in=CLOSED_INVOICE_STATUSES,
+        transactions__isnull=True, anomalies__isnull=True,
+    )
+
+
+def archive(cutoff=None, batch_size=2000, dry_run=False):
+    """
+    Move closed transactions and invoices dated before ``cutoff`` to the archive tables
+
+    Transactions go first, so invoices only referenced by archived
+    transactions can follow them. Every batch is copied and deleted in its
+    own transaction; the full-text and version triggers see plain deletes.
+
+    Returns:
+        dict: Rows moved per table, or that would be moved with ``dry_run``
+    """
+    cutoff = cutoff or default_cutoff()
+    if cutoff > default_cutoff():
+        raise ValueError(f"{cutoff} is in an open period, the latest cutoff is {default_cutoff()}")
+
+    if dry_run:
+        # Invoices freed by the transactions archived first are not counted
+        return {
+            'cutoff': cutoff,
+            'transactions': archivable_transactions(cutoff).count(),
+            'invoices': archivable_invoices(cutoff).count(),
+            'dry_run': True,
+        }
+
+    stamp = timezone.now()
+    moved = {'cutoff': cutoff, 'transactions': 0, 'invoices': 0, 'dry_run': False}
+    for batch in _batches(archivable_transactions(cutoff), batch_size):
+        with transaction.atomic():
+            moved['transactions'] += _move(batch, ArchivedTransaction, stamp)
+            batch.delete()
+    for batch in _batches(archivable_invoices(cutoff), batch_size):
+        with transaction.atomic():
+            moved['invoices'] += _move(batch, ArchivedInvoice, stamp)
+            _move(InvoiceItem.objects.filter(invoice__in=batch), ArchivedInvoiceItem)
+            batch.delete()
+    return moved
+
+
+def unarchive(start_date=None, end_date=None, batch_size=2000):
+    """
+    Move archived rows dated within [start_date, end_date] back to the hot tables
+
+    Invoices are restored first, along with the invoices of the restored
+    transactions. Archived invoices whose number was reused in the hot table
+    meanwhile cannot come back and are counted as skipped.
+
+    Returns:
+        dict: Rows restored per table and skipped invoices
+    """
+    def in_range(queryset, field):
+        if start_date:
+            queryset = queryset.filter(**{f"{field}__gte": start_date})
+        if end_date:
+            queryset = queryset.filter(**{f"{field}__lte": end_date})
+        return queryset
+
+    transactions = in_range(ArchivedTransaction.objects.all(), 'transaction_date')
+    invoices = ArchivedInvoice.objects.filter(
+        pk__in=in_range(ArchivedInvoice.objects.all(), 'invoice_date').values('pk')
+    ) | ArchivedInvoice.objects.filter(pk__in=transactions.values('related_invoice_id'))
+    conflicting = invoices.filter(invoice_number__in=Invoice.objects.values('invoice_number'))
+    restored = {'transactions': 0, 'invoices': 0, 'skipped_invoices': conflicting.count()}
+
+    for batch in _batches(invoices.exclude(pk__in=conflicting.values('pk')), batch_size):
+        with transaction.atomic():
+            restored['invoices'] += _move(batch, Invoice)
+            _move(ArchivedInvoiceItem.objects.filter(invoice__in=batch), InvoiceItem)
+            batch.delete()
+    # A transaction whose invoice could not be restored keeps no link to it
+    for batch in _batches(transactions, batch_size):
+        with transaction.atomic():
+            restored['transactions'] += _move(batch, Transaction)
+            Transaction.objects.filter(pk__in=batch.values('pk')).exclude(
+                related_invoice__isnull=True
+            ).exclude(related_invoice__in=Invoice.objects.all()).update(related_invoice=None)
+            batch.delete()
+    return restored
+
+
+def archived_queryset(model, **filters):
+    """
+    Return the archived rows of ``model`` matching ``filters``, or None when
+    the archive holds none, so callers only scan it when the range needs it
+    """
+    queryset = ARCHIVE_MODELS[model].objects.filter(**filters)
+    return queryset if queryset.exists() else None
+
+
+def sum_with_archive(model, field, **filters):
+    """
+    ``SUM(field)`` over the hot and archived rows of ``model`` matching ``filters``
+    """
+    total = model.objects.filter(**filters).aggregate(total=Sum(field))['total'] or 0
+    archived = archived_queryset(model, **filters)
+    if archived is not None:
+        total += archived.aggregate(total=Sum(field))['total'] or 0
+    decimal_places = getattr(model._meta.get_field(field), 'decimal_places', None)
+    if decimal_places is not None:
+        # SQLite sums decimals as floats, keep the two partial sums from drifting
+        total = Decimal(total).quantize(Decimal(1).scaleb(-decimal_places))
+    return total
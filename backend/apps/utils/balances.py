@@ -0,0 +1,389 @@
+# backend/apps/utils/balances.py
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import router, transaction as db_transaction
+from django.db.models import Case, DecimalField, F, Sum, When
+from apps.transactions.models import ArchivedTransaction, BalanceSnapshot, BankAccount, Transaction
+
+# Only settled transactions move money; pending and failed ones do not count
+SETTLED_STATUSES = ('completed', 'reconciled')
+
+# Past this many distinct days in one change, the snapshots of the account are
+# rewritten from the earliest day instead of shifted day by day
+SNAPSHOT_SHIFT_LIMIT = 31
+
+CENT = Decimal('0.01')
+
+
+def movement(transaction_type, status, amount):
+    """
+    Amount a transaction adds to the balance of its account
+
+    Expenses are debited; income is credited and transfers are taken as
+    recorded, a negative amount being an outgoing transfer.
+    """
+    if status not in SETTLED_STATUSES:
+        return Decimal(0)
+    amount = Decimal(amount)
+    return -amount if transaction_type == 'expense' else amount
+
+
+def signed_amount():
+    """SQL counterpart of ``movement`` for rows already filtered on SETTLED_STATUSES"""
+    return Case(
+        When(transaction_type='expense', then=-F('amount')),
+        default=F('amount'),
+        output_field=DecimalField(max_digits=15, decimal_places=2),
+    )
+
+
+def quantize_cents(value):
+    """
+    Round a sum of amounts to the cent, None counting as zero
+
+    SQLite sums decimals as floats; every total read from a ``Sum`` goes
+    through here before it is added up or returned.
+    """
+    return Decimal(value or 0).quantize(CENT)
+
+
+def movements(queryset):
+    """
+    Return ``{(bank_account_id, day): amount}`` for the rows of ``queryset``,
+    counted as settled whatever their status
+    """
+    rows = queryset.values('bank_account_id', 'transaction_date').annotate(
+        total=Sum(signed_amount())
+    ).values_list('bank_account_id', 'transaction_date', 'total').order_by()
+    return {(account_id, day): quantize_cents(total) for account_id, day, total in rows}
+
+
+def daily_movements(account_id, start=None, end=None, exclude=None, using=None):
+    """
+    Return ``{day: amount}`` of the settled hot and archived transactions of an account
+
+    Args:
+        account_id: Bank account primary key
+        start (date): First day included
+        end (date): Last day included
+        exclude (tuple): Inclusive (start, end) range of days to leave out
+        using (str): Database alias
+    """
+    totals = defaultdict(Decimal)
+    for model in (Transaction, ArchivedTransaction):
+        queryset = model.objects.using(using).filter(bank_account_id=account_id, status__in=SETTLED_STATUSES)
+        if start:
+            queryset = queryset.filter(transaction_date__gte=start)
+        if end:
+            queryset = queryset.filter(transaction_date__lte=end)
+        if exclude:
+            queryset = queryset.exclude(transaction_date__range=exclude)
+        for day, total in queryset.values('transaction_date').annotate(
+            total=Sum(signed_amount())
+        ).values_list('transaction_date', 'total').order_by():
+            totals[day] += quantize_cents(total)
+    return totals
+
+
+def apply_deltas(deltas, using=None):
+    """
+    Add ``{(bank_account_id, day): amount}`` to the balances and their snapshots
+
+    Every update is a single ``F()`` expression, so concurrent writers never
+    lose each other's changes. Snapshots dated on or after a day move with it.
+    """
+    by_account = defaultdict(dict)
+    for (account_id, day), delta in deltas.items():
+        if delta:
+            by_account[account_id][day] = by_account[account_id].get(day, 0) + delta
+
+    for account_id, days in by_account.items():
+        total = sum(days.values())
+        if total:
+            BankAccount.objects.using(using).filter(pk=account_id).update(
+                current_balance=F('current_balance') + total
+            )
+        if len(days) > SNAPSHOT_SHIFT_LIMIT:
+            rebuild_snapshots(account_id, since=min(days), using=using)
+            continue
+        snapshots = BalanceSnapshot.objects.using(using).filter(bank_account_id=account_id)
+        for day, delta in days.items():
+            if delta:
+                snapshots.filter(date__gte=day).update(balance=F('balance') + delta)
+
+
+_BALANCE_FIELDS = ('bank_account_id', 'transaction_date', 'transaction_type', 'status', 'amount')
+
+
+def _deltas(before, after):
+    deltas = defaultdict(Decimal)
+    if before is not None:
+        account_id, day, transaction_type, status, amount = before
+        deltas[account_id, day] -= movement(transaction_type, status, amount)
+    if after is not None:
+        account_id, day, transaction_type, status, amount = after
+        deltas[account_id, day] += movement(transaction_type, status, amount)
+    return deltas
+
+
+@contextmanager
+def track_transaction(instance, using=None, deleting=False):
+    """
+    Wrap the save or delete of one transaction with the matching balance update
+
+    The previous state is read back with ``SELECT ... FOR UPDATE``, so two
+    edits of the same row cannot both apply their delta from a stale copy.
+    Queryset ``update()`` and ``delete()`` bypass this; bulk paths call
+    ``apply_deltas`` themselves, archive moves leave the balance unchanged.
+    """
+    using = using or router.db_for_write(Transaction, instance=instance)
+    with db_transaction.atomic(using=using):
+        before = None
+        if not instance._state.adding:
+            before = Transaction.objects.using(using).select_for_update().filter(
+                pk=instance.pk
+            ).values_list(*_BALANCE_FIELDS).first()
+        yield
+        after = None
+        if not deleting:
+            after = tuple(
+                Transaction._meta.get_field(name).to_python(getattr(instance, name))
+                for name in _BALANCE_FIELDS
+            )
+        apply_deltas(_deltas(before, after), using=using)
+
+
+@contextmanager
+def track_opening_balance(instance, using=None):
+    """
+    Shift the balance and snapshots of an account by a change of its opening balance
+    """
+    using = using or router.db_for_write(BankAccount, instance=instance)
+    with db_transaction.atomic(using=using):
+        before = BankAccount.objects.using(using).select_for_update().filter(
+            pk=instance.pk
+        ).values_list('opening_balance', flat=True).first()
+        yield
+        if before is None:
+            return
+        delta = Decimal(instance.opening_balance) - before
+        if delta:
+            BankAccount.objects.using(using).filter(pk=instance.pk).update(
+                current_balance=F('current_balance') + delta
+            )
+            BalanceSnapshot.objects.using(using).filter(bank_account_id=instance.pk).update(
+                balance=F('balance') + delta
+            )
+        instance.current_balance = BankAccount.objects.using(using).filter(
+            pk=instance.pk
+        ).values_list('current_balance', flat=True).get()
+
+
+def _write_snapshots(account_id, balance, start, end, daily, using=None):
+    """
+    Replace the snapshots of ``[start, end]`` with one row per day, starting
+    from ``balance`` the day before ``start``
+
+    Returns:
+        int: Snapshots written
+    """
+    snapshots = []
+    day = start
+    while day <= end:
+        balance += daily.get(day, 0)
+        snapshots.append(BalanceSnapshot(bank_account_id=account_id, date=day, balance=balance))
+        day += timedelta(days=1)
+    BalanceSnapshot.objects.using(using).filter(bank_account_id=account_id, date__range=(start, end)).delete()
+    BalanceSnapshot.objects.using(using).bulk_create(snapshots, batch_size=1000)
+    return len(snapshots)
+
+
+def _balance_before(account_id, day, using=None):
+    """Closing balance of the snapshot before ``day``, or the opening balance"""
+    previous = BalanceSnapshot.objects.using(using).filter(
+        bank_account_id=account_id, date__lt=day
+    ).order_by('-date').values_list('balance', flat=True).first()
+    if previous is not None:
+        return previous
+    return BankAccount.objects.using(using).filter(pk=account_id).values_list('opening_balance', flat=True).get()
+
+
+def rebuild_snapshots(account_id, since, using=None):
+    """
+    Recompute the existing snapshots of an account dated on or after ``since``
+    """
+    last = BalanceSnapshot.objects.using(using).filter(
+        bank_account_id=account_id
+    ).order_by('-date').values_list('date', flat=True).first()
+    if last is None or last < since:
+        return 0
+    daily = daily_movements(account_id, start=since, end=last, using=using)
+    return _write_snapshots(account_id, _balance_before(account_id, since, using), since, last, daily, using)
+
+
+def default_horizon(today=None):
+    """Last day covered by snapshots: yesterday, today is still moving"""
+    return (today or date.today()) - timedelta(days=1)
+
+
+def compute_balance(account, using=None):
+    """
+    Balance of ``account`` from its opening balance and every transaction
+
+    Returns:
+        tuple: (current balance, ``{day: amount}`` of the settled transactions)
+    """
+    daily = daily_movements(account.pk, using=using)
+    return account.opening_balance + sum(daily.values(), Decimal(0)), daily
+
+
+def rebuild_balances(account_ids=None, through=None, using=None):
+    """
+    Recompute current balances and daily snapshots from the hot and archived transactions
+
+    Snapshots run from the first transaction of each account to ``through``.
+
+    Returns:
+        list: One dict per account with the stored and rebuilt balances
+    """
+    through = through or default_horizon()
+    accounts = BankAccount.objects.using(using).order_by('pk')
+    if account_ids:
+        accounts = accounts.filter(pk__in=account_ids)
+
+    results = []
+    for account_id in accounts.values_list('pk', flat=True):
+        with db_transaction.atomic(using=using):
+            # Holds off transaction writes on this account until the rebuild commits
+            account = BankAccount.objects.using(using).select_for_update().get(pk=account_id)
+            balance, daily = compute_balance(account, using=using)
+            BankAccount.objects.using(using).filter(pk=account.pk).update(current_balance=balance)
+            BalanceSnapshot.objects.using(using).filter(bank_account_id=account.pk).delete()
+            written = 0
+            if daily and min(daily) <= through:
+                written = _write_snapshots(account.pk, account.opening_balance, min(daily), through, daily, using)
+        results.append({
+            'bank_account': account.pk,
+            'stored_balance': account.current_balance,
+            'balance': balance,
+            'snapshots': written,
+        })
+    return results
+
+
+def extend_snapshots(through=None, using=None):
+    """
+    Add the snapshots missing between the last snapshot of each account and ``through``
+
+    Meant to run daily; accounts without snapshots yet start at their first
+    transaction.
+
+    Returns:
+        int: Snapshots written
+    """
+    through = through or default_horizon()
+    written = 0
+    for account in BankAccount.objects.using(using).order_by('pk'):
+        last = account.balance_snapshots.using(using).order_by('-date').first()
+        if last is not None:
+            start, balance = last.date + timedelta(days=1), last.balance
+        else:
+            first_days = [
+                model.objects.using(using).filter(bank_account=account, status__in=SETTLED_STATUSES)
+                .order_by('transaction_date').values_list('transaction_date', flat=True).first()
+                for model in (Transaction, ArchivedTransaction)
+            ]
+            first_days = [day for day in first_days if day is not None]
+            if not first_days:
+                continue
+            start, balance = min(first_days), account.opening_balance
+        if start > through:
+            continue
+        daily = daily_movements(account.pk, start=start, end=through, using=using)
+        with db_transaction.atomic(using=using):
+            written += _write_snapshots(account.pk, balance, start, through, daily, using)
+    return written
+
+
+def verify_balances(account_ids=None, through=None, using=None):
+    """
+    Compare stored balances and snapshots with a recomputation, without writing
+
+    Returns:
+        list: One dict per account whose balance or snapshots are off
+    """
+    through = through or default_horizon()
+    accounts = BankAccount.objects.using(using).order_by('pk')
+    if account_ids:
+        accounts = accounts.filter(pk__in=account_ids)
+
+    mismatches = []
+    for account in accounts:
+        balance, daily = compute_balance(account, using=using)
+        stored = account.balance_snapshots.using(using).filter(date__lte=through).order_by('date')
+        # Days not snapshotted yet are left to extend_snapshots
+        wrong_days = []
+        running, days, index = account.opening_balance, sorted(daily.items()), 0
+        for day, snapshot_balance in stored.values_list('date', 'balance'):
+            while index < len(days) and days[index][0] <= day:
+                running += days[index][1]
+                index += 1
+            if snapshot_balance != running:
+                wrong_days.append(day)
+        if balance != account.current_balance or wrong_days:
+            mismatches.append({
+                'bank_account': account.pk,
+                'stored_balance': account.current_balance,
+                'balance': balance,
+                'wrong_snapshots': len(wrong_days),
+                'first_wrong_snapshot': wrong_days[0] if wrong_days else None,
+            })
+    return mismatches
+
+
+def balance_as_of(account, day, using=None):
+    """
+    Closing balance of ``account`` at the end of ``day``
+
+    Reads the latest snapshot on or before ``day`` and adds the transactions
+    dated after it; with daily snapshots only days past the last snapshot
+    need a scan.
+    """
+    snapshot = account.balance_snapshots.using(using).filter(date__lte=day).order_by('-date').first()
+    if snapshot is not None:
+        if snapshot.date == day:
+            return snapshot.balance
+        base, start = snapshot.balance, snapshot.date + timedelta(days=1)
+    else:
+        base, start = account.opening_balance, None
+    return base + sum(daily_movements(account.pk, start=start, end=day, using=using).values(), Decimal(0))
+
+
+def balance_history(account, start, end, using=None):
+    """
+    Daily closing balances of ``account`` from ``start`` to ``end``
+
+    Days covered by snapshots are read as is; the others are rolled forward
+    from the balance before ``start`` with one grouped scan.
+
+    Returns:
+        list: ``(day, balance)`` pairs, one per day
+    """
+    snapshots = dict(account.balance_snapshots.using(using).filter(
+        date__range=(start, end)
+    ).values_list('date', 'balance'))
+    covered = (min(snapshots), max(snapshots)) if snapshots else None
+    daily = {}
+    if covered != (start, end):
+        daily = daily_movements(account.pk, start=start, end=end, exclude=covered, using=using)
+
+    balance = balance_as_of(account, start - timedelta(days=1), using=using)
+    history = []
+    day = start
+    while day <= end:
+        balance = snapshots[day] if day in snapshots else balance + daily.get(day, 0)
+        history.append((day, balance))
+        day += timedelta(days=1)
+    return history
@@ -0,0 +1,129 @@
+# backend/apps/utils/bulk.py
+import uuid
+from django.conf import settings
+from django.db import transaction
+from django.http import QueryDict
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def pk_ranges(queryset, batch_size):
+    """
+    Yield the rows of ``queryset`` as querysets over consecutive primary key
+    ranges of at most ``batch_size`` rows
+
+    Each range is read with a seek past the previous one, so no batch rescans
+    what earlier batches changed; its queryset repeats the filters of
+    ``queryset``, rows that stopped matching in between are left alone.
+    """
+    last = None
+    while True:
+        keys = queryset.order_by('pk')
+        if last is not None:
+            keys = keys.filter(pk__gt=last)
+        keys = list(keys.values_list('pk', flat=True)[:batch_size])
+        if not keys:
+            return
+        last = keys[-1]
+        yield queryset.filter(pk__gte=keys[0], pk__lte=last), len(keys)
+
+
+def transition(queryset, allowed_from, values, batch_size=None, with_results=False):
+    """
+    Apply ``values`` to the rows of ``queryset`` whose status is in
+    ``allowed_from``, with one ``UPDATE`` per primary key range
+
+    Args:
+        queryset (QuerySet): Selected rows
+        allowed_from: Statuses the transition starts from; other rows are skipped
+        values (dict): Column values written, the new ``status`` included
+        batch_size (int): Rows per ``UPDATE``, ``BULK_ACTION_BATCH_SIZE`` by default
+        with_results (bool): Also return the outcome of every row, at the cost
+            of reading the rows of each batch before updating them
+
+    Returns:
+        dict: ``matched``, ``updated`` and ``skipped`` counts, and ``results``
+        (``[{'id', 'result', 'status'}]``) with ``with_results``
+    """
+    batch_size = batch_size or getattr(settings, 'BULK_ACTION_BATCH_SIZE', 500)
+    model = queryset.model
+    counts = {'matched': 0, 'updated': 0, 'skipped': 0}
+    results = []
+    for batch, matched in pk_ranges(queryset, batch_size):
+        counts['matched'] += matched
+        if not with_results:
+            counts['updated'] += batch.filter(status__in=allowed_from).update(**values)
+            continue
+        with transaction.atomic():
+            current = list(batch.select_for_update().values_list('pk', 'status'))
+            eligible = [pk for pk, row_status in current if row_status in allowed_from]
+            counts['updated'] += model.objects.filter(pk__in=eligible).update(**values)
+        results.extend(
+            {'id': pk, 'result': 'updated', 'status': values['status']} if row_status in allowed_from
+            else {'id': pk, 'result': 'skipped', 'status': row_status}
+            for pk, row_status in current
+        )
+    counts['skipped'] = counts['matched'] - counts['updated']
+    if with_results:
+        counts['results'] = results
+    return counts
+
+
+class BulkTransitionMixin:
+    """
+    Status transitions applied to many rows of a ViewSet in one request
+
+    The request body selects the rows with either ``ids``, a list of primary
+    keys, or ``filter``, an object of the ViewSet's filter parameters
+    (``{"status": "new", "anomaly_type": "missing_data"}``). ``"results":
+    true`` adds the outcome of every row to the counts in the response.
+    """
+
+    def bulk_transition(self, request, allowed_from, **values):
+        """
+        Apply ``values`` to the selected rows whose status is in ``allowed_from``
+        """
+        ids, filters = request.data.get('ids'), request.data.get('filter')
+        if (ids is None) == (filters is None):
+            return Response({'error': 'Provide either ids or filter'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        requested = None
+        if ids is not None:
+            max_ids = getattr(settings, 'BULK_ACTION_MAX_IDS', 10000)
+            if not isinstance(ids, list) or not ids:
+                return Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > max_ids:
+                return Response({'error': f'At most {max_ids} ids per request, use filter for more'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            try:
+                requested = {uuid.UUID(str(pk)) for pk in ids}
+            except ValueError:
+                return Response({'error': 'ids must be UUIDs'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(pk__in=requested)
+        else:
+            if not isinstance(filters, dict) or not filters:
+                return Response({'error': 'filter must be a non-empty object'}, status=status.HTTP_400_BAD_REQUEST)
+            data = QueryDict(mutable=True)
+            for name, value in filters.items():
+                data.setlist(name, [str(item) for item in value] if isinstance(value, list) else [str(value)])
+            filterset_class = DjangoFilterBackend().get_filterset_class(self, queryset)
+            unknown = set(data) - set(filterset_class.base_filters)
+            if unknown:
+                return Response({'error': f"Unknown filters: {', '.join(sorted(unknown))}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            filterset = filterset_class(data, queryset=queryset, request=request)
+            if not filterset.is_valid():
+                errors = {name: [str(message) for message in messages] for name, messages in filterset.errors.items()}
+                return Response({'error': errors}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = filterset.qs
+
+        result = transition(queryset, allowed_from, values, with_results=request.data.get('results') is True)
+        if requested is not None:
+            result['not_found'] = len(requested) - result['matched']
+            if 'results' in result:
+                found = {row['id'] for row in result['results']}
+                result['results'].extend({'id': pk, 'result': 'not_found', 'status': None}
+                                         for pk in requested - found)
+        return Response(result)
@@ -0,0 +1,47 @@
+# backend/apps/utils/chart_render.py
+import io
+
+# Runs in the chart worker processes (apps.utils.charts): no Django import
+# here, the workers never set Django up
+
+
+def init_worker():
+    # Headless backend, chosen before anything draws
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_png(spec):
+    """
+    Draw a bar chart from ``spec`` and return it as PNG bytes
+
+    Args:
+        spec (dict): ``title``, ``labels`` of the x axis, ``series`` as
+            ``[name, values]`` pairs drawn side by side, ``ylabel``, and
+            optional ``size`` (inches) and ``dpi``
+
+    A ``Figure`` is drawn on its own canvas, without pyplot, so nothing is
+    left in module state between charts.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=spec.get('size', (8, 4.5)), dpi=spec.get('dpi', 100))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    labels, series = spec['labels'], spec['series']
+    width = 0.8 / max(len(series), 1)
+    for index, (name, values) in enumerate(series):
+        offset = (index - (len(series) - 1) / 2) * width
+        axes.bar([position + offset for position in range(len(labels))], values, width, label=name)
+    axes.set_xticks(range(len(labels)), labels, rotation=45 if len(labels) > 6 else 0, ha='right' if len(labels) > 6 else 'center')
+    axes.set_title(spec['title'])
+    axes.set_ylabel(spec.get('ylabel', ''))
+    axes.grid(axis='y', alpha=0.3)
+    if len(series) > 1:
+        axes.legend()
+    figure.tight_layout()
+
+    output = io.BytesIO()
+    figure.savefig(output, format='png')
+    return output.getvalue()
@@ -0,0 +1,184 @@
+# backend/apps/utils/charts.py
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, Count, DecimalField, Sum, Value, When
+from django.db.models.functions import TruncMonth
+from apps.invoices.models import ArchivedInvoice, Invoice
+from apps.transactions.models import ArchivedTransaction, Transaction
+from apps.utils.aging import AGING_BUCKETS, bucket_condition, unpaid_invoices
+from apps.utils.chart_render import init_worker, render_png
+from apps.utils.conditional import get_table_versions
+
+# Chart kind to the tracked tables its data is read from
+CHART_MODELS = {
+    'income_expenses': (Transaction,),
+    'invoice_status': (Invoice,),
+    'aging': (Invoice, Transaction),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _income_expenses(report, using):
+    months = {}
+    for model in (Transaction, ArchivedTransaction):
+        rows = model.objects.using(using).filter(
+            transaction_date__range=(report.start_date, report.end_date), transaction_type__in=('income', 'expense')
+        ).values_list(TruncMonth('transaction_date'), 'transaction_type').annotate(total=Sum('amount')).order_by()
+        for month, transaction_type, total in rows:
+            months.setdefault(month, {'income': 0, 'expense': 0})[transaction_type] += float(total or 0)
+    labels = sorted(months)
+    return {
+        'title': f"Recettes et dépenses, {report.start_date} au {report.end_date}",
+        'labels': [f"{month:%Y-%m}" for month in labels],
+        'series': [['Recettes', [round(months[month]['income'], 2) for month in labels]],
+                   ['Dépenses', [round(months[month]['expense'], 2) for month in labels]]],
+        'ylabel': 'Montant',
+    }
+
+
+def _invoice_status(report, using):
+    totals = {}
+    for model in (Invoice, ArchivedInvoice):
+        rows = model.objects.using(using).filter(
+            invoice_date__range=(report.start_date, report.end_date)
+        ).values_list('status').annotate(count=Count('pk')).order_by()
+        for invoice_status, count in rows:
+            totals[invoice_status] = totals.get(invoice_status, 0) + count
+    labels = [name for name, _ in Invoice.STATUS_CHOICES if name in totals]
+    return {
+        'title': f"Factures par statut, {report.start_date} au {report.end_date}",
+        'labels': [dict(Invoice.STATUS_CHOICES)[name] for name in labels],
+        'series': [['Factures', [totals[name] for name in labels]]],
+        'ylabel': 'Factures',
+    }
+
+
+def _aging(report, using):
+    amount = DecimalField(max_digits=15, decimal_places=2)
+    totals = unpaid_invoices(report.end_date, using).aggregate(**{
+        name: Sum(Case(When(bucket_condition(report.end_date, first, last), then='total_amount'),
+                       default=Value(Decimal(0)), output_field=amount))
+        for name, first, last in AGING_BUCKETS
+    })
+    return {
+        'title': f"Balance âgée fournisseurs au {report.end_date}",
+        'labels': ['Non échu', '1-30 j', '31-60 j', '61-90 j', '> 90 j'],
+        'series': [['Montant dû', [round(float(totals[name] or 0), 2) for name, _, _ in AGING_BUCKETS]]],
+        'ylabel': 'Montant',
+    }
+
+
+CHART_DATA = {
+    'income_expenses': _income_expenses,
+    'invoice_status': _invoice_status,
+    'aging': _aging,
+}
+
+
+def chart_data(kind, report, using=None):
+    """Chart spec of ``kind`` over the period of ``report``, see ``render_png``"""
+    return CHART_DATA[kind](report, using)
+
+
+def chart_version(kind, report, using=None):
+    """
+    Data version of a chart: changes with the report's period and with any
+    write to the tables the chart reads
+
+    Without version tracking the chart data itself is hashed, at the cost
+    of reading it.
+    """
+    versions = get_table_versions(CHART_MODELS[kind])
+    digest = hashlib.md5(f"{report.pk}|{kind}|{report.start_date}|{report.end_date}|".encode(),
+                         usedforsecurity=False)
+    if versions is None:
+        digest.update(json.dumps(chart_data(kind, report, using), cls=DjangoJSONEncoder).encode())
+    else:
+        for table, version, _ in versions:
+            digest.update(f"{table}:{version};".encode())
+    return digest.hexdigest()[:16]
+
+
+def get_pool():
+    """
+    Process pool the charts are drawn in, started on first use
+
+    Workers are spawned rather than forked, so they do not inherit the
+    threads and database connections of the web process, and are replaced
+    after ``CHART_RENDER_MAX_TASKS`` charts to bound matplotlib's memory.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'CHART_RENDER_WORKERS', 2),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                max_tasks_per_child=getattr(settings, 'CHART_RENDER_MAX_TASKS', 100),
+            )
+        return _pool
+
+
+def discard_pool(pool):
+    # A pool whose worker died accepts no more work
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def chart_path(kind, report, version):
+    directory = getattr(settings, 'CHART_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'charts'))
+    return os.path.join(directory, f"{report.pk}-{kind}-{version}.png")
+
+
+def render_chart(kind, report, version, using=None):
+    """
+    Path of the PNG of a chart at ``version``, drawn in the worker pool
+    unless cached on disk already
+
+    Older versions of the same chart are removed once the new one is written.
+
+    Raises:
+        concurrent.futures.TimeoutError: Not drawn within ``CHART_RENDER_TIMEOUT`` seconds
+        BrokenProcessPool: A worker died; the next chart starts a new pool
+    """
+    path = chart_path(kind, report, version)
+    if os.path.exists(path):
+        return path
+
+    spec = chart_data(kind, report, using)
+    pool = get_pool()
+    try:
+        image = pool.submit(render_png, spec).result(timeout=getattr(settings, 'CHART_RENDER_TIMEOUT', 30))
+    except BrokenProcessPool:
+        discard_pool(pool)
+        raise
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Written under a unique name then renamed: readers never see half a file
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, 'wb') as output:
+        output.write(image)
+    os.replace(temporary, path)
+
+    prefix = f"{report.pk}-{kind}-"
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith('.png') and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+    return path
@@ -0,0 +1,194 @@
+# backend/apps/utils/conditional.py
+import hashlib
+from calendar import timegm
+from django.apps import apps
+from django.db import connection
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+VERSION_TABLE = 'reports_tableversion'
+
+# Tables whose writes are counted; every conditional endpoint reads from these
+TRACKED_MODELS = (
+    'accounts.User',
+    'invoices.Invoice',
+    'invoices.InvoiceItem',
+    'transactions.BankAccount',
+    'transactions.Transaction',
+    'reports.Report',
+    'reports.Notification',
+    'reports.Anomaly',
+)
+
+
+def tracked_tables():
+    return [apps.get_model(label)._meta.db_table for label in TRACKED_MODELS]
+
+
+def trigger_names(table):
+    return [f"{table}_version_ai", f"{table}_version_ad", f"{table}_version_au"]
+
+
+def create_sql(vendor, table):
+    bump = (f"UPDATE {VERSION_TABLE} SET version = version + 1, changed_at = CURRENT_TIMESTAMP "
+            f"WHERE table_name = '{table}';")
+    if vendor == 'sqlite':
+        ai, ad, au = trigger_names(table)
+        return [
+            f"CREATE TRIGGER IF NOT EXISTS {ai} AFTER INSERT ON {table} BEGIN {bump} END",
+            f"CREATE TRIGGER IF NOT EXISTS {ad} AFTER DELETE ON {table} BEGIN {bump} END",
+            f"CREATE TRIGGER IF NOT EXISTS {au} AFTER UPDATE ON {table} BEGIN {bump} END",
+        ]
+    if vendor == 'postgresql':
+        # One bump per statement, so bulk writes cost a single counter update
+        return [
+            f"CREATE OR REPLACE FUNCTION {VERSION_TABLE}_bump() RETURNS trigger AS $$ BEGIN "
+            f"UPDATE {VERSION_TABLE} SET version = version + 1, changed_at = now() "
+            f"WHERE table_name = TG_TABLE_NAME; RETURN NULL; END $$ LANGUAGE plpgsql",
+            f"CREATE TRIGGER {trigger_names(table)[0]} AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+            f"ON {table} FOR EACH STATEMENT EXECUTE FUNCTION {VERSION_TABLE}_bump()",
+        ]
+    return []
+
+
+def drop_sql(vendor, table):
+    if vendor == 'sqlite':
+        return [f"DROP TRIGGER IF EXISTS {name}" for name in trigger_names(table)]
+    if vendor == 'postgresql':
+        return [f"DROP TRIGGER IF EXISTS {trigger_names(table)[0]} ON {table}"]
+    return []
+
+
+def is_installed(cursor, vendor, table):
+    if vendor == 'sqlite':
+        names = trigger_names(table)
+        cursor.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({', '.join(['%s'] * len(names))})",
+            names
+        )
+        return cursor.fetchone()[0] == len(names)
+    if vendor == 'postgresql':
+        cursor.execute("SELECT COUNT(*) FROM pg_trigger WHERE tgname = %s", [trigger_names(table)[0]])
+        return cursor.fetchone()[0] == 1
+    return False
+
+
+def ensure_version_tracking(using_connection=None, repair_only=False):
+    """
+    Install the write counters of the tracked tables
+
+    Each table gets a row in the version table and triggers bumping it on
+    every insert, update and delete, including ``bulk_create``, ``update()``
+    and raw SQL. A table whose triggers were missing (SQLite drops them when
+    a migration remakes the table) is bumped once when they are restored, so
+    validators handed out before cannot match anymore.
+    """
+    using_connection = using_connection or connection
+    vendor = using_connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    with using_connection.cursor() as cursor:
+        if repair_only and VERSION_TABLE not in using_connection.introspection.table_names(cursor):
+            return
+        cursor.execute(f"SELECT table_name FROM {VERSION_TABLE}")
+        existing = {row[0] for row in cursor.fetchall()}
+        for table in tracked_tables():
+            if table not in existing:
+                cursor.execute(
+                    f"INSERT INTO {VERSION_TABLE} (table_name, version, changed_at) VALUES (%s, 0, %s)",
+                    [table, timezone.now()]
+                )
+            if is_installed(cursor, vendor, table):
+                continue
+            for statement in drop_sql(vendor, table) + create_sql(vendor, table):
+                cursor.execute(statement)
+            cursor.execute(
+                f"UPDATE {VERSION_TABLE} SET version = version + 1, changed_at = %s WHERE table_name = %s",
+                [timezone.now(), table]
+            )
+
+
+def drop_version_tracking(using_connection=None):
+    using_connection = using_connection or connection
+    with using_connection.cursor() as cursor:
+        for table in tracked_tables():
+            for statement in drop_sql(using_connection.vendor, table):
+                cursor.execute(statement)
+        if using_connection.vendor == 'postgresql':
+            cursor.execute(f"DROP FUNCTION IF EXISTS {VERSION_TABLE}_bump()")
+
+
+def get_table_versions(models):
+    """
+    Return (table, version, changed_at) of the tables of ``models``
+
+    Returns:
+        list: One tuple per table, or None when a table is not tracked
+    """
+    from apps.reports.models import TableVersion
+
+    tables = sorted({model._meta.db_table for model in models})
+    versions = list(
+        TableVersion.objects.filter(table_name__in=tables)
+        .order_by('table_name').values_list('table_name', 'version', 'changed_at')
+    )
+    if not tables or len(versions) != len(tables):
+        return None
+    return versions
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``list`` and ``retrieve`` with ETag and Last-Modified validators
+
+    The validators come from the write counters of ``conditional_models``,
+    every table the representation reads, so checking them costs one small
+    query. When the client's copy is current the response is a 304 and the
+    endpoint's own queries and serialization are skipped. The ETag also
+    covers the user, the full query string and the Accept header.
+    """
+    conditional_models = ()
+
+    def get_conditional_validators(self, request, models=None, variant=''):
+        versions = get_table_versions(models or self.conditional_models)
+        if versions is None:
+            return None, None
+        digest = hashlib.md5(usedforsecurity=False)
+        for table, version, _ in versions:
+            digest.update(f"{table}:{version};".encode())
+        digest.update(
+            f"{request.user.pk}|{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}|{variant}".encode()
+        )
+        last_modified = max(changed_at for _, _, changed_at in versions)
+        return f'W/"{digest.hexdigest()}"', timegm(last_modified.utctimetuple())
+
+    def conditional_response(self, handler, request, *args, models=None, variant='', **kwargs):
+        """
+        Answer with ``handler`` unless the client's copy is current
+
+        ``models`` replaces ``conditional_models`` for actions reading other
+        tables; ``variant`` covers inputs the URL does not show, such as a
+        date defaulting to today.
+        """
+        etag, last_modified = self.get_conditional_validators(request, models, variant)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Private data, revalidated on every use
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Accept', 'Authorization'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,26 @@
+# backend/apps/utils/filters.py
+from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
+
+# Highest code point, used as the open upper bound of a prefix range
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+class PrefixFilter(filters.CharFilter):
+    """
+    Case-sensitive prefix match written as a range so it can use a b-tree index
+
+    ``startswith`` compiles to ``LIKE 'x%' ESCAPE '\\'`` on SQLite, which the
+    planner cannot serve from an index; ``field >= 'x' AND field < 'x\\U0010ffff'``
+    is a plain index range scan on every backend.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        if self.distinct:
+            qs = qs.distinct()
+        return qs.filter(**{
+            f"{self.field_name}__gte": value,
+            f"{self.field_name}__lt": value + PREFIX_UPPER_BOUND,
+        })
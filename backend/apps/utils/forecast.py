@@ -0,0 +1,165 @@
+# backend/apps/utils/forecast.py
+from datetime import date, timedelta
+from django.conf import settings
+from django.db.models import Sum
+from apps.invoices.models import Invoice
+from apps.transactions.models import ArchivedTransaction, BankAccount, Transaction
+from apps.utils.aging import unpaid_invoices
+from apps.utils.balances import SETTLED_STATUSES, signed_amount
+from apps.utils.conditional import get_table_versions
+from apps.utils.lru import TTLCache
+
+# numpy is imported where used, so workers do not load it at startup
+
+# Forecasts by (horizon, day, table versions): a write to any of the tables
+# changes the key, older entries age out of the LRU
+forecast_cache = TTLCache(
+    max_size=getattr(settings, 'FORECAST_CACHE_SIZE', 16),
+    ttl=getattr(settings, 'FORECAST_CACHE_TTL', 3600),
+)
+
+FORECAST_MODELS = (Transaction, Invoice, BankAccount)
+
+
+def history_matrix(account_ids, start, end, using=None):
+    """
+    Daily net settled flows of every account from ``start`` to ``end``, as an
+    ``(accounts, days)`` array
+
+    Invoice payments are left out: unpaid invoices are projected on their
+    due dates instead, they would be counted twice otherwise.
+    """
+    import numpy as np
+
+    index = {account_id: row for row, account_id in enumerate(account_ids)}
+    history = np.zeros((len(account_ids), (end - start).days + 1))
+    for model, invoice_field in ((Transaction, 'related_invoice'), (ArchivedTransaction, 'related_invoice_id')):
+        rows = list(model.objects.using(using).filter(
+            status__in=SETTLED_STATUSES, transaction_date__range=(start, end), **{f"{invoice_field}__isnull": True}
+        ).values('bank_account_id', 'transaction_date').annotate(
+            total=Sum(signed_amount())
+        ).values_list('bank_account_id', 'transaction_date', 'total').order_by())
+        rows = [(index[account_id], (day - start).days, float(total))
+                for account_id, day, total in rows if account_id in index]
+        if rows:
+            accounts, days, totals = zip(*rows)
+            np.add.at(history, (np.array(accounts), np.array(days)), np.array(totals))
+    return history
+
+
+def scheduled_outflows(today, horizon, using=None):
+    """
+    Unpaid invoice amounts per forecast day, the first day being tomorrow;
+    invoices already due are taken as paid tomorrow
+    """
+    import numpy as np
+
+    outflows = np.zeros(horizon)
+    rows = unpaid_invoices(today, using).filter(due_date__lte=today + timedelta(days=horizon)).values(
+        'due_date'
+    ).annotate(total=Sum('total_amount')).values_list('due_date', 'total').order_by()
+    for due_date, total in rows:
+        outflows[max((due_date - today).days, 1) - 1] += float(total)
+    return outflows
+
+
+def project(history, balances, first_day, horizon, scheduled=None, trend_days=None):
+    """
+    Project the balances of all accounts ``horizon`` days ahead at once
+
+    Each account's daily flow is its mean over the last ``trend_days`` days
+    of history, plus its mean deviation on the same weekday, plus the mean
+    deviation left on the same day of the month (rent, payroll). The
+    seasonal means are matrix products of the history with one-hot weekday
+    and day-of-month matrices. Scheduled outflows are split between the
+    accounts by their share of past outflows.
+
+    Args:
+        history: ``(accounts, days)`` array of daily net flows, the last day
+            being the day before the forecast starts
+        balances: Current balance of every account
+        first_day (date): Day of the first history column
+        horizon (int): Days forecast
+        scheduled: Outflows per forecast day, shared by all accounts
+        trend_days (int): Days of the level, ``FORECAST_TREND_DAYS`` by default
+
+    Returns:
+        ndarray: ``(accounts, horizon)`` closing balances, from the day after the history
+    """
+    import numpy as np
+
+    trend_days = trend_days or getattr(settings, 'FORECAST_TREND_DAYS', 91)
+    accounts, days = history.shape
+    dates = np.datetime64(first_day, 'D') + np.arange(days + horizon)
+    weekday = (dates.astype('int64') + 3) % 7
+    day_of_month = (dates - dates.astype('datetime64[M]')).astype('int64')
+    past, future = slice(0, days), slice(days, days + horizon)
+
+    level = history[:, -trend_days:].mean(axis=1) if days else np.zeros(accounts)
+    residual = history - level[:, None]
+    seasonal = np.zeros((accounts, horizon))
+    for period, positions in ((7, weekday), (31, day_of_month)):
+        one_hot = np.eye(period)[positions[past]]
+        profile = residual @ one_hot / np.maximum(one_hot.sum(axis=0), 1)
+        # The day-of-month profile is fitted on what the weekly one leaves
+        residual = residual - profile[:, positions[past]]
+        seasonal += profile[:, positions[future]]
+
+    flows = level[:, None] + seasonal
+    if scheduled is not None and accounts:
+        outflows = np.clip(-history, 0, None).sum(axis=1)
+        shares = outflows / outflows.sum() if outflows.sum() else np.full(accounts, 1 / accounts)
+        flows -= shares[:, None] * scheduled[None, :]
+    return np.asarray(balances, dtype=float)[:, None] + np.cumsum(flows, axis=1)
+
+
+def forecast(horizon, today=None, using=None):
+    """
+    Daily balances of every bank account over the next ``horizon`` days
+
+    Served from ``forecast_cache`` until a transaction, invoice or bank
+    account is written; computed from ``FORECAST_HISTORY_DAYS`` days of
+    history otherwise, with one grouped query per table.
+
+    Returns:
+        dict: ``start_date``, ``end_date``, ``scheduled_outflows`` and per
+        account its daily ``balances``, lowest balance and first day below
+        zero; ``total`` sums the accounts day by day
+    """
+    today = today or date.today()
+    versions = get_table_versions(FORECAST_MODELS)
+    key = (horizon, today, tuple(versions)) if versions is not None else None
+    if key is not None and (cached := forecast_cache.get(key)) is not None:
+        return cached
+
+    accounts = list(BankAccount.objects.using(using).order_by('pk').values_list('pk', 'account_name', 'current_balance'))
+    first_day = today - timedelta(days=getattr(settings, 'FORECAST_HISTORY_DAYS', 365))
+    history = history_matrix([pk for pk, _, _ in accounts], first_day, today - timedelta(days=1), using)
+    scheduled = scheduled_outflows(today, horizon, using)
+    balances = project(history, [float(balance) for _, _, balance in accounts], first_day, horizon, scheduled)
+
+    dates = [today + timedelta(days=offset) for offset in range(1, horizon + 1)]
+    lowest = balances.argmin(axis=1)
+    negative = balances < 0
+    first_negative = negative.argmax(axis=1)
+    result = {
+        'start_date': dates[0],
+        'end_date': dates[-1],
+        'scheduled_outflows': round(float(scheduled.sum()), 2),
+        'total': balances.sum(axis=0).round(2).tolist(),
+        'accounts': [
+            {
+                'bank_account': pk,
+                'account_name': name,
+                'current_balance': current,
+                'balances': row,
+                'min_balance': row[lowest[position]],
+                'min_date': dates[lowest[position]],
+                'first_negative_date': dates[first_negative[position]] if negative[position].any() else None,
+            }
+            for position, ((pk, name, current), row) in enumerate(zip(accounts, balances.round(2).tolist()))
+        ],
+    }
+    if key is not None:
+        forecast_cache.set(key, result)
+    return result
@@ -0,0 +1,194 @@
+# backend/apps/utils/invoice_import.py
+import csv
+import json
+import time
+from itertools import islice
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+from apps.invoices.models import Invoice, InvoiceItem
+from apps.invoices.serializers import InvoiceImportSerializer
+from apps.utils.suppliers import supplier_index
+
+FORMATS = ('jsonl', 'csv')
+
+# CSV columns of the invoice; item columns carry an ``item_`` prefix
+# (item_description, item_quantity, item_unit_price, item_total_price)
+CSV_INVOICE_COLUMNS = ('invoice_number', 'supplier', 'invoice_date', 'due_date',
+                       'total_amount', 'tax_amount', 'status')
+
+# Columns an upsert overwrites on an existing invoice
+UPSERT_FIELDS = ['supplier', 'normalized_supplier', 'invoice_date', 'due_date', 'total_amount', 'tax_amount', 'status', 'updated_at']
+
+
+def detect_format(filename):
+    """Import format from a file name, None when the extension is not known"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return {'jsonl': 'jsonl', 'ndjson': 'jsonl', 'json': 'jsonl', 'csv': 'csv'}.get(extension)
+
+
+def read_jsonl(lines):
+    """
+    Yield ``(line number, invoice dict)`` from JSON lines, one invoice with
+    its ``items`` list per line; unreadable lines yield a string error instead
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = f"Invalid JSON: {e}"
+        if not isinstance(record, (dict, str)):
+            record = 'Each line must be a JSON object'
+        yield number, record
+
+
+def read_csv(lines):
+    """
+    Yield ``(line number, invoice dict)`` from CSV with one row per item
+
+    Consecutive rows with the same invoice_number make one invoice; a row
+    with an empty item_description adds no item (invoices without items).
+    Empty invoice columns are left out, so serializer defaults apply.
+    """
+    reader = csv.DictReader(lines)
+    current, start = None, None
+    for row in reader:
+        number = (row.get('invoice_number') or '').strip()
+        if current is None or number != current['invoice_number']:
+            if current is not None:
+                yield start, current
+            start = reader.line_num
+            current = {column: row[column] for column in CSV_INVOICE_COLUMNS if row.get(column)}
+            current['invoice_number'] = number
+            current['items'] = []
+        if row.get('item_description'):
+            current['items'].append({
+                column[len('item_'):]: value for column, value in row.items()
+                if column and column.startswith('item_') and value
+            })
+    if current is not None:
+        yield start, current
+
+
+def _chunks(records, size):
+    records = iter(records)
+    while chunk := list(islice(records, size)):
+        yield chunk
+
+
+def _save_chunk(rows, existing, user, upsert):
+    """
+    Insert the validated ``rows`` of a chunk with two ``bulk_create`` calls
+
+    Upserted invoices keep their primary key, uploader and file; their items
+    are replaced.
+    """
+    invoices, items = [], []
+    with transaction.atomic():
+        # bulk_create skips Invoice.save: resolve each distinct supplier name once
+        supplier_ids = {name: supplier_index.resolve(name) for name in {data['supplier'] for data in rows}}
+        for data in rows:
+            data = dict(data)
+            item_rows = data.pop('items', [])
+            invoice = Invoice(uploaded_by=user, original_file='', normalized_supplier_id=supplier_ids[data['supplier']],
+                              **data)
+            invoices.append(invoice)
+            # The conflicting row keeps its own key, the new one is discarded
+            invoice_id = existing.get(invoice.invoice_number, invoice.pk)
+            items.extend(InvoiceItem(invoice_id=invoice_id, **item) for item in item_rows)
+
+        if upsert:
+            Invoice.objects.bulk_create(invoices, update_conflicts=True, unique_fields=['invoice_number'],
+                                        update_fields=UPSERT_FIELDS)
+            if existing:
+                InvoiceItem.objects.filter(invoice_id__in=existing.values()).delete()
+        else:
+            Invoice.objects.bulk_create(invoices)
+        InvoiceItem.objects.bulk_create(items)
+    return len(items)
+
+
+def import_invoices(records, user, upsert=False, chunk_size=None, dry_run=False):
+    """
+    Validate and insert invoices with their items, chunk by chunk
+
+    Each chunk is validated row by row with a single serializer and one
+    query for the invoice numbers already stored, then saved in its own
+    transaction. Rows that fail validation, repeat an invoice number of the
+    import or, without ``upsert``, exist already, are reported and skipped;
+    the other rows of the chunk are saved.
+
+    Args:
+        records: ``(line number, invoice dict)`` pairs, see ``read_jsonl`` and ``read_csv``
+        user (User): Recorded as the uploader of the new invoices
+        upsert (bool): Update invoices whose number exists and replace their items
+        chunk_size (int): Invoices per chunk, ``INVOICE_IMPORT_CHUNK_SIZE`` by default
+        dry_run (bool): Validate only
+
+    Returns:
+        dict: Created, updated, failed invoices, items written, the first
+        ``INVOICE_IMPORT_MAX_ERRORS`` errors and the throughput
+    """
+    chunk_size = chunk_size or getattr(settings, 'INVOICE_IMPORT_CHUNK_SIZE', 500)
+    max_errors = getattr(settings, 'INVOICE_IMPORT_MAX_ERRORS', 100)
+    started = time.perf_counter()
+    report = {'created': 0, 'updated': 0, 'failed': 0, 'items': 0, 'errors': [], 'dry_run': dry_run}
+    seen = set()
+    # One serializer for every row: its fields are built once
+    validator = InvoiceImportSerializer()
+
+    def fail(line, invoice_number, errors):
+        report['failed'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'line': line, 'invoice_number': invoice_number, 'errors': errors})
+
+    for chunk in _chunks(records, chunk_size):
+        valid = []
+        for line, record in chunk:
+            if isinstance(record, str):
+                fail(line, None, [record])
+                continue
+            try:
+                data = validator.run_validation(record)
+            except ValidationError as e:
+                fail(line, record.get('invoice_number'), e.detail)
+                continue
+            if data['invoice_number'] in seen:
+                fail(line, data['invoice_number'], ['Repeats an invoice number of this import'])
+                continue
+            seen.add(data['invoice_number'])
+            valid.append((line, data))
+
+        existing = dict(Invoice.objects.filter(
+            invoice_number__in=[data['invoice_number'] for _, data in valid]
+        ).values_list('invoice_number', 'pk'))
+        if existing and not upsert:
+            for line, data in valid:
+                if data['invoice_number'] in existing:
+                    fail(line, data['invoice_number'], ['An invoice with this number already exists'])
+            valid = [(line, data) for line, data in valid if data['invoice_number'] not in existing]
+            existing = {}
+        if not valid:
+            continue
+
+        updated = sum(data['invoice_number'] in existing for _, data in valid)
+        if not dry_run:
+            try:
+                report['items'] += _save_chunk([data for _, data in valid], existing, user, upsert)
+            except IntegrityError as e:
+                # Written concurrently since the chunk was checked: the chunk is rolled back
+                for line, data in valid:
+                    fail(line, data['invoice_number'], [str(e)])
+                continue
+        else:
+            report['items'] += sum(len(data.get('items', [])) for _, data in valid)
+        report['created'] += len(valid) - updated
+        report['updated'] += updated
+
+    elapsed = time.perf_counter() - started
+    processed = report['created'] + report['updated'] + report['failed']
+    report['elapsed_seconds'] = round(elapsed, 3)
+    report['invoices_per_second'] = round(processed / elapsed) if elapsed else processed
+    return report
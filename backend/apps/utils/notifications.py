@@ -0,0 +1,171 @@
+# backend/apps/utils/notifications.py
+import json
+from collections import Counter
+from contextlib import contextmanager
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router, transaction as db_transaction
+from django.db.models import Count, F, Q
+from apps.accounts.models import User
+from apps.reports.models import Notification, NotificationCounter
+from apps.reports.serializers import NotificationSerializer
+from apps.utils.pubsub import get_broker
+
+# Roles told about anomalies and failed OCR jobs
+ATTENTION_ROLES = ('financial_director', 'admin')
+
+
+def user_channel(user_id):
+    return f"notifications:{user_id}"
+
+
+def stream_message(event, data):
+    return {'event': event, 'data': json.dumps(data, cls=DjangoJSONEncoder)}
+
+
+def unread_count(user_id, using=None):
+    """
+    Unread notifications of a user, read from the counter only
+
+    Users without a counter row never had an unread notification.
+    """
+    count = NotificationCounter.objects.using(using).filter(pk=user_id).values_list('unread', flat=True).first()
+    return count or 0
+
+
+def add_unread(deltas, using=None):
+    """
+    Add ``{user_id: delta}`` to the unread counters with ``F()`` updates
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    counters = NotificationCounter.objects.using(using)
+    counters.bulk_create([NotificationCounter(user_id=user_id) for user_id in deltas], ignore_conflicts=True)
+    # Fan-outs add the same delta to every recipient: one statement
+    for delta in set(deltas.values()):
+        counters.filter(pk__in=[user_id for user_id, value in deltas.items() if value == delta]).update(
+            unread=F('unread') + delta
+        )
+
+
+def recount_unread(user_ids=None, using=None):
+    """
+    Reset the unread counters from the notification table
+
+    Returns:
+        int: Counters written
+    """
+    notifications = Notification.objects.using(using).filter(read=False)
+    counters = NotificationCounter.objects.using(using)
+    if user_ids is not None:
+        notifications = notifications.filter(user_id__in=user_ids)
+        counters = counters.filter(pk__in=user_ids)
+    counts = dict(notifications.values('user_id').annotate(unread=Count('pk')).values_list('user_id', 'unread').order_by())
+    with db_transaction.atomic(using=using):
+        counters.exclude(pk__in=counts).update(unread=0)
+        NotificationCounter.objects.using(using).bulk_create(
+            [NotificationCounter(user_id=user_id, unread=unread) for user_id, unread in counts.items()],
+            update_conflicts=True, unique_fields=['user'], update_fields=['unread'], batch_size=1000,
+        )
+    return len(counts)
+
+
+def publish(notifications=(), user_ids=(), using=None):
+    """
+    Push new ``notifications`` and the unread count of their users and of
+    ``user_ids`` to the open streams, once the current transaction commits
+    """
+    def send():
+        broker = get_broker()
+        notified = {notification.user_id for notification in notifications}
+        listening = {user_id for user_id in notified | set(user_ids)
+                     if broker.has_subscribers(user_channel(user_id))}
+        if not listening:
+            return
+        for notification in notifications:
+            if notification.user_id in listening:
+                broker.publish(user_channel(notification.user_id),
+                               stream_message('notification', NotificationSerializer(notification).data))
+        counts = dict(NotificationCounter.objects.using(using).filter(pk__in=listening).values_list('user_id', 'unread'))
+        for user_id in listening:
+            broker.publish(user_channel(user_id), stream_message('unread_count', {'unread_count': counts.get(user_id, 0)}))
+    db_transaction.on_commit(send, using=using)
+
+
+@contextmanager
+def track_unread(instance, using=None, deleting=False):
+    """
+    Wrap the save or delete of one notification with its counter update and push
+
+    Queryset ``update()`` and ``delete()`` bypass this: bulk paths go through
+    ``add_unread`` (``mark_all_read``, ``notify``), ``recount_unread`` repairs
+    anything else.
+    """
+    using = using or router.db_for_write(Notification, instance=instance)
+    created = instance._state.adding
+    with db_transaction.atomic(using=using):
+        before = None
+        if not created:
+            before = Notification.objects.using(using).select_for_update().filter(
+                pk=instance.pk
+            ).values_list('user_id', 'read').first()
+        yield
+        deltas = Counter()
+        if before is not None and not before[1]:
+            deltas[before[0]] -= 1
+        if not deleting and not instance.read:
+            deltas[instance.user_id] += 1
+        add_unread(deltas, using)
+        publish([instance] if created else (), {instance.user_id} | ({before[0]} if before else set()), using)
+
+
+def notify(title, message, priority='medium', users=None, roles=None):
+    """
+    Write one notification per recipient with a single ``bulk_create``
+
+    Args:
+        title (str): Notification title
+        message (str): Notification body
+        priority (str): One of ``Notification.PRIORITY_CHOICES``
+        users: Users or user ids to notify
+        roles: Roles whose active users are notified
+
+    Returns:
+        list: The created notifications
+    """
+    conditions = Q()
+    if users:
+        conditions |= Q(pk__in=[getattr(user, 'pk', user) for user in users])
+    if roles:
+        conditions |= Q(role__in=roles)
+    if not conditions:
+        return []
+    user_ids = list(User.objects.filter(conditions, is_active=True).values_list('pk', flat=True))
+
+    with db_transaction.atomic():
+        notifications = Notification.objects.bulk_create([
+            Notification(user_id=user_id, title=title, message=message, priority=priority)
+            for user_id in user_ids
+        ], batch_size=1000)
+        add_unread({user_id: 1 for user_id in user_ids})
+        publish(notifications)
+    return notifications
+
+
+def notify_attention(title, message, priority='high'):
+    """Notify every financial director and administrator"""
+    return notify(title, message, priority=priority, roles=ATTENTION_ROLES)
+
+
+def mark_all_read(user_id):
+    """
+    Mark every notification of a user as read
+
+    Returns:
+        int: Notifications marked
+    """
+    with db_transaction.atomic():
+        marked = Notification.objects.filter(user_id=user_id, read=False).update(read=True)
+        add_unread({user_id: -marked})
+        publish(user_ids={user_id})
+    return marked
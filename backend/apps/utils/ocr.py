@@ -1,8 +1,5 @@
 # backend/apps/utils/ocr.py
 import os
-import cv2
-import pytesseract
-from pytesseract import Output
 import re
 from datetime import datetime
 import logging
@@ -25,6 +22,10 @@ def process_invoice_ocr(file_path):
         # In a real implementation, you would use a more sophisticated OCR solution
         # This is a simplified example
         
+        # Imported on first use so workers that never run OCR don't load OpenCV
+        import cv2
+        import pytesseract
+        
         # Read the image
         image = cv2.imread(file_path)
         if image is None:
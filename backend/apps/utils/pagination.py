@@ -0,0 +1,249 @@
+# backend/apps/utils/pagination.py
+import base64
+import json
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_table_rows(model):
+    """
+    Return a cheap row estimate for a whole table, without a COUNT(*) scan
+
+    Args:
+        model (Model): The model whose table is estimated
+
+    Returns:
+        int: Estimated number of rows, or None when the backend has no estimate
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        elif connection.vendor == 'sqlite':
+            # Row ids grow monotonically, MAX(rowid) is a single b-tree seek
+            cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None:
+        return 0
+    return max(int(row[0]), 0)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a composite, unique ordering such as (transaction_date, id)
+
+    Each page is fetched with a ``WHERE (date, id) < (last_date, last_id)``
+    predicate instead of an ``OFFSET``, so page 10,000 costs the same as page 1
+    and rows inserted meanwhile never shift the pages. The ordering comes from
+    the ``OrderingFilter`` or the view's ``ordering`` attribute, and the primary
+    key is always appended as the final tie-breaker; ordering fields must be
+    non-nullable and should be covered by a matching index.
+
+    No ``COUNT(*)`` is issued unless the client asks for one with
+    ``?count=exact`` or ``?count=approx``. Requests carrying the legacy
+    ``?page=`` parameter are served by ``PageNumberPagination`` so existing
+    clients keep working.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 100)
+    count_query_param = 'count'
+    approximate_count_cap = getattr(settings, 'PAGINATION_APPROXIMATE_COUNT_CAP', 10000)
+    legacy_page_query_param = 'page'
+    ordering = ('-pk',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.legacy_paginator = None
+
+        if (self.legacy_page_query_param in request.query_params
+                and self.cursor_query_param not in request.query_params):
+            self.legacy_paginator = PageNumberPagination()
+            self.legacy_paginator.page_size_query_param = self.page_size_query_param
+            self.legacy_paginator.max_page_size = self.max_page_size
+            return self.legacy_paginator.paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [self._get_field(queryset.model, name) for name in self.ordering]
+
+        values, reverse = self.decode_cursor(request)
+        self.count = self.get_count(queryset, request)
+
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, reverse))
+        order_by = [self._reverse_order(name) for name in self.ordering] if reverse else self.ordering
+        rows = list(queryset.order_by(*order_by)[:self.page_size + 1])
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy_paginator is not None:
+            return self.legacy_paginator.get_paginated_response(data)
+
+        payload = {}
+        if self.count is not None:
+            payload['count'], payload['count_is_estimate'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering as a list of field names ending with the primary key
+        """
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or self.ordering
+
+        pk_name = queryset.model._meta.pk.name
+        ordering = [name.replace('pk', pk_name) if name.lstrip('-') == 'pk' else name
+                    for name in ordering]
+        if pk_name not in [name.lstrip('-') for name in ordering]:
+            descending = ordering[-1].startswith('-')
+            ordering.append(f"-{pk_name}" if descending else pk_name)
+        return ordering
+
+    def get_count(self, queryset, request):
+        """
+        Return ``(count, is_estimate)`` when requested by the client, else None
+
+        ``approx`` uses the table statistics for unfiltered querysets and a
+        count capped at ``approximate_count_cap`` rows otherwise.
+        """
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            return queryset.count(), False
+        if mode != 'approx':
+            return None
+
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model)
+            if estimate is not None:
+                return estimate, True
+        capped = queryset.order_by()[:self.approximate_count_cap + 1].count()
+        return min(capped, self.approximate_count_cap), capped > self.approximate_count_cap
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        values = [self._row_value(row, field) for field in self.fields]
+        payload = {'v': [None if value is None else str(value) for value in values]}
+        if reverse:
+            payload['r'] = 1
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, self.legacy_page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+            raw_values = payload['v']
+            if len(raw_values) != len(self.fields):
+                raise ValueError(raw_values)
+            values = [field.to_python(value) for field, value in zip(self.fields, raw_values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(payload.get('r'))
+
+    def _keyset_filter(self, values, reverse):
+        """
+        Build ``(a, b) > (x, y)`` as ``a >= x AND (a > x OR (a = x AND b > y))``
+
+        The redundant bound on the leading column lets the planner drive the
+        scan from the index range instead of a multi-index OR plus a sort.
+        """
+        lookups = []
+        for name in self.ordering:
+            descending = name.startswith('-')
+            lookups.append('gt' if descending == reverse else 'lt')
+
+        condition = Q()
+        for position in range(len(self.ordering)):
+            clause = Q(**{self.fields[i].name: values[i] for i in range(position)})
+            clause &= Q(**{f"{self.fields[position].name}__{lookups[position]}": values[position]})
+            condition |= clause
+        leading_bound = Q(**{f"{self.fields[0].name}__{lookups[0]}e": values[0]})
+        return leading_bound & condition
+
+    def _get_field(self, model, name):
+        return model._meta.get_field(name.lstrip('-'))
+
+    def _reverse_order(self, name):
+        return name[1:] if name.startswith('-') else f"-{name}"
+
+    def _row_value(self, row, field):
+        if isinstance(row, dict):
+            return row.get(field.attname, row.get(field.name))
+        return getattr(row, field.attname)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Number of results to return per page (max {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include a row count: "exact" or "approx".',
+                'schema': {'type': 'string', 'enum': ['exact', 'approx']},
+            },
+        ]
@@ -0,0 +1,117 @@
+# backend/apps/utils/pubsub.py
+import asyncio
+import threading
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Delivered instead of the messages a slow subscriber had no room for
+OVERFLOW = {'event': 'resync', 'data': '{}'}
+
+
+class Subscription:
+    """
+    Messages of one channel for one consumer, read from its event loop
+
+    The queue is bounded: when a consumer falls behind, its pending messages
+    are dropped for a single ``OVERFLOW`` message telling it to refetch.
+    """
+
+    def __init__(self, broker, channel, max_queue):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def offer(self, message):
+        # Runs on the subscriber's loop
+        if self.overflowed:
+            return
+        if self.queue.full():
+            # The consumer refetches everything, the queued messages are moot
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+            return
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Next message; raises TimeoutError after ``timeout`` seconds without one"""
+        message = await asyncio.wait_for(self.queue.get(), timeout)
+        if message is OVERFLOW:
+            self.overflowed = False
+        return message
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Publish/subscribe between the threads and event loops of one process
+
+    Subscribers are ``asyncio`` consumers (one per open stream); publishers
+    may be any thread, typically a sync view committing a write. An idle
+    subscriber costs a queue and a set entry, nothing is polled.
+
+    Only subscribers of the same process receive a message: deployments
+    running several worker processes set ``NOTIFICATION_BROKER`` to a broker
+    backed by an external service with the same ``subscribe``, ``publish``
+    and ``has_subscribers`` methods.
+    """
+
+    def __init__(self, max_queue=None):
+        self.max_queue = max_queue or getattr(settings, 'NOTIFICATION_STREAM_QUEUE_SIZE', 100)
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Must be called from the consumer's running event loop"""
+        subscription = Subscription(self, channel, self.max_queue)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def has_subscribers(self, channel):
+        """Lets publishers skip building messages nobody would receive"""
+        return channel in self._channels
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._channels.values())
+
+    def publish(self, channel, message):
+        """
+        Send ``message`` (a dict with ``event`` and ``data`` strings) to the
+        subscribers of ``channel``; safe to call from any thread
+
+        Returns:
+            int: Subscribers the message was handed to
+        """
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        delivered = 0
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+                delivered += 1
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                self.unsubscribe(subscription)
+        return delivered
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """The process-wide broker configured by ``NOTIFICATION_BROKER``"""
+    return import_string(getattr(settings, 'NOTIFICATION_BROKER', 'apps.utils.pubsub.InProcessBroker'))()
@@ -0,0 +1,98 @@
+# backend/apps/utils/query_budget.py
+from contextlib import ContextDecorator
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test.utils import CaptureQueriesContext
+
+# Queries allowed per list request, whatever the page size; conditional GET
+# endpoints include the one reading their validators
+ENDPOINT_BUDGETS = {
+    '/api/transactions/': 2,
+    '/api/transactions/?page=1': 3,
+    '/api/invoices/': 2,
+    '/api/invoices/?page=1': 3,
+    '/api/invoices/?fields=id,invoice_number,items': 3,
+    '/api/anomalies/': 2,
+    '/api/anomalies/?page=1': 3,
+    '/api/reports/': 3,
+    '/api/notifications/': 3,
+    '/api/bank-accounts/': 2,
+    '/api/users/': 2,
+}
+
+PAGE_SIZES = (5, 50)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code runs more queries than its budget"""
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail when the wrapped block runs more than ``max_queries`` SQL queries
+
+    Usable as a context manager or a decorator::
+
+        with query_budget(2):
+            client.get('/api/invoices/')
+
+        @query_budget(1)
+        def build_page(): ...
+
+    The captured queries are kept on ``.queries`` and listed in the error, so
+    an N+1 regression points at the repeated statement directly.
+    """
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.using = using
+        self.queries = []
+
+    def __enter__(self):
+        self._capture = CaptureQueriesContext(connections[self.using])
+        self._capture.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._capture.__exit__(exc_type, exc_value, traceback)
+        self.queries = [query['sql'] for query in self._capture.captured_queries]
+        if exc_type is None and len(self.queries) > self.max_queries:
+            listing = '\n'.join(f"{position}. {sql}" for position, sql in enumerate(self.queries, 1))
+            raise QueryBudgetExceeded(
+                f"{len(self.queries)} queries executed, budget is {self.max_queries}:\n{listing}"
+            )
+        return False
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+
+def check_endpoint_budgets(client, budgets=None, page_sizes=PAGE_SIZES):
+    """
+    Request every endpoint of ``budgets`` at each page size with ``client``
+
+    Returns:
+        tuple: ``{endpoint: [query count per page size]}`` (None where the
+        budget was exceeded) and the list of failure messages, including
+        query counts that grow with the page size
+    """
+    counts, failures = {}, []
+    for endpoint, budget in (budgets or ENDPOINT_BUDGETS).items():
+        counts[endpoint] = []
+        for page_size in page_sizes:
+            separator = '&' if '?' in endpoint else '?'
+            url = f"{endpoint}{separator}page_size={page_size}"
+            try:
+                with query_budget(budget) as budget_check:
+                    response = client.get(url)
+            except QueryBudgetExceeded as error:
+                failures.append(f"{url}: {error}")
+                counts[endpoint].append(None)
+                continue
+            if response.status_code != 200:
+                failures.append(f"{url}: HTTP {response.status_code}")
+            counts[endpoint].append(budget_check.count)
+
+        if None not in counts[endpoint] and len(set(counts[endpoint])) > 1:
+            failures.append(f"{endpoint}: query count depends on page size {counts[endpoint]}")
+    return counts, failures
@@ -0,0 +1,248 @@
+# backend/apps/utils/reconciliation.py
+import bisect
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+from apps.transactions.models import Transaction
+from apps.invoices.models import Invoice
+from apps.utils.balances import apply_deltas, movements
+
+
+def _to_cents(amount):
+    """Convert a Decimal amount to an integer number of cents"""
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def build_invoice_index(invoices):
+    """
+    Index open invoices by amount for range lookups
+
+    Args:
+        invoices (iterable): Tuples of (id, invoice_number, supplier, total_amount,
+            invoice_date, due_date)
+
+    Returns:
+        tuple: (sorted list of amounts in cents, list of invoice tuples in the same order)
+    """
+    rows = sorted(
+        ((_to_cents(row[3]), row) for row in invoices),
+        key=lambda pair: pair[0]
+    )
+    return [cents for cents, _ in rows], [row for _, row in rows]
+
+
+def find_candidates(amount, transaction_date, amounts, rows, tolerance_cents, window):
+    """
+    Return the invoices whose amount and date window are compatible with a transaction
+
+    Args:
+        amount (Decimal): Transaction amount
+        transaction_date (date): Transaction date
+        amounts (list): Sorted invoice amounts in cents
+        rows (list): Invoice tuples aligned with ``amounts``
+        tolerance_cents (int): Accepted absolute amount difference, in cents
+        window (timedelta): Accepted distance before the invoice date and after the due date
+
+    Returns:
+        list: Matching invoice tuples
+    """
+    cents = _to_cents(amount)
+    low = bisect.bisect_left(amounts, cents - tolerance_cents)
+    high = bisect.bisect_right(amounts, cents + tolerance_cents)
+
+    candidates = []
+    for row in rows[low:high]:
+        invoice_date, due_date = row[4], row[5]
+        if invoice_date - window <= transaction_date <= due_date + window:
+            candidates.append(row)
+    return candidates
+
+
+def pick_candidate(description, amount, candidates):
+    """
+    Choose a single invoice among candidates, or None when the choice is ambiguous
+
+    Tie-breakers are applied in order: invoice number mentioned in the
+    description, supplier mentioned in the description, exact amount.
+    """
+    if len(candidates) == 1:
+        return candidates[0]
+
+    description = (description or '').lower()
+    tie_breakers = (
+        lambda row: bool(row[1]) and row[1].lower() in description,
+        lambda row: bool(row[2]) and row[2].lower() in description,
+        lambda row: row[3] == amount,
+    )
+    for tie_breaker in tie_breakers:
+        narrowed = [row for row in candidates if tie_breaker(row)]
+        if len(narrowed) == 1:
+            return narrowed[0]
+        if narrowed:
+            candidates = narrowed
+    return None
+
+
+def apply_matches(matches, batch_size=500):
+    """
+    Write reconciliation matches with one parametrized UPDATE run over all rows
+
+    ``QuerySet.bulk_update`` compiles a CASE expression per row, which dominates
+    the runtime on large batches. The statement only touches transactions that
+    are still pending, so concurrent edits are never overwritten. Reconciled
+    transactions count in the balance of their account, which is updated once
+    for the whole run.
+
+    Args:
+        matches (list): Dicts with ``transaction_id`` and ``invoice_id`` keys;
+            those whose transaction is no longer pending get ``skipped`` set
+        batch_size (int): Rows sent per ``executemany`` call
+
+    Returns:
+        int: Number of updated transactions
+    """
+    table = Transaction._meta.db_table
+    id_field = Transaction._meta.pk
+    invoice_field = Transaction._meta.get_field('related_invoice')
+    updated_at_field = Transaction._meta.get_field('updated_at')
+    quote = connection.ops.quote_name
+    sql = (
+        f"UPDATE {quote(table)} SET {quote(invoice_field.column)} = %s, "
+        f"{quote('status')} = %s, {quote(updated_at_field.column)} = %s "
+        f"WHERE {quote(id_field.column)} = %s AND {quote('status')} = %s"
+    )
+    now = updated_at_field.get_db_prep_value(timezone.now(), connection)
+
+    updated = 0
+    deltas = defaultdict(Decimal)
+    with db_transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(matches), batch_size):
+            # The rows still pending are the ones the UPDATE below will change
+            pending = Transaction.objects.select_for_update().filter(
+                pk__in=[match['transaction_id'] for match in matches[start:start + batch_size]],
+                status='pending',
+            )
+            for key, amount in movements(pending).items():
+                deltas[key] += amount
+            # Locked above, so exactly these rows are updated below
+            still_pending = set(pending.values_list('pk', flat=True))
+            for match in matches[start:start + batch_size]:
+                if match['transaction_id'] not in still_pending:
+                    match['skipped'] = True
+            params = [
+                (
+                    invoice_field.get_db_prep_value(match['invoice_id'], connection),
+                    'reconciled',
+                    now,
+                    id_field.get_db_prep_value(match['transaction_id'], connection),
+                    'pending',
+                )
+                for match in matches[start:start + batch_size]
+            ]
+            cursor.executemany(sql, params)
+            updated += max(cursor.rowcount, 0)
+        apply_deltas(deltas)
+    return updated
+
+
+def auto_reconcile(amount_tolerance=Decimal('0'), date_window_days=30,
+                   start_date=None, end_date=None, dry_run=False, batch_size=500,
+                   transaction_type='expense', max_details=None):
+    """
+    Reconcile pending transactions with unpaid invoices in bulk
+
+    Pending transactions are matched against invoices that have no reconciled
+    transaction yet. A transaction is matched when exactly one invoice fits its
+    amount (within ``amount_tolerance``) and date window, possibly after the
+    tie-breakers of ``pick_candidate``. Transactions with several remaining
+    candidates, and invoices claimed by several transactions, are reported as
+    ambiguous and left untouched.
+
+    Args:
+        amount_tolerance (Decimal): Accepted absolute amount difference
+        date_window_days (int): Days accepted before the invoice date and after the due date
+        start_date (date): Only consider transactions on or after this date
+        end_date (date): Only consider transactions on or before this date
+        dry_run (bool): Compute matches without writing them
+        batch_size (int): Rows per ``executemany`` call when applying matches
+        transaction_type (str): Direction of the payments matched; invoices
+            are supplier invoices, paid by expenses
+        max_details (int): At most this many matches and ambiguous
+            transactions listed, all of them by default
+
+    Returns:
+        dict: Matched pairs, ambiguous transactions and counters; ``skipped``
+        counts matches whose transaction left pending during the run
+    """
+    transactions = Transaction.objects.filter(
+        status='pending', transaction_type=transaction_type, related_invoice__isnull=True
+    )
+    if start_date:
+        transactions = transactions.filter(transaction_date__gte=start_date)
+    if end_date:
+        transactions = transactions.filter(transaction_date__lte=end_date)
+
+    invoices = Invoice.objects.exclude(status='error').exclude(
+        id__in=Transaction.objects.filter(status='reconciled', related_invoice__isnull=False)
+        .values('related_invoice')
+    )
+
+    amounts, rows = build_invoice_index(invoices.values_list(
+        'id', 'invoice_number', 'supplier', 'total_amount', 'invoice_date', 'due_date'
+    ).order_by())
+    tolerance_cents = _to_cents(amount_tolerance)
+    window = timedelta(days=date_window_days)
+
+    claims = defaultdict(list)
+    ambiguous = []
+    scanned = 0
+    for transaction_id, amount, transaction_date, description in transactions.values_list(
+        'id', 'amount', 'transaction_date', 'description'
+    ).order_by('transaction_date', 'id').iterator(chunk_size=2000):
+        scanned += 1
+        candidates = find_candidates(amount, transaction_date, amounts, rows, tolerance_cents, window)
+        if not candidates:
+            continue
+        chosen = pick_candidate(description, amount, candidates)
+        if chosen is None:
+            ambiguous.append({
+                'transaction_id': transaction_id,
+                'reason': 'multiple_invoices',
+                'candidate_invoice_ids': [row[0] for row in candidates],
+            })
+        else:
+            claims[chosen[0]].append((transaction_id, chosen))
+
+    matches = []
+    for invoice_id, claimants in claims.items():
+        if len(claimants) > 1:
+            for transaction_id, _ in claimants:
+                ambiguous.append({
+                    'transaction_id': transaction_id,
+                    'reason': 'invoice_claimed_by_several_transactions',
+                    'candidate_invoice_ids': [invoice_id],
+                })
+            continue
+        transaction_id, row = claimants[0]
+        matches.append({
+            'transaction_id': transaction_id,
+            'invoice_id': invoice_id,
+            'invoice_number': row[1],
+        })
+
+    matched = len(matches)
+    if matches and not dry_run:
+        matched = apply_matches(matches, batch_size=batch_size)
+
+    return {
+        'scanned': scanned,
+        'matched': matched,
+        'skipped': len(matches) - matched,
+        'ambiguous_count': len(ambiguous),
+        'dry_run': dry_run,
+        'details_truncated': max_details is not None and max(len(matches), len(ambiguous)) > max_details,
+        'matches': matches[:max_details],
+        'ambiguous': ambiguous[:max_details],
+    }
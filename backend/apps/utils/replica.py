@@ -0,0 +1,73 @@
+# backend/apps/utils/replica.py
+import contextvars
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = 'replica'
+
+# Set inside use_replica() blocks
+_analytic = contextvars.ContextVar('replica_analytic', default=False)
+# None outside requests, then whether the current request has written
+_request_wrote = contextvars.ContextVar('replica_request_wrote', default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """
+    Send the reads of the wrapped block to the replica, when one is configured
+
+    Usable as a context manager or a decorator on analytic code paths
+    (report generators, exports, scans). Writes always go to the primary,
+    and once a request has written, its reads stay on the primary too.
+    """
+    token = _analytic.set(True)
+    try:
+        yield
+    finally:
+        _analytic.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Route the reads of ``use_replica()`` blocks to the ``replica`` alias
+
+    Everything else, including migrations, uses the primary database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _analytic.get() and not _request_wrote.get() and replica_configured():
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _request_wrote.get() is False:
+            _request_wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Track writes per request, so a request reads its own writes from the primary
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request_wrote.set(False)
+        try:
+            return self.get_response(request)
+        finally:
+            _request_wrote.reset(token)
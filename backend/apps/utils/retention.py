@@ -0,0 +1,124 @@
+# backend/apps/utils/retention.py
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.reports.models import Anomaly, ArchivedAnomaly, Notification
+from apps.utils.archive import _move
+from apps.utils.bulk import pk_ranges
+
+# Anomalies nobody has to look at anymore
+CLOSED_ANOMALY_STATUSES = ('resolved', 'false_positive')
+
+
+def policies(now=None):
+    """
+    Cutoffs of the retention policies, from the ``*_RETENTION_DAYS`` settings
+
+    A setting of None disables its policy.
+
+    Returns:
+        dict: Policy name to cutoff datetime, or None
+    """
+    now = now or timezone.now()
+
+    def cutoff(setting, default):
+        days = getattr(settings, setting, default)
+        return None if days is None else now - timedelta(days=days)
+
+    return {
+        'notifications': cutoff('NOTIFICATION_RETENTION_DAYS', 90),
+        'anomalies': cutoff('ANOMALY_RETENTION_DAYS', 365),
+    }
+
+
+def expired_notifications(cutoff):
+    # Unread notifications are kept whatever their age, so no counter changes
+    return Notification.objects.filter(read=True, created_at__lt=cutoff)
+
+
+def expired_anomalies(cutoff):
+    # Anomalies closed before resolved_at was recorded age from their detection
+    return Anomaly.objects.filter(status__in=CLOSED_ANOMALY_STATUSES).filter(
+        Q(resolved_at__lt=cutoff) | Q(resolved_at__isnull=True, detected_at__lt=cutoff)
+    )
+
+
+def table_bytes(model):
+    """
+    Bytes used by the table of ``model`` and its indexes
+
+    Returns:
+        int: Size in bytes, or None when the backend does not report it
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE tbl_name = %s)", [table]
+                )
+            except Exception:
+                # SQLite built without the dbstat virtual table
+                return None
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0] or 0) if row else None
+
+
+def purge(policy_names=None, batch_size=None, pause=None, dry_run=False, now=None):
+    """
+    Enforce the retention policies in short batches
+
+    Expired notifications are deleted; expired anomalies are moved to
+    ``ArchivedAnomaly``. Every batch runs in its own transaction followed by
+    ``pause`` seconds of sleep, so locks are held for one batch at a time
+    and other writers get in between batches. Freed pages are reused by
+    later writes; the database file itself only shrinks on ``VACUUM``.
+
+    Args:
+        policy_names: Policies to enforce, all enabled ones by default
+        batch_size (int): Rows per transaction, ``RETENTION_BATCH_SIZE`` by default
+        pause (float): Seconds between batches, ``RETENTION_BATCH_PAUSE`` by default
+        dry_run (bool): Count the expired rows without touching them
+
+    Returns:
+        dict: Per policy, its cutoff, the rows purged (or that would be) and
+        the table bytes freed, None when unknown
+    """
+    batch_size = batch_size or getattr(settings, 'RETENTION_BATCH_SIZE', 500)
+    pause = getattr(settings, 'RETENTION_BATCH_PAUSE', 0.1) if pause is None else pause
+    querysets = {'notifications': expired_notifications, 'anomalies': expired_anomalies}
+    models = {'notifications': Notification, 'anomalies': Anomaly}
+
+    results = {}
+    for name, cutoff in policies(now).items():
+        if cutoff is None or (policy_names and name not in policy_names):
+            continue
+        expired = querysets[name](cutoff)
+        if dry_run:
+            results[name] = {'cutoff': cutoff, 'rows': expired.count(), 'bytes': None}
+            continue
+
+        size_before = table_bytes(models[name])
+        stamp = timezone.now()
+        rows = 0
+        for index, (batch, _) in enumerate(pk_ranges(expired, batch_size)):
+            if index:
+                time.sleep(pause)
+            with transaction.atomic():
+                if name == 'anomalies':
+                    # Lock the range so the copy and the delete see the same rows
+                    batch = Anomaly.objects.filter(pk__in=list(batch.select_for_update().values_list('pk', flat=True)))
+                    _move(batch, ArchivedAnomaly, stamp)
+                rows += batch.delete()[0]
+        size_after = table_bytes(models[name])
+        freed = None if size_before is None or size_after is None else max(size_before - size_after, 0)
+        results[name] = {'cutoff': cutoff, 'rows': rows, 'bytes': freed}
+    return results
@@ -0,0 +1,242 @@
+# backend/apps/utils/search.py
+import re
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+# Tokens kept from a user query; everything else is treated as a separator
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Largest ``limit`` accepted by the ranked search endpoints
+MAX_RANKED_RESULTS = 50
+
+
+class FullTextIndex:
+    """
+    Full-text index over text columns of one table
+
+    SQLite: an external-content FTS5 table keyed on the base table rowid, kept
+    in sync by AFTER INSERT/UPDATE/DELETE triggers, so ``bulk_create`` and
+    ``update()`` are indexed too. PostgreSQL: a GIN index on the matching
+    ``to_tsvector`` expression, maintained by the database itself.
+    """
+
+    def __init__(self, table, columns, key_column='id'):
+        self.table = table
+        self.columns = list(columns)
+        self.key_column = key_column
+        self.fts_table = f"{table}_fts"
+
+    @property
+    def triggers(self):
+        return [f"{self.fts_table}_ai", f"{self.fts_table}_ad", f"{self.fts_table}_au"]
+
+    def _tsvector(self):
+        document = " || ' ' || ".join(f"coalesce({column}, '')" for column in self.columns)
+        return f"to_tsvector('simple', {document})"
+
+    def create_sql(self, vendor):
+        if vendor == 'sqlite':
+            columns = ', '.join(self.columns)
+            new_values = ', '.join(f"new.{column}" for column in self.columns)
+            old_values = ', '.join(f"old.{column}" for column in self.columns)
+            insert_new = f"INSERT INTO {self.fts_table}(rowid, {columns}) VALUES (new.rowid, {new_values});"
+            delete_old = (f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {columns}) "
+                          f"VALUES ('delete', old.rowid, {old_values});")
+            return [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+                f"{columns}, content='{self.table}', content_rowid='rowid', "
+                f"tokenize='unicode61 remove_diacritics 2')",
+                f"CREATE TRIGGER IF NOT EXISTS {self.triggers[0]} AFTER INSERT ON {self.table} "
+                f"BEGIN {insert_new} END",
+                f"CREATE TRIGGER IF NOT EXISTS {self.triggers[1]} AFTER DELETE ON {self.table} "
+                f"BEGIN {delete_old} END",
+                f"CREATE TRIGGER IF NOT EXISTS {self.triggers[2]} AFTER UPDATE ON {self.table} "
+                f"BEGIN {delete_old} {insert_new} END",
+                f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')",
+            ]
+        if vendor == 'postgresql':
+            return [f"CREATE INDEX IF NOT EXISTS {self.fts_table} ON {self.table} USING GIN ({self._tsvector()})"]
+        return []
+
+    def drop_sql(self, vendor):
+        if vendor == 'sqlite':
+            return [f"DROP TRIGGER IF EXISTS {trigger}" for trigger in self.triggers] + [
+                f"DROP TABLE IF EXISTS {self.fts_table}"
+            ]
+        if vendor == 'postgresql':
+            return [f"DROP INDEX IF EXISTS {self.fts_table}"]
+        return []
+
+    def is_installed(self, cursor, vendor):
+        if vendor == 'sqlite':
+            names = [self.fts_table] + self.triggers
+            cursor.execute(
+                f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})",
+                names
+            )
+            return cursor.fetchone()[0] == len(names)
+        if vendor == 'postgresql':
+            cursor.execute("SELECT COUNT(*) FROM pg_indexes WHERE indexname = %s", [self.fts_table])
+            return cursor.fetchone()[0] == 1
+        return False
+
+    def match_sql(self, vendor):
+        """
+        SQL returning the key column of every matching row, with one query parameter
+        """
+        if vendor == 'sqlite':
+            return (f"SELECT {self.key_column} FROM {self.table} WHERE rowid IN "
+                    f"(SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s)")
+        return (f"SELECT {self.key_column} FROM {self.table} "
+                f"WHERE {self._tsvector()} @@ to_tsquery('simple', %s)")
+
+    def ranked_sql(self, vendor):
+        """
+        SQL returning (key, score) pairs, best first, with query and limit parameters
+        """
+        if vendor == 'sqlite':
+            # FTS5 rank is bm25, lower is better
+            return (f"SELECT t.{self.key_column}, -{self.fts_table}.rank FROM {self.fts_table} "
+                    f"JOIN {self.table} t ON t.rowid = {self.fts_table}.rowid "
+                    f"WHERE {self.fts_table} MATCH %s ORDER BY {self.fts_table}.rank LIMIT %s")
+        return (f"SELECT {self.key_column}, ts_rank({self._tsvector()}, to_tsquery('simple', %s)) AS score "
+                f"FROM {self.table} WHERE {self._tsvector()} @@ to_tsquery('simple', %s) "
+                f"ORDER BY score DESC LIMIT %s")
+
+
+FULLTEXT_INDEXES = {
+    'transaction': FullTextIndex('transactions_transaction', ['description']),
+    'invoice': FullTextIndex('invoices_invoice', ['invoice_number', 'supplier']),
+    'invoice_item': FullTextIndex('invoices_invoiceitem', ['description'], key_column='invoice_id'),
+}
+
+
+def is_supported(using_connection=None):
+    return (using_connection or connection).vendor in ('sqlite', 'postgresql')
+
+
+def ensure_indexes(names, using_connection=None, repair_only=False):
+    """
+    Create missing full-text indexes, rebuilding their content from the base table
+
+    SQLite drops the triggers when a migration remakes the base table, so this
+    also runs after every ``migrate`` with ``repair_only`` to restore the
+    indexes that were installed before.
+    """
+    using_connection = using_connection or connection
+    vendor = using_connection.vendor
+    with using_connection.cursor() as cursor:
+        for name in names:
+            index = FULLTEXT_INDEXES[name]
+            if index.is_installed(cursor, vendor):
+                continue
+            if repair_only and index.fts_table not in using_connection.introspection.table_names(cursor):
+                continue
+            for statement in index.drop_sql(vendor) + index.create_sql(vendor):
+                cursor.execute(statement)
+
+
+def drop_indexes(names, using_connection=None):
+    using_connection = using_connection or connection
+    with using_connection.cursor() as cursor:
+        for name in names:
+            for statement in FULLTEXT_INDEXES[name].drop_sql(using_connection.vendor):
+                cursor.execute(statement)
+
+
+def build_query(text, vendor=None):
+    """
+    Turn user input into a prefix query: every token must match the start of a word
+
+    Returns:
+        str: The backend query string, or '' when the input has no searchable token
+    """
+    vendor = vendor or connection.vendor
+    tokens = TOKEN_RE.findall(text or '')
+    if vendor == 'postgresql':
+        return ' & '.join(f"{token}:*" for token in tokens)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def match_filter(names, text):
+    """
+    Return a boolean expression, usable in ``filter()``, matching any of the named indexes
+
+    The first index must be built on the queried model's table. On SQLite it
+    is matched by rowid directly, so the planner probes a rowid set built from
+    the FTS posting lists instead of mapping every hit back to its primary key.
+    """
+    query = build_query(text)
+    vendor = connection.vendor
+    first, others = FULLTEXT_INDEXES[names[0]], [FULLTEXT_INDEXES[name] for name in names[1:]]
+    pk_column = f"{first.table}.{first.key_column}"
+
+    if vendor == 'sqlite':
+        clauses = [f"{first.table}.rowid IN (SELECT rowid FROM {first.fts_table} "
+                   f"WHERE {first.fts_table} MATCH %s)"]
+    else:
+        clauses = [f"{pk_column} IN ({first.match_sql(vendor)})"]
+    clauses += [f"{pk_column} IN ({index.match_sql(vendor)})" for index in others]
+    return RawSQL(f"({' OR '.join(clauses)})", [query] * len(names), output_field=BooleanField())
+
+
+def ranked_search(names, text, limit=20):
+    """
+    Return up to ``limit`` keys matching ``text``, best ranked first
+
+    Scores of several indexes are merged by keeping the best one per key.
+    """
+    query = build_query(text)
+    if not query:
+        return []
+    vendor = connection.vendor
+    scores = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            index = FULLTEXT_INDEXES[name]
+            params = [query, limit] if vendor == 'sqlite' else [query, query, limit]
+            cursor.execute(index.ranked_sql(vendor), params)
+            for key, score in cursor.fetchall():
+                if key not in scores or score > scores[key]:
+                    scores[key] = score
+    return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+
+def get_limit(request, default=20):
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except ValueError:
+        return default
+    return max(1, min(limit, MAX_RANKED_RESULTS))
+
+
+def fetch_ranked(queryset, names, text, limit=20):
+    """
+    Return the objects of ``queryset`` matching ``text``, best ranked first
+    """
+    pk_field = queryset.model._meta.pk
+    keys = [pk_field.to_python(key) for key in ranked_search(names, text, limit)]
+    objects = queryset.in_bulk(keys)
+    return [objects[key] for key in keys if key in objects]
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter answering ``?search=`` from the full-text indexes named by the
+    view's ``fulltext_indexes`` attribute, with prefix matching on every token.
+    Falls back to the ``LIKE`` based ``search_fields`` on other backends.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        names = getattr(view, 'fulltext_indexes', None)
+        if not names or not is_supported():
+            return super().filter_queryset(request, queryset, view)
+
+        text = request.query_params.get(self.search_param, '')
+        if not text.strip():
+            return queryset
+        if not build_query(text):
+            return queryset.none()
+        return queryset.filter(match_filter(names, text))
@@ -0,0 +1,145 @@
+# backend/apps/utils/sparse_fields.py
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_field_list(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+def get_sparse_fields(request, view, available):
+    """
+    Return the serializer fields a read request asked for
+
+    ``?fields=a,b`` keeps only the listed fields, ``?omit=c`` drops fields.
+    Without ``?fields=``, the ``list`` action also drops the view's
+    ``list_omit_fields`` so heavy fields are only sent on request.
+    Unknown names are ignored.
+
+    Args:
+        request: The DRF request, or None
+        view: The view serving the request, or None
+        available: Names of the serializer fields
+
+    Returns:
+        set: The field names to keep, or None to keep them all
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+
+    available = set(available)
+    params = request.query_params
+    keep = None
+    if FIELDS_PARAM in params:
+        keep = parse_field_list(params[FIELDS_PARAM]) & available
+    elif getattr(view, 'action', None) == 'list' and getattr(view, 'list_omit_fields', None):
+        keep = available - set(view.list_omit_fields)
+    if OMIT_PARAM in params:
+        keep = (available if keep is None else keep) - parse_field_list(params[OMIT_PARAM])
+    return keep
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin applying ``?fields=`` and ``?omit=`` to its fields
+
+    Only the serializer built by the view (the one receiving the request in
+    its context) is trimmed; nested serializers keep all their fields.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = get_sparse_fields(self.context.get('request'), self.context.get('view'), self.fields)
+        if keep is not None:
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+
+class SparseFieldsViewMixin:
+    """
+    View mixin loading only what the sparse fieldset of a request needs
+
+    For the ``list`` and ``retrieve`` actions, columns of unrequested fields
+    are deferred, unused ``select_related`` joins are dropped and prefetches
+    of unrequested nested fields are skipped. Serializers with a field the
+    columns cannot be derived from (a method, a property) load everything.
+    """
+    list_omit_fields = ()
+    sparse_actions = ('list', 'retrieve')
+
+    def get_sparse_fields(self):
+        """
+        Field names requested by the client, or None for all of them
+        """
+        return get_sparse_fields(self.request, self, self.get_serializer_class()().fields)
+
+    def get_ordering_columns(self):
+        """
+        Columns the pagination cursor reads besides the serialized fields
+        """
+        columns = [name.lstrip('-') for name in getattr(self, 'ordering', None) or []]
+        columns += [name for name in getattr(self, 'ordering_fields', None) or []
+                    if isinstance(name, str) and name != '__all__']
+        return columns
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, 'action', None) not in self.sparse_actions:
+            return queryset
+        keep = self.get_sparse_fields()
+        if keep is None:
+            return queryset
+        return self.trim_queryset(queryset, keep)
+
+    def trim_queryset(self, queryset, keep):
+        model = queryset.model
+        columns = {model._meta.pk.name, *self.get_ordering_columns()}
+        relations = set()
+        nested = set()
+
+        for name, field in self.get_serializer_class()().fields.items():
+            if name not in keep or field.write_only:
+                continue
+            source = field.source
+            if source.startswith('get_') and source.endswith('_display'):
+                source = source[4:-8]
+            root, _, attribute = source.partition('.')
+            try:
+                model_field = model._meta.get_field(root)
+            except FieldDoesNotExist:
+                return queryset
+            if (isinstance(field, serializers.ListSerializer)
+                    or model_field.one_to_many or model_field.many_to_many):
+                nested.add(root)
+                continue
+            if not attribute:
+                columns.add(root)
+                continue
+            try:
+                target = model_field.related_model._meta.get_field(attribute)
+            except (AttributeError, FieldDoesNotExist):
+                return queryset
+            if target.is_relation:
+                return queryset
+            columns.update((root, f"{root}__{attribute}"))
+            relations.add(root)
+
+        prefetches = [lookup for lookup in queryset._prefetch_related_lookups
+                      if isinstance(lookup, str) and lookup.split('__')[0] in nested]
+        queryset = queryset.prefetch_related(None).prefetch_related(*prefetches)
+
+        selected = queryset.query.select_related
+        if selected is True:
+            return queryset
+        if selected:
+            joins = [name for name in selected if name in relations]
+            queryset = queryset.select_related(None).select_related(*joins)
+        # Related columns can only be restricted on the joins that are kept
+        columns = {column for column in columns
+                   if '__' not in column or column.split('__')[0] in (selected or ())}
+        return queryset.only(*columns)
@@ -0,0 +1,235 @@
+# backend/apps/utils/suppliers.py
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, IntegerField, Value, When
+
+# Model classes are imported where used or passed in: migrations import this module
+
+# Legal forms dropped from names: "Fournisseur ABC SARL" is "FOURNISSEUR ABC"
+LEGAL_FORMS = frozenset({
+    'sa', 'sas', 'sasu', 'sarl', 'eurl', 'snc', 'sci', 'scop', 'selarl', 'ei', 'eirl',
+    'cie', 'co', 'inc', 'ltd', 'llc', 'plc', 'gmbh', 'bv', 'srl', 'spa',
+})
+
+
+def normalize_supplier(name):
+    """
+    Matching key of a supplier name: accents, case, punctuation and legal forms removed
+
+    Returns:
+        str: The key, empty for an empty name
+    """
+    text = unicodedata.normalize('NFKD', name or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    # Initials spelled with dots or spaces are one token: "S.A." is "sa", "A B C" is "abc"
+    tokens = re.sub(r'\b([a-z])[^0-9a-z]+(?=[a-z]\b)', r'\1', text)
+    tokens = re.sub(r'[^0-9a-z]+', ' ', tokens).split()
+    kept = [token for token in tokens if token not in LEGAL_FORMS]
+    # A name made only of legal forms keeps them
+    return ' '.join(kept or tokens)[:100]
+
+
+class SupplierMatcher:
+    """
+    In-memory index of supplier keys: exact lookups, then fuzzy ones
+
+    Fuzzy candidates are limited to keys with the same numbers and the same
+    first letter: "fournisseur 1" never matches "fournisseur 11", however
+    close the strings are, and a lookup compares a handful of keys rather
+    than every known supplier.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold or getattr(settings, 'SUPPLIER_MATCH_THRESHOLD', 0.94)
+        self.keys = {}
+        self.blocks = defaultdict(list)
+
+    @staticmethod
+    def _block(key):
+        return tuple(re.findall(r'\d+', key)), key[:1]
+
+    def add(self, key, value):
+        if key not in self.keys:
+            self.blocks[self._block(key)].append(key)
+        self.keys[key] = value
+
+    def match(self, key):
+        """
+        Returns:
+            tuple: (value, exact) of the best match, or (None, False)
+        """
+        if key in self.keys:
+            return self.keys[key], True
+        best, best_ratio = None, self.threshold
+        for candidate in self.blocks.get(self._block(key), ()):
+            matcher = SequenceMatcher(None, key, candidate)
+            if matcher.quick_ratio() >= best_ratio and (ratio := matcher.ratio()) >= best_ratio:
+                best, best_ratio = candidate, ratio
+        return (self.keys[best], False) if best is not None else (None, False)
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def resolve_names(names, Supplier, SupplierAlias, matcher=None):
+    """
+    Map supplier names to supplier ids, creating the suppliers and aliases missing
+
+    Names are taken in order, so put the most common spelling of a supplier
+    first: it becomes its display name. Model classes are passed in so
+    migrations can run this with their historical models.
+
+    Args:
+        names (iterable): Raw supplier names
+        matcher (SupplierMatcher): Known keys, loaded from the alias table by default
+
+    Returns:
+        dict: Raw name to supplier id, names without a key are left out
+    """
+    if matcher is None:
+        matcher = SupplierMatcher()
+        for alias, supplier_id in SupplierAlias.objects.values_list('alias', 'supplier_id').iterator(chunk_size=5000):
+            matcher.add(alias, supplier_id)
+
+    # Group the names by supplier in memory first: new suppliers get a placeholder
+    clusters = {}
+    resolved = {}
+    new_aliases = {}
+    for name in names:
+        key = normalize_supplier(name)
+        if not key:
+            continue
+        value, exact = matcher.match(key)
+        if value is None:
+            value = ('new', key)
+            clusters[key] = name.strip()[:100]
+        if not exact:
+            matcher.add(key, value)
+            new_aliases[key] = value
+        resolved[name] = value
+
+    ids = {}
+    if clusters:
+        Supplier.objects.bulk_create(
+            [Supplier(name=name, normalized_name=key) for key, name in clusters.items()],
+            ignore_conflicts=True, batch_size=1000,
+        )
+        ids = dict(Supplier.objects.filter(normalized_name__in=list(clusters)).values_list('normalized_name', 'pk'))
+    SupplierAlias.objects.bulk_create(
+        [SupplierAlias(alias=key, supplier_id=ids[value[1]] if isinstance(value, tuple) else value)
+         for key, value in new_aliases.items()],
+        ignore_conflicts=True, batch_size=1000,
+    )
+    for key, value in new_aliases.items():
+        if isinstance(value, tuple):
+            matcher.add(key, ids[value[1]])
+    return {name: ids[value[1]] if isinstance(value, tuple) else value for name, value in resolved.items()}
+
+
+def link_invoices(Invoice, Supplier, SupplierAlias, *other_models, only_missing=True):
+    """
+    Set the supplier key of invoices from their supplier name
+
+    Distinct names are resolved most common first, then written with one
+    ``CASE`` update per table for every 500 names.
+
+    Args:
+        other_models: Further invoice-like models, such as ``ArchivedInvoice``
+        only_missing (bool): Leave invoices that already have a key alone
+
+    Returns:
+        dict: Invoices linked and suppliers known afterwards
+    """
+    models = (Invoice, *other_models)
+    counts = defaultdict(int)
+    for model in models:
+        queryset = model.objects.all()
+        if only_missing:
+            queryset = queryset.filter(normalized_supplier__isnull=True)
+        for name, count in queryset.values_list('supplier').annotate(count=Count('pk')).order_by():
+            counts[name] += count
+
+    names = sorted(counts, key=lambda name: (-counts[name], name))
+    linked = 0
+    with transaction.atomic():
+        supplier_ids = list(resolve_names(names, Supplier, SupplierAlias).items())
+        # One UPDATE per table and batch of names, whether the name column is indexed or not
+        for start in range(0, len(supplier_ids), 500):
+            batch = supplier_ids[start:start + 500]
+            key = Case(*[When(supplier=name, then=Value(supplier_id)) for name, supplier_id in batch],
+                       output_field=IntegerField())
+            for model in models:
+                queryset = model.objects.filter(supplier__in=[name for name, _ in batch])
+                if only_missing:
+                    queryset = queryset.filter(normalized_supplier__isnull=True)
+                linked += queryset.update(normalized_supplier=key)
+    return {'invoices': linked, 'suppliers': Supplier.objects.count()}
+
+
+class SupplierIndex:
+    """
+    Process-wide alias index used to resolve OCR and form input without a query
+
+    Loaded on first use; entries for suppliers created here are only added
+    once their transaction commits, other processes' additions are found in
+    the alias table on a miss.
+    """
+
+    def __init__(self):
+        self._matcher = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from apps.invoices.models import SupplierAlias
+        matcher = SupplierMatcher()
+        for alias, supplier_id in SupplierAlias.objects.values_list('alias', 'supplier_id').iterator(chunk_size=5000):
+            matcher.add(alias, supplier_id)
+        return matcher
+
+    def _add(self, key, supplier_id):
+        with self._lock:
+            self._matcher.add(key, supplier_id)
+
+    def resolve(self, name):
+        """
+        Supplier id of ``name``, creating the supplier when no known one is close enough
+
+        Returns:
+            int: Supplier id, None for an empty name
+        """
+        from apps.invoices.models import Supplier, SupplierAlias
+        key = normalize_supplier(name)
+        if not key:
+            return None
+        with self._lock:
+            if self._matcher is None:
+                self._matcher = self._load()
+            supplier_id, exact = self._matcher.match(key)
+        if exact:
+            return supplier_id
+
+        if supplier_id is None:
+            supplier_id = SupplierAlias.objects.filter(alias=key).values_list('supplier_id', flat=True).first()
+        if supplier_id is None:
+            supplier, _ = Supplier.objects.get_or_create(normalized_name=key, defaults={'name': name.strip()[:100]})
+            supplier_id = supplier.pk
+        try:
+            with transaction.atomic():
+                SupplierAlias.objects.get_or_create(alias=key, defaults={'supplier_id': supplier_id})
+        except IntegrityError:
+            # Added concurrently, possibly for another supplier: that one wins
+            supplier_id = SupplierAlias.objects.get(alias=key).supplier_id
+        transaction.on_commit(lambda: self._add(key, supplier_id))
+        return supplier_id
+
+    def clear(self):
+        with self._lock:
+            self._matcher = None
+
+
+supplier_index = SupplierIndex()
@@ -0,0 +1,125 @@
+# backend/apps/utils/synthetic.py
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import connection
+from apps.accounts.models import User
+from apps.invoices.models import Invoice, InvoiceItem, Supplier, SupplierAlias
+from apps.transactions.models import BankAccount, Transaction
+from apps.reports.models import Report, Anomaly, Notification
+from apps.utils.balances import rebuild_balances
+from apps.utils.notifications import recount_unread
+from apps.utils.suppliers import link_invoices
+
+
+def seed_synthetic_data(rows, seed=42):
+    """
+    Insert synthetic users, invoices with items, transactions, anomalies,
+    notifications and reports for benchmarks and query checks
+
+    Callers are expected to run inside ``transaction.atomic()`` and roll back.
+
+    Args:
+        rows (int): Number of transactions; other tables are sized from it
+        seed (int): Seed of the random generator, for reproducible data
+
+    Returns:
+        dict: Handles on the seeded data (users, account, supplier, date range)
+    """
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=3 * 365)
+    suppliers = [f"Fournisseur {i} SARL" for i in range(max(rows // 100, 1))]
+    token = rng.randrange(10 ** 9)
+
+    users = User.objects.bulk_create([
+        User(username=f"benchmark_{token}_{i}", role='accountant') for i in range(20)
+    ])
+    account = BankAccount.objects.create(
+        account_name='Benchmark', account_number='000', bank_name='Benchmark', current_balance=0
+    )
+
+    invoices = Invoice.objects.bulk_create([
+        Invoice(
+            invoice_number=f"BENCH-{token}-{i}",
+            supplier=rng.choice(suppliers),
+            invoice_date=start + timedelta(days=rng.randrange(3 * 365)),
+            due_date=start + timedelta(days=rng.randrange(3 * 365) + 30),
+            total_amount=Decimal(rng.randrange(1000, 1000000)) / 100,
+            tax_amount=Decimal(rng.randrange(100, 100000)) / 100,
+            uploaded_by=rng.choice(users),
+            original_file='invoices/benchmark.pdf',
+        )
+        for i in range(max(rows // 4, 1))
+    ], batch_size=1000)
+    link_invoices(Invoice, Supplier, SupplierAlias)
+
+    InvoiceItem.objects.bulk_create([
+        InvoiceItem(
+            invoice=invoice,
+            description=f"Ligne {line}",
+            quantity=1,
+            unit_price=invoice.total_amount / 2,
+            total_price=invoice.total_amount / 2,
+        )
+        for invoice in invoices for line in range(2)
+    ], batch_size=1000)
+
+    transactions = Transaction.objects.bulk_create([
+        Transaction(
+            transaction_date=start + timedelta(days=rng.randrange(3 * 365)),
+            amount=Decimal(rng.randrange(1000, 1000000)) / 100,
+            description=f"Benchmark transaction {i}",
+            transaction_type=rng.choice(('income', 'expense', 'transfer')),
+            status=rng.choice(('pending', 'completed', 'reconciled')),
+            bank_account=account,
+            related_invoice=rng.choice(invoices) if rng.random() < 0.3 else None,
+        )
+        for i in range(rows)
+    ], batch_size=1000)
+    # bulk_create skips the balance updates of Transaction.save()
+    rebuild_balances([account.pk])
+
+    Anomaly.objects.bulk_create([
+        Anomaly(
+            anomaly_type=rng.choice([choice for choice, _ in Anomaly.ANOMALY_TYPES]),
+            description='Benchmark anomaly',
+            status=rng.choice(('new', 'investigating', 'resolved', 'false_positive')),
+            related_invoice=rng.choice(invoices),
+            related_transaction=rng.choice(transactions),
+        )
+        for _ in range(max(rows // 4, 1))
+    ], batch_size=1000)
+
+    Notification.objects.bulk_create([
+        Notification(
+            user=rng.choice(users),
+            title='Benchmark',
+            message='Benchmark notification',
+            read=rng.random() < 0.8,
+        )
+        for _ in range(max(rows // 2, 1))
+    ], batch_size=1000)
+    recount_unread([user.pk for user in users])
+
+    Report.objects.bulk_create([
+        Report(
+            title=f"Benchmark report {i}",
+            report_type='income_statement',
+            start_date=start,
+            end_date=start + timedelta(days=30),
+            generated_by=rng.choice(users),
+        )
+        for i in range(max(rows // 100, 1))
+    ], batch_size=1000)
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    return {
+        'users': users,
+        'user': users[0],
+        'account': account,
+        'supplier': suppliers[0],
+        'start': start,
+        'end': start + timedelta(days=90),
+    }
@@ -0,0 +1,303 @@
+# backend/apps/utils/vat.py
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Case, CharField, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import TruncMonth, TruncQuarter
+from django.db.models.lookups import LessThan, LessThanOrEqual
+from django.utils import timezone
+from apps.invoices.models import ArchivedInvoice, Invoice
+from apps.reports.models import TaxPeriod
+from apps.transactions.models import ArchivedTransaction, Transaction
+from apps.utils.archive import default_cutoff
+from apps.utils.balances import SETTLED_STATUSES, quantize_cents
+
+GRANULARITIES = {'month': (1, TruncMonth), 'quarter': (3, TruncQuarter)}
+
+# Invoices whose VAT can be deducted
+DEDUCTIBLE_INVOICE_STATUSES = ('validated',)
+
+# Roles allowed to file a period, which freezes its figures
+FILING_ROLES = ('admin', 'financial_director')
+
+# CA3 lines of the collected VAT per rate (percent)
+COLLECTED_LINES = {
+    Decimal('20.0'): ('08', 'Taux normal 20 %'),
+    Decimal('10.0'): ('9B', 'Taux réduit 10 %'),
+    Decimal('5.5'): ('09', 'Taux réduit 5,5 %'),
+    Decimal('2.1'): ('11', 'Taux particulier 2,1 %'),
+}
+
+
+def vat_rates():
+    """VAT rates in percent, from ``VAT_RATES``, lowest first"""
+    return sorted(Decimal(rate) for rate in getattr(settings, 'VAT_RATES', ('20.0', '10.0', '5.5', '2.1', '0')))
+
+
+def period_ranges(start, end, granularity='quarter'):
+    """
+    ``(first day, last day)`` of the months or quarters overlapping ``start`` to ``end``
+
+    Partial periods at either end are widened to the whole period: VAT is
+    declared per month or quarter. ``start`` must not be after ``end``.
+    """
+    step = GRANULARITIES[granularity][0]
+    index = start.year * 12 + (start.month - 1) // step * step
+    ranges = []
+    while True:
+        first = date(index // 12, index % 12 + 1, 1)
+        # Months counted from year 0; the last one is derived, not the next
+        # period's first day, which does not exist after December 9999
+        index += step
+        year, month = divmod(index - 1, 12)
+        last = date(year, month + 1, calendar.monthrange(year, month + 1)[1])
+        ranges.append((first, last))
+        if last >= end:
+            return ranges
+
+
+def _spans(ranges):
+    # Consecutive periods read as one date range
+    spans = []
+    for first, last in sorted(ranges):
+        if spans and spans[-1][1] + timedelta(days=1) == first:
+            spans[-1] = (spans[-1][0], last)
+        else:
+            spans.append((first, last))
+    return spans
+
+
+def _within(field, ranges):
+    condition = Q()
+    for first, last in _spans(ranges):
+        condition |= Q(**{f"{field}__range": (first, last)})
+    return condition
+
+
+def rate_bucket():
+    """
+    Rate of an invoice from its amounts: the closest of ``VAT_RATES`` to tax / (total - tax)
+
+    The comparisons multiply instead of divide, so no integer or by-zero
+    division happens in SQL; invoices without a positive base have no rate.
+    """
+    rates = vat_rates()
+    base = F('total_amount') - F('tax_amount')
+    whens = [When(LessThanOrEqual(base, Value(0)), then=Value(None))]
+    for lower, upper in zip(rates, rates[1:]):
+        # Below the midpoint of two rates is the lower one
+        whens.append(When(LessThan(F('tax_amount') * 200, base * (lower + upper)), then=Value(str(lower))))
+    return Case(*whens, default=Value(str(rates[-1])), output_field=CharField())
+
+
+def _deductible(ranges, granularity, using):
+    trunc = GRANULARITIES[granularity][1]
+    amount = DecimalField(max_digits=15, decimal_places=2)
+    rows = []
+    for model in (Invoice, ArchivedInvoice):
+        rows.extend(model.objects.using(using).filter(
+            _within('invoice_date', ranges), status__in=DEDUCTIBLE_INVOICE_STATUSES
+        ).values(period=trunc('invoice_date'), rate=rate_bucket()).annotate(
+            base=Sum(F('total_amount') - F('tax_amount'), output_field=amount),
+            vat=Sum('tax_amount', output_field=amount),
+            count=Count('pk'),
+        ).order_by())
+    return rows
+
+
+def _collected(ranges, granularity, using):
+    trunc = GRANULARITIES[granularity][1]
+    rows = []
+    for model in (Transaction, ArchivedTransaction):
+        rows.extend(model.objects.using(using).filter(
+            _within('transaction_date', ranges), transaction_type='income', status__in=SETTLED_STATUSES
+        ).values(period=trunc('transaction_date')).annotate(gross=Sum('amount'), count=Count('pk')).order_by())
+    return rows
+
+
+def compute_lines(ranges, granularity='quarter', using=None):
+    """
+    VAT lines of every period in ``ranges`` with one grouped query per table
+
+    Deductible VAT comes from validated invoices, grouped by the rate their
+    amounts imply. Collected VAT is extracted from settled income at
+    ``VAT_COLLECTED_RATE``, income being recorded tax included.
+
+    Returns:
+        dict: ``(first day, last day)`` to a list of ``{direction, rate, base, vat, count}``
+        lines, amounts as strings
+    """
+    if not ranges:
+        return {}
+    starts = {first: (first, last) for first, last in ranges}
+    totals = defaultdict(lambda: [Decimal(0), Decimal(0), 0])
+    for row in _deductible(ranges, granularity, using):
+        line = totals[(starts[row['period']], 'deductible', row['rate'])]
+        line[0] += Decimal(row['base'] or 0)
+        line[1] += Decimal(row['vat'] or 0)
+        line[2] += row['count']
+
+    collected_rate = Decimal(getattr(settings, 'VAT_COLLECTED_RATE', '20.0'))
+    gross = defaultdict(lambda: [Decimal(0), 0])
+    for row in _collected(ranges, granularity, using):
+        gross[starts[row['period']]][0] += Decimal(row['gross'] or 0)
+        gross[starts[row['period']]][1] += row['count']
+    for period, (amount, count) in gross.items():
+        amount = quantize_cents(amount)
+        vat = quantize_cents(amount * collected_rate / (100 + collected_rate))
+        totals[(period, 'collected', str(collected_rate))] = [amount - vat, vat, count]
+
+    lines = {period: [] for period in ranges}
+    for (period, direction, rate), (base, vat, count) in sorted(
+            totals.items(), key=lambda item: (item[0][1], item[0][2] is None, Decimal(item[0][2] or 0))):
+        lines[period].append({'direction': direction, 'rate': rate, 'base': str(quantize_cents(base)),
+                              'vat': str(quantize_cents(vat)), 'count': count})
+    return lines
+
+
+def summarize(first, last, lines, state, cached):
+    """Period dict of the report: its lines and collected, deductible and net VAT"""
+    collected = sum((Decimal(line['vat']) for line in lines if line['direction'] == 'collected'), Decimal('0.00'))
+    deductible = sum((Decimal(line['vat']) for line in lines if line['direction'] == 'deductible'), Decimal('0.00'))
+    return {
+        'start_date': first, 'end_date': last, 'status': state, 'cached': cached, 'lines': lines,
+        'collected_vat': collected, 'deductible_vat': deductible, 'net_vat': collected - deductible,
+    }
+
+
+def tax_report(start, end, granularity='quarter', using=None, today=None):
+    """
+    VAT collected and deductible per period from ``start`` to ``end``
+
+    Filed periods and periods before the archive cutoff are closed. The
+    lines of a closed period are computed on the primary and stored in
+    ``TaxPeriod`` once it has any, then read from there, on the primary
+    too; ``refresh_tax_periods`` recomputes them after back-dated writes.
+    Open periods are always computed from the current rows, read from
+    ``using`` or the database routed to.
+
+    Returns:
+        list: Period dicts, see ``summarize``; status is filed, closed or open
+    """
+    ranges = period_ranges(start, end, granularity)
+    cutoff = default_cutoff(today)
+    # Stored figures come from the primary whatever ``using`` says: a period
+    # filed a moment ago is not on the replica yet, and must not be recomputed
+    stored = {
+        (period.start_date, period.end_date): period
+        for period in TaxPeriod.objects.using(DEFAULT_DB_ALIAS).filter(
+            start_date__gte=ranges[0][0], end_date__lte=ranges[-1][1]
+        )
+    } if ranges else {}
+    missing = [period for period in ranges if period not in stored]
+    closed = [period for period in missing if period[1] < cutoff]
+    # Stored figures must not be a lagging replica's
+    computed = compute_lines(closed, granularity, DEFAULT_DB_ALIAS)
+    computed.update(compute_lines([period for period in missing if period[1] >= cutoff], granularity, using))
+
+    # Periods without rows are not stored: there is nothing to reuse, and
+    # data imported into them later would never show
+    new = [(first, last) for first, last in closed if computed[(first, last)]]
+    if new:
+        # Another request may be storing the same periods: the first one wins
+        TaxPeriod.objects.bulk_create(
+            [TaxPeriod(start_date=first, end_date=last, lines=computed[(first, last)]) for first, last in new],
+            ignore_conflicts=True,
+        )
+
+    report = []
+    for first, last in ranges:
+        if (first, last) in stored:
+            period = stored[(first, last)]
+            state = 'filed' if period.filed_at else 'closed'
+            report.append(summarize(first, last, period.lines, state, True))
+        else:
+            state = 'closed' if last < cutoff else 'open'
+            report.append(summarize(first, last, computed[(first, last)], state, False))
+    return report
+
+
+def file_period(start, granularity, user, today=None):
+    """
+    Freeze the period starting at ``start`` with its current figures
+
+    Returns:
+        TaxPeriod: The filed period
+
+    Raises:
+        ValueError: The period has not ended or is filed already
+    """
+    (first, last), = period_ranges(start, start, granularity)
+    if last >= (today or date.today()):
+        raise ValueError(f"The period {first} to {last} has not ended")
+    if TaxPeriod.objects.filter(start_date=first, end_date=last, filed_at__isnull=False).exists():
+        raise ValueError(f"The period {first} to {last} is filed already")
+    lines = compute_lines([(first, last)], granularity)[(first, last)]
+    period, _ = TaxPeriod.objects.update_or_create(
+        start_date=first, end_date=last,
+        defaults={'lines': lines, 'computed_at': timezone.now(), 'filed_at': timezone.now(), 'filed_by': user},
+    )
+    return period
+
+
+def refresh_tax_periods(start=None, end=None):
+    """
+    Recompute the stored figures of the periods not filed yet, from ``start``
+    to ``end`` when given
+
+    Stored closed periods are not updated by later writes: invoices imported
+    or transactions settled with an older date, rows unarchived and edited.
+    Filed periods keep their figures; periods left without rows are removed.
+
+    Returns:
+        list: ``(period, old lines, new lines)`` of the periods whose lines changed
+    """
+    periods = TaxPeriod.objects.filter(filed_at__isnull=True).order_by('start_date')
+    if start is not None:
+        periods = periods.filter(end_date__gte=start)
+    if end is not None:
+        periods = periods.filter(start_date__lte=end)
+    periods = list(periods)
+
+    changes = []
+    for granularity, (months, _) in GRANULARITIES.items():
+        # A stored period is a month or a quarter, told apart by its length
+        matching = [period for period in periods
+                    if (period.end_date.year - period.start_date.year) * 12
+                    + period.end_date.month - period.start_date.month + 1 == months]
+        computed = compute_lines([(period.start_date, period.end_date) for period in matching], granularity,
+                                 DEFAULT_DB_ALIAS)
+        for period in matching:
+            lines = computed[(period.start_date, period.end_date)]
+            if lines == period.lines:
+                continue
+            # Filed in the meantime: its figures are final
+            unfiled = TaxPeriod.objects.filter(pk=period.pk, filed_at__isnull=True)
+            if unfiled.update(lines=lines, computed_at=timezone.now()) if lines else unfiled.delete()[0]:
+                changes.append((period, period.lines, lines))
+    return changes
+
+
+def declaration_rows(period):
+    """
+    CA3 lines of a period dict: gross VAT per rate (08 to 11, total 16),
+    deductible VAT (20, total 23), then the credit (25) or the VAT due (28)
+
+    Returns:
+        list: ``(line, label, base, vat)`` tuples, base None where the form has none
+    """
+    rows = []
+    for line in period['lines']:
+        if line['direction'] == 'collected':
+            code, label = COLLECTED_LINES.get(Decimal(line['rate']), ('', f"Taux {line['rate']} %"))
+            rows.append((code, label, Decimal(line['base']), Decimal(line['vat'])))
+    rows.append(('16', 'Total de la TVA brute due', None, period['collected_vat']))
+    rows.append(('20', 'Autres biens et services', None, period['deductible_vat']))
+    rows.append(('23', 'Total TVA déductible', None, period['deductible_vat']))
+    net = period['net_vat']
+    rows.append(('25', 'Crédit de TVA', None, -net if net < 0 else Decimal('0.00')))
+    rows.append(('28', 'TVA nette due', None, net if net > 0 else Decimal('0.00')))
+    return rows
@@ -0,0 +1,116 @@
+"""
+Database settings built from environment variables
+
+``DB_PROFILE`` selects the profile:
+
+* ``sqlite`` (default): WAL journal, ``synchronous=NORMAL``, busy timeout,
+  mmap and page cache pragmas on every connection, writers take the lock
+  at ``BEGIN`` and connections are kept for ``DB_CONN_MAX_AGE`` seconds
+* ``sqlite-default``: the stock SQLite settings, one connection per request
+* ``postgres``: PostgreSQL with persistent connections, or a psycopg pool
+  with ``DB_POOL=1``; ``.iterator()`` uses server-side cursors unless
+  ``DB_DISABLE_SERVER_SIDE_CURSORS=1`` (needed behind pgbouncer in
+  transaction mode)
+
+``DB_REPLICA_NAME`` adds a ``replica`` database for analytic reads; the
+other ``DB_REPLICA_*`` variables override the matching ``DB_*`` ones.
+"""
+import os
+
+PROFILES = ('sqlite', 'sqlite-default', 'postgres')
+
+
+def env_int(environ, name, default):
+    value = environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def env_bool(environ, name, default=False):
+    value = environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def sqlite_pragmas(environ=os.environ):
+    return [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA busy_timeout={env_int(environ, 'SQLITE_BUSY_TIMEOUT_MS', 5000)}",
+        f"PRAGMA mmap_size={env_int(environ, 'SQLITE_MMAP_SIZE', 256 * 1024 * 1024)}",
+        # Negative sizes are in KiB
+        f"PRAGMA cache_size=-{env_int(environ, 'SQLITE_CACHE_SIZE_KB', 64 * 1024)}",
+        'PRAGMA temp_store=MEMORY',
+    ]
+
+
+def database_config(profile=None, name=None, environ=os.environ, default_name=None):
+    """
+    Return one ``DATABASES`` entry for ``profile``
+
+    Args:
+        profile (str): One of ``PROFILES``, ``DB_PROFILE`` when omitted
+        name (str): Database name or SQLite file, ``DB_NAME`` when omitted
+        environ (dict): Environment to read the settings from
+        default_name: SQLite file used when neither ``name`` nor ``DB_NAME`` is set
+
+    Returns:
+        dict: The database settings
+    """
+    profile = profile or environ.get('DB_PROFILE', 'sqlite')
+    name = name or environ.get('DB_NAME') or default_name
+
+    if profile == 'sqlite-default':
+        return {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}
+
+    if profile == 'sqlite':
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': name,
+            'CONN_MAX_AGE': env_int(environ, 'DB_CONN_MAX_AGE', 600),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': '; '.join(sqlite_pragmas(environ)),
+                # Take the write lock at BEGIN: a deferred transaction that
+                # later writes fails with "database is locked" at once instead
+                # of waiting for busy_timeout
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+
+    if profile == 'postgres':
+        pooled = env_bool(environ, 'DB_POOL')
+        config = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': name or 'finance',
+            'USER': environ.get('DB_USER', ''),
+            'PASSWORD': environ.get('DB_PASSWORD', ''),
+            'HOST': environ.get('DB_HOST', ''),
+            'PORT': environ.get('DB_PORT', ''),
+            # A pool manages its own connections, Django must not keep them
+            'CONN_MAX_AGE': 0 if pooled else env_int(environ, 'DB_CONN_MAX_AGE', 600),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': env_bool(environ, 'DB_DISABLE_SERVER_SIDE_CURSORS'),
+            'OPTIONS': {},
+        }
+        if pooled:
+            config['OPTIONS']['pool'] = {
+                'min_size': env_int(environ, 'DB_POOL_MIN_SIZE', 2),
+                'max_size': env_int(environ, 'DB_POOL_MAX_SIZE', 10),
+            }
+        return config
+
+    raise ValueError(f"Unknown DB_PROFILE {profile!r}, expected one of {', '.join(PROFILES)}")
+
+
+def replica_config(environ=os.environ):
+    """
+    Return the ``DATABASES`` entry of the read replica, or None when not configured
+    """
+    if not environ.get('DB_REPLICA_NAME'):
+        return None
+    overrides = {key.replace('DB_REPLICA_', 'DB_', 1): value
+                 for key, value in environ.items() if key.startswith('DB_REPLICA_')}
+    config = database_config(environ=dict(environ, **overrides))
+    config['TEST'] = {'MIRROR': 'default'}
+    return config
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from datetime import timedelta
+from .databases import database_config, replica_config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.utils.replica.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,13 +74,18 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Profile and connection settings come from the environment, see config/databases.py
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(default_name=BASE_DIR / 'db.sqlite3'),
 }
 
+# Reports, exports and scans read from the replica when DB_REPLICA_NAME is set
+# (apps.utils.replica); a local SQLite copy is refreshed by manage.py sync_replica
+REPLICA_DATABASE = replica_config()
+if REPLICA_DATABASE:
+    DATABASES['replica'] = REPLICA_DATABASE
+DATABASE_ROUTERS = ['apps.utils.replica.ReplicaRouter']
+
 # Custom user model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -130,7 +137,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -142,6 +149,89 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# Keyset pagination (apps.utils.pagination.KeysetPagination)
+PAGINATION_MAX_PAGE_SIZE = 100
+PAGINATION_APPROXIMATE_COUNT_CAP = 10000
+
+# Serve list endpoints from .values() rows (apps.utils.fast_serialization)
+FAST_LIST_SERIALIZATION = True
+
+# Authenticated user cache of JWT requests (apps.accounts.authentication);
+# False looks the user up on every request
+JWT_USER_CACHE = True
+JWT_USER_CACHE_SIZE = 1024
+JWT_USER_CACHE_TTL = 60
+
+# Months kept in the hot transaction and invoice tables (apps.utils.archive)
+ARCHIVE_RETENTION_MONTHS = 18
+
+# Retention enforced by ``manage.py purge_data`` (apps.utils.retention): days
+# read notifications and closed anomalies stay in the hot tables, None keeps
+# them forever; rows per purge transaction and seconds of pause between them
+NOTIFICATION_RETENTION_DAYS = 90
+ANOMALY_RETENTION_DAYS = 365
+RETENTION_BATCH_SIZE = 500
+RETENTION_BATCH_PAUSE = 0.1
+
+# Pushed notifications (apps.reports.events); the in-process broker only
+# reaches streams of the same worker process
+NOTIFICATION_BROKER = 'apps.utils.pubsub.InProcessBroker'
+NOTIFICATION_STREAM_HEARTBEAT = 25
+NOTIFICATION_STREAM_QUEUE_SIZE = 100
+NOTIFICATION_STREAM_RETRY_MS = 5000
+# Lifetime of the ticket opening a stream, whose URL access logs keep
+NOTIFICATION_STREAM_TICKET_SECONDS = 60
+
+# Bulk status transitions (apps.utils.bulk): rows per UPDATE, ids per request
+BULK_ACTION_BATCH_SIZE = 500
+BULK_ACTION_MAX_IDS = 10000
+
+# Bulk invoice import (apps.utils.invoice_import): invoices validated and
+# inserted per transaction, errors listed in the report
+INVOICE_IMPORT_CHUNK_SIZE = 500
+INVOICE_IMPORT_MAX_ERRORS = 100
+
+# Similarity (difflib ratio) above which an unknown supplier name is taken
+# as a spelling of a known supplier (apps.utils.suppliers)
+SUPPLIER_MATCH_THRESHOLD = 0.94
+
+# Matches and ambiguous transactions listed by /transactions/auto_reconcile/
+# with details=true (apps.transactions.views)
+AUTO_RECONCILE_MAX_DETAILS = 1000
+
+# Longest range served by /bank-accounts/<id>/balance_history/ (apps.transactions.views)
+BALANCE_HISTORY_MAX_DAYS = 1830
+
+# VAT rates in percent that invoice amounts are matched to, and the rate
+# included in income (apps.utils.vat)
+VAT_RATES = ('20.0', '10.0', '5.5', '2.1', '0')
+VAT_COLLECTED_RATE = '20.0'
+
+# Longest range of /reports/generate_tax_report/ and /reports/tax_declaration/ (apps.reports.views)
+TAX_REPORT_MAX_DAYS = 3660
+
+# Cash-flow forecast (apps.utils.forecast): days of history the flows are
+# learned from, days of the level, horizon served by default and at most,
+# and the per-process cache of results
+FORECAST_HISTORY_DAYS = 365
+FORECAST_TREND_DAYS = 91
+FORECAST_DEFAULT_DAYS = 90
+FORECAST_MAX_DAYS = 730
+FORECAST_CACHE_SIZE = 16
+FORECAST_CACHE_TTL = 3600
+
+# Report charts (apps.utils.charts): PNG cache directory, browser cache
+# lifetime of a chart version, and the worker processes drawing them
+CHART_CACHE_DIR = os.path.join(MEDIA_ROOT, 'charts')
+CHART_CACHE_MAX_AGE = 365 * 24 * 3600
+CHART_RENDER_WORKERS = 2
+CHART_RENDER_MAX_TASKS = 100
+CHART_RENDER_TIMEOUT = 30
+
+# Worker startup budget checked by ``manage.py benchmark_startup``
+STARTUP_TIME_BUDGET_MS = 1000
+STARTUP_RSS_BUDGET_MB = 100
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
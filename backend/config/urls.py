@@ -24,7 +24,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 # Import views
 from apps.accounts.views import UserViewSet
-from apps.invoices.views import InvoiceViewSet
+from apps.invoices.views import InvoiceViewSet, SupplierViewSet
 from apps.transactions.views import BankAccountViewSet, TransactionViewSet
 from apps.reports.views import ReportViewSet, NotificationViewSet, AnomalyViewSet
 
@@ -32,6 +32,7 @@ from apps.reports.views import ReportViewSet, NotificationViewSet, AnomalyViewSe
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
 router.register(r'invoices', InvoiceViewSet)
+router.register(r'suppliers', SupplierViewSet)
 router.register(r'bank-accounts', BankAccountViewSet)
 router.register(r'transactions', TransactionViewSet)
 router.register(r'reports', ReportViewSet)
@@ -13,8 +13,13 @@ const Navbar = ({ user, onMenuClick, onLogout }) => {
   const notificationsRef = useRef(null);
   const profileMenuRef = useRef(null);
 
-  // Fetch notifications
+  // Fetch notifications, then follow the pushed updates
   useEffect(() => {
+    let stream = null;
+    let interval = null;
+    let reconnectTimer = null;
+    let closed = false;
+
     const fetchNotifications = async () => {
       try {
         const { data } = await notificationService.getAll();
@@ -24,13 +29,71 @@ const Navbar = ({ user, onMenuClick, onLogout }) => {
         console.error('Failed to fetch notifications', error);
       }
     };
-    
+
+    // Polling for new notifications (every 30 seconds) when no stream is available
+    const startPolling = () => {
+      if (!interval) {
+        interval = setInterval(fetchNotifications, 30000);
+      }
+    };
+
+    const connect = async () => {
+      if (closed) {
+        return;
+      }
+      let opened = false;
+      try {
+        stream = await notificationService.openStream();
+      } catch (error) {
+        startPolling();
+        reconnectTimer = setTimeout(connect, 30000);
+        return;
+      }
+      if (closed) {
+        stream.close();
+        return;
+      }
+      stream.onopen = () => {
+        opened = true;
+        clearInterval(interval);
+        interval = null;
+      };
+      stream.addEventListener('notification', (event) => {
+        const notification = JSON.parse(event.data);
+        setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)]);
+      });
+      stream.addEventListener('unread_count', (event) => {
+        setUnreadCount(JSON.parse(event.data).unread_count);
+      });
+      stream.addEventListener('resync', fetchNotifications);
+      stream.onerror = () => {
+        // EventSource retries by itself unless the server refused the stream
+        // (expired ticket, no ASGI server): reopen later with a new ticket,
+        // after a fetch that refreshes the token when needed
+        if (stream.readyState === EventSource.CLOSED) {
+          if (!opened) {
+            startPolling();
+          }
+          reconnectTimer = setTimeout(() => fetchNotifications().then(connect), 30000);
+        }
+      };
+    };
+
     fetchNotifications();
-    
-    // Polling for new notifications (every 30 seconds)
-    const interval = setInterval(fetchNotifications, 30000);
-    
-    return () => clearInterval(interval);
+    if (typeof EventSource === 'undefined') {
+      startPolling();
+    } else {
+      connect();
+    }
+
+    return () => {
+      closed = true;
+      clearInterval(interval);
+      clearTimeout(reconnectTimer);
+      if (stream) {
+        stream.close();
+      }
+    };
   }, []);
 
   // Close dropdowns when clicking outside
@@ -65,16 +65,17 @@ const Dashboard = () => {
       try {
         setLoading(true);
         
+        // List endpoints only report a total when asked with ?count=
         // Fetch invoices
-        const invoicesResponse = await invoiceService.getAll();
+        const invoicesResponse = await invoiceService.getAll({ count: 'exact' });
         setRecentInvoices(invoicesResponse.data.results.slice(0, 5));
         
         // Fetch transactions
-        const transactionsResponse = await transactionService.getAll();
+        const transactionsResponse = await transactionService.getAll({ count: 'exact' });
         setRecentTransactions(transactionsResponse.data.results.slice(0, 5));
         
         // Fetch anomalies
-        const anomaliesResponse = await anomalyService.getAll();
+        const anomaliesResponse = await anomalyService.getAll({ count: 'exact' });
         setRecentAnomalies(anomaliesResponse.data.results.slice(0, 5));
         
         // Calculate stats
@@ -257,6 +257,13 @@ export const notificationService = {
   markAllAsRead: async () => {
     return api.post('/notifications/mark_all_read/');
   },
+  
+  // Server-Sent Events stream; EventSource cannot send headers, so a
+  // short-lived stream ticket goes in the URL, never the access token
+  openStream: async () => {
+    const { data } = await api.post('/notifications/stream_ticket/');
+    return new EventSource(`${API_URL}/notifications/stream/?ticket=${encodeURIComponent(data.ticket)}`);
+  },
 };
 
 // Anomaly services